@@ -0,0 +1,107 @@
+"""
+Benchmark of /search response assembly and serialization.
+
+Compares the pydantic path (a validated ``Result`` per destination, a
+``SearchResponse``, FastAPI's ``response_model`` re-validation and
+Starlette's ``json.dumps``) with the current one (``ResultRecord`` slotted
+dataclasses encoded by orjson through ``FastJSONResponse``). Scoring is left
+out: both paths start from the same precomputed field values.
+
+Usage (from ``src/``):
+    python -m api.bench_serialization --k 12 500
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from .main import POS_CUES, FastJSONResponse, Result, ResultRecord, SearchResponse
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+RESPONSE_ADAPTER = TypeAdapter(SearchResponse)
+PARAMS = {
+    "filters": {"geotype": ["coastal"], "culture": [], "experience": ["quiet"], "min_confidence": 0.0},
+    "retrieval": {"model": "attribute+context", "use_bloom": True, "zipf_penalty": 0.35,
+                  "tier_bucketing": True, "use_trends": True, "date_range": "1y", "k": 12},
+    "weights": {"attribute": 0.5, "context": 0.35, "query": 0.15},
+    "bloom_threshold": 1000,
+}
+
+
+def synthetic_results(k: int, seed: int = 0) -> List[Dict]:
+    """Field values of ``k`` results shaped like real /search results."""
+    rng = random.Random(seed)
+    tags = ["mountain", "quiet", "local", "hiking", "coastal", "food", "markets", "kayak", "photography"]
+    return [
+        {
+            "destination": f"Destination {i}",
+            "country": "Country",
+            "lat": rng.uniform(-60, 60),
+            "lon": rng.uniform(-180, 180),
+            "score": round(rng.random(), 4),
+            "confidence": round(rng.random(), 4),
+            "trend_delta": round(rng.uniform(-0.2, 0.2), 3),
+            "tags": rng.sample(tags, 5),
+            "context_cues": {"positive": {rng.choice(POS_CUES): 1}, "negative": {}},
+            "snippets": ["A quiet valley beyond the popular circuits, locals-only tea houses.",
+                         "Yak pastures and dawn bells; rarely visited side routes."],
+            "why": {"attribute_match": {"quiet": 1.0}, "context_score": 0.62, "term_overlap": 0.5,
+                    "bloom_filtered": False, "zipf_penalty_applied": 0.18},
+        }
+        for i in range(k)
+    ]
+
+
+def pydantic_response(values: List[Dict]) -> bytes:
+    """Result models, SearchResponse, response_model re-validation and json.dumps, as before."""
+    response = SearchResponse(query="quiet coastal towns", params=PARAMS,
+                              results=[Result(**v) for v in values], total=len(values), next_cursor=None)
+    validated = RESPONSE_ADAPTER.validate_python(response, from_attributes=True)
+    content = RESPONSE_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_response(values: List[Dict]) -> bytes:
+    """ResultRecords encoded by FastJSONResponse."""
+    content = {"query": "quiet coastal towns", "params": PARAMS,
+               "results": [ResultRecord(**v) for v in values], "total": len(values), "next_cursor": None}
+    return FastJSONResponse(content).body
+
+
+def time_per_call(fn: Callable[[List[Dict]], bytes], values: List[Dict], repeats: int) -> float:
+    """Median seconds per call over ``repeats`` calls (after one warm-up)."""
+    fn(values)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(values)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /search response serialization")
+    parser.add_argument("--k", type=int, nargs="+", default=[12, 500], help="Results per response")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed calls per path")
+    args = parser.parse_args()
+
+    for k in args.k:
+        values = synthetic_results(k)
+        # Same document either way
+        assert json.loads(pydantic_response(values)) == json.loads(fast_response(values))
+        before = time_per_call(pydantic_response, values, args.repeats)
+        after = time_per_call(fast_response, values, args.repeats)
+        logger.info(f"k={k}: pydantic {before * 1e6:.0f} us, orjson {after * 1e6:.0f} us "
+                    f"({before / after:.1f}x faster, {len(fast_response(values))} bytes)")
+
+
+if __name__ == "__main__":
+    main()
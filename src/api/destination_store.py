@@ -0,0 +1,237 @@
+"""
+Compact column store for the /search destination corpus.
+
+A list of destination dicts costs hundreds of bytes of Python objects per
+destination (the dict, its strings, the tag and snippet lists). The store
+keeps the same data in a handful of flat buffers:
+
+- destination names and snippets as one UTF-8 ``bytes`` buffer each,
+  addressed by int64 offsets (snippets additionally grouped per row)
+- tags and countries interned: one vocabulary list plus int32 id arrays
+- each row's lowercased tags as a bitmask (one or more uint64 words), so
+  tag overlap with a filter is a popcount over an integer array
+- coordinates (NaN when missing) and popularity as typed NumPy arrays
+
+``store[i]`` returns a ``DestinationView`` (a two-slot object) that decodes
+fields on access and supports ``row["tags"]`` / ``row.get("lat")`` like the
+original dicts, so only the rows a request touches are ever materialized.
+
+Usage (from ``src/``):
+    python -m api.destination_store --n 1000000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tracemalloc
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from features.bitops import popcount
+
+logger = logging.getLogger(__name__)
+
+
+def _pack_strings(strings: Iterable[str]) -> Tuple[bytes, np.ndarray]:
+    """Concatenate strings into one UTF-8 buffer; string i is buffer[offsets[i]:offsets[i + 1]]."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+def _intern(values: Iterable[str], vocabulary: List[str], ids: Dict[str, int]) -> List[int]:
+    out = []
+    for value in values:
+        if value not in ids:
+            ids[value] = len(vocabulary)
+            vocabulary.append(value)
+        out.append(ids[value])
+    return out
+
+
+class DestinationStore:
+    """Destinations in flat arrays and buffers; index with ``store[i]`` for a view."""
+
+    def __init__(self, records: Sequence[dict], bit_tags: Sequence[str] = ()):
+        """``bit_tags`` get the lowest tag bit positions (e.g. the tags offered as search filters)."""
+        n = len(records)
+        self.names, self.name_offsets = _pack_strings(r["destination"] for r in records)
+
+        self.countries: List[str] = []
+        self.country_ids = np.array(_intern((r["country"] for r in records), self.countries, {}), dtype=np.int32)
+
+        self.tag_vocabulary: List[str] = []
+        tag_index: Dict[str, int] = {}
+        self.tag_ids = np.array([tag for r in records for tag in _intern(r["tags"], self.tag_vocabulary, tag_index)],
+                                dtype=np.int32)
+        self.tag_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(r["tags"]) for r in records], out=self.tag_offsets[1:])
+
+        # Lowercased tag -> bit position; bit b of row i is word b // 64, bit b % 64 of tag_masks[i]
+        self.tag_bits: Dict[str, int] = {}
+        for tag in [*(t.lower() for t in bit_tags), *(t.lower() for t in self.tag_vocabulary)]:
+            self.tag_bits.setdefault(tag, len(self.tag_bits))
+        self.tag_masks = np.zeros((n, max(1, -(-len(self.tag_bits) // 64))), dtype=np.uint64)
+        bits = np.array([self.tag_bits[t.lower()] for t in self.tag_vocabulary], dtype=np.int64)[self.tag_ids]
+        rows = np.repeat(np.arange(n), np.diff(self.tag_offsets))
+        np.bitwise_or.at(self.tag_masks, (rows, bits // 64), np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)))
+
+        self.snippets, self.snippet_offsets = _pack_strings(s for r in records for s in r["snippets"])
+        self.row_snippets = np.zeros(n + 1, dtype=np.int64)  # row i owns snippets row_snippets[i]:row_snippets[i + 1]
+        np.cumsum([len(r["snippets"]) for r in records], out=self.row_snippets[1:])
+
+        self.lat = np.array([np.nan if r.get("lat") is None else r["lat"] for r in records], dtype=np.float64)
+        self.lon = np.array([np.nan if r.get("lon") is None else r["lon"] for r in records], dtype=np.float64)
+        self.popularity = np.array([r["popularity"] for r in records], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.popularity)
+
+    def __getitem__(self, index: int) -> "DestinationView":
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return DestinationView(self, index % len(self))
+
+    def __iter__(self):
+        return (DestinationView(self, i) for i in range(len(self)))
+
+    def name(self, index: int) -> str:
+        return self.names[self.name_offsets[index]:self.name_offsets[index + 1]].decode("utf-8")
+
+    def tags(self, index: int) -> List[str]:
+        ids = self.tag_ids[self.tag_offsets[index]:self.tag_offsets[index + 1]]
+        return [self.tag_vocabulary[i] for i in ids]
+
+    def tag_mask(self, tags: Iterable[str]) -> np.ndarray:
+        """Bitmask (one row of ``tag_masks``) of ``tags``; tags no destination has (any case) set no bit."""
+        mask = np.zeros(self.tag_masks.shape[1], dtype=np.uint64)
+        for tag in tags:
+            bit = self.tag_bits.get(tag)
+            if bit is not None:
+                mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask
+
+    def tag_overlap(self, mask: np.ndarray) -> np.ndarray:
+        """Per row, the number of lowercased tags whose bit is set in ``mask``."""
+        return popcount(self.tag_masks & mask).sum(axis=1, dtype=np.int64)
+
+    def row_snippet_texts(self, index: int) -> List[str]:
+        offsets = self.snippet_offsets
+        return [self.snippets[offsets[j]:offsets[j + 1]].decode("utf-8")
+                for j in range(self.row_snippets[index], self.row_snippets[index + 1])]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the store: buffers, arrays and the interned vocabularies."""
+        arrays = (self.name_offsets, self.country_ids, self.tag_ids, self.tag_offsets, self.tag_masks,
+                  self.snippet_offsets, self.row_snippets, self.lat, self.lon, self.popularity)
+        vocabularies = sum(sys.getsizeof(s) for s in self.countries + self.tag_vocabulary + list(self.tag_bits))
+        return (len(self.names) + len(self.snippets) + sum(a.nbytes for a in arrays) + vocabularies
+                + sys.getsizeof(self.countries) + sys.getsizeof(self.tag_vocabulary) + sys.getsizeof(self.tag_bits))
+
+
+# Fields a view exposes, readable as view.field or view["field"]
+VIEW_FIELDS = ("destination", "country", "lat", "lon", "tags", "popularity", "snippets")
+
+
+class DestinationView:
+    """One destination of a DestinationStore, decoded lazily; reads like the original dict."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: DestinationStore, index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def destination(self) -> str:
+        return self._store.name(self._index)
+
+    @property
+    def country(self) -> str:
+        return self._store.countries[self._store.country_ids[self._index]]
+
+    @property
+    def lat(self) -> Optional[float]:
+        value = self._store.lat[self._index]
+        return None if np.isnan(value) else float(value)
+
+    @property
+    def lon(self) -> Optional[float]:
+        value = self._store.lon[self._index]
+        return None if np.isnan(value) else float(value)
+
+    @property
+    def tags(self) -> List[str]:
+        return self._store.tags(self._index)
+
+    @property
+    def popularity(self) -> int:
+        return int(self._store.popularity[self._index])
+
+    @property
+    def snippets(self) -> List[str]:
+        return self._store.row_snippet_texts(self._index)
+
+    def __getitem__(self, key: str):
+        if key not in VIEW_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        value = self[key] if key in VIEW_FIELDS else None
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in VIEW_FIELDS}
+
+
+def synthetic_records(n: int, seed: int = 0) -> List[dict]:
+    """``n`` destinations shaped like the /search corpus (for memory measurements)."""
+    rng = random.Random(seed)
+    tags = ["mountain", "quiet", "local", "hiking", "coastal", "food", "markets", "kayak", "art", "history",
+            "river", "island", "scenic", "photography", "culture", "wildlife"]
+    countries = ["Nepal", "Vietnam", "Georgia", "Mexico", "Portugal", "Peru", "Japan", "Morocco"]
+    return [
+        {
+            "destination": f"Hidden Valley {i}",
+            "country": rng.choice(countries),
+            "lat": rng.uniform(-60, 60), "lon": rng.uniform(-180, 180),
+            "tags": rng.sample(tags, 5),
+            "popularity": rng.randint(50, 5000),
+            "snippets": [f"A quiet valley beyond the popular circuits, locals-only tea houses ({i}).",
+                         f"Yak pastures and dawn bells; rarely visited side routes ({i})."],
+        }
+        for i in range(n)
+    ]
+
+
+def measure_memory(n: int) -> Dict[str, float]:
+    """Traced allocation of ``n`` destinations as dicts vs. as a DestinationStore, in bytes."""
+    tracemalloc.start()
+    records = synthetic_records(n)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    store = DestinationStore(records)
+    store_bytes = tracemalloc.get_traced_memory()[0] - dict_bytes
+    tracemalloc.stop()
+    assert store[n - 1].to_dict() == {field: records[n - 1].get(field) for field in VIEW_FIELDS}
+    return {"dict_bytes": dict_bytes, "store_bytes": store_bytes, "store_nbytes": store.nbytes()}
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Measure destination corpus memory: dicts vs. DestinationStore")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Number of synthetic destinations")
+    args = parser.parse_args()
+
+    sizes = measure_memory(args.n)
+    logger.info(f"{args.n} destinations as dicts: {sizes['dict_bytes'] / 2**20:.1f} MiB "
+                f"({sizes['dict_bytes'] / args.n:.0f} B each)")
+    logger.info(f"{args.n} destinations in a DestinationStore: {sizes['store_bytes'] / 2**20:.1f} MiB "
+                f"({sizes['store_bytes'] / args.n:.0f} B each, {sizes['dict_bytes'] / sizes['store_bytes']:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
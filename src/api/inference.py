@@ -1,52 +1,253 @@
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
 import uuid
 import random
+import threading
+import numpy as np
+from features.dog_columns import profile_feature_columns
+from features.pair_features import DogFeatureStore, compute_pair_features
 from .schemas import (
     DogProfile, DogMatchRequest, CompatibilityResponse, 
-    SwipeAction
+    SwipeAction, BatchMatchRequest, BatchMatchResponse, ProfileMatches,
+    RankedMatch, TopMatchesResponse
 )
+from .match_store import PrecomputedMatches
+from .score_cache import ScoreCache, profile_hash
+from .seen_set import DogIdIndex, SeenSetRegistry
+from .swipe_store import SwipeStore, create_swipe_store
 
 # Load compatibility model (for now we'll create a mock model)
 # TODO: Replace with actual trained dog compatibility model
 MODEL_PATH = "models/trained/dog_compatibility_model.pkl"
 PREPROCESSOR_PATH = "models/trained/dog_preprocessor.pkl"
+# Part of every cache key; bump whenever scoring changes
+MODEL_VERSION = "rules-v1"
+# DogProfile traits are scored 1-5 (schemas.py); pair features expect the 1-10 training scale
+PROFILE_TRAIT_SCALE = 5
+
+class DogDatabase:
+    """
+    Dog profiles keyed by id, with a ``version`` bumped by every ``add``,
+    ``update`` and ``remove`` so caches derived from it (the candidate pool)
+    know when to rebuild. Profiles are copied in and out, so editing a dict
+    outside the database never changes what is stored; use ``update``.
+    """
+
+    def __init__(self):
+        self._dogs: Dict[str, dict] = {}
+        self.version = 0
+
+    def add(self, dog: dict) -> None:
+        """Insert a profile, replacing any profile with the same id."""
+        self._dogs[dog['id']] = dict(dog)
+        self.version += 1
+
+    def update(self, dog_id: str, **changes) -> dict:
+        """Replace a stored profile with an edited copy; KeyError if unknown."""
+        dog = self._dogs[dog_id] = {**self._dogs[dog_id], **changes}
+        self.version += 1
+        return dict(dog)
+
+    def remove(self, dog_id: str) -> None:
+        del self._dogs[dog_id]
+        self.version += 1
+
+    def get(self, dog_id: str) -> Optional[dict]:
+        dog = self._dogs.get(dog_id)
+        return dict(dog) if dog is not None else None
+
+    def profiles(self) -> List[dict]:
+        """Copies of every stored profile, in insertion order."""
+        return [dict(dog) for dog in self._dogs.values()]
+
+    def __len__(self) -> int:
+        return len(self._dogs)
 
 # Mock database for demonstration
-MOCK_DOG_DATABASE = []
-MATCH_HISTORY = {}  # Track likes/passes between dogs
+MOCK_DOG_DATABASE = DogDatabase()
+# Seed for the mock candidate pool used while the database is empty
+MOCK_POOL_SEED = int(os.getenv("MOCK_POOL_SEED", "42"))
+
+# Component scores keyed by (profile hash, candidate key, model version); the
+# candidate key includes a digest of the candidate's profile (see candidate_key)
+SCORE_CACHE = ScoreCache()
+
+COMPATIBILITY_WEIGHTS = {
+    'behavioral': 0.4,
+    'physical': 0.25,
+    'social': 0.25,
+    'location': 0.1
+}
+
+# Likes/passes between dogs live in a shared database (see swipe_store.py)
+_SWIPE_STORE = None
+_SWIPE_STORE_LOCK = threading.Lock()
+
+def get_swipe_store() -> SwipeStore:
+    """Return the process-wide swipe store, connecting on first use."""
+    global _SWIPE_STORE
+    if _SWIPE_STORE is None:
+        with _SWIPE_STORE_LOCK:
+            if _SWIPE_STORE is None:
+                _SWIPE_STORE = create_swipe_store()
+    return _SWIPE_STORE
+
+# Dogs each dog has already liked or passed, as compact integer sets
+DOG_IDS = DogIdIndex()
+SEEN_SETS = SeenSetRegistry(DOG_IDS, lambda dog_id: get_swipe_store().swiped_targets(dog_id))
+
+def candidate_key(dog: dict) -> str:
+    """Score cache key of a candidate: its id plus a digest of its profile, so edits never hit stale scores."""
+    return f"{dog['id']}:{profile_hash(json.dumps(dog, sort_keys=True, default=str))}"
+
+class CandidatePool:
+    """Candidate dogs together with their interned integer ids and score cache keys."""
+
+    def __init__(self, dogs: List[dict], version: Optional[int] = None):
+        self.dogs = dogs
+        self.version = version
+        self.ids = DOG_IDS.intern_many(dog['id'] for dog in dogs)
+        self.keys = [candidate_key(dog) for dog in dogs]
+        self._columns = None
+        self._feature_store = None
+
+    def columns(self) -> dict:
+        """Candidate traits as NumPy arrays for matrix scoring, built once per pool."""
+        if self._columns is None:
+            self._columns = trait_columns(self.dogs)
+        return self._columns
+
+    def feature_store(self) -> DogFeatureStore:
+        """Per-dog columns of features.pair_features, built once per pool."""
+        if self._feature_store is None:
+            self._feature_store = DogFeatureStore(
+                self.ids, profile_feature_columns(self.dogs, trait_scale=PROFILE_TRAIT_SCALE))
+        return self._feature_store
 
-def calculate_compatibility(request: DogMatchRequest) -> CompatibilityResponse:
+    def select(self, mask: np.ndarray) -> "CandidatePool":
+        pool = CandidatePool.__new__(CandidatePool)
+        pool.dogs = [self.dogs[i] for i in np.flatnonzero(mask)]
+        pool.version = self.version
+        pool.ids = self.ids[mask]
+        pool.keys = [self.keys[i] for i in np.flatnonzero(mask)]
+        pool._columns = None
+        pool._feature_store = None
+        return pool
+
+def trait_columns(dogs: List[dict]) -> dict:
+    """Dog traits as NumPy arrays, in the form the component scores broadcast over."""
+    return {
+        'energy_level': np.array([d['energy_level'] for d in dogs], dtype=float),
+        'playfulness': np.array([d['playfulness'] for d in dogs], dtype=float),
+        'training_level': np.array([d['training_level'] for d in dogs], dtype=float),
+        'size': np.array([SIZE_MAP.get(d['size'], 2) for d in dogs], dtype=float),
+        'age': np.array([d['age'] for d in dogs], dtype=float),
+        'good_with_dogs': np.array([d['good_with_dogs'] for d in dogs], dtype=bool),
+        'friendliness': np.array([d['friendliness'] for d in dogs], dtype=float),
+        'location': np.array([d['location'] for d in dogs], dtype=object),
+    }
+
+def candidate_pair_features(profile: dict, pool: CandidatePool, names: Optional[List[str]] = None) -> dict:
+    """
+    Pair features of ``profile`` against every candidate in ``pool``, one array
+    per feature; the same definitions the training pairs are generated with.
+    Ready for a trained model; the rule-based scoring below does not use it.
+    """
+    store = pool.feature_store()
+    rows = np.arange(len(store))
+    columns = profile_feature_columns([profile], trait_scale=PROFILE_TRAIT_SCALE)
+    dog = {name: np.repeat(values, len(rows)) for name, values in columns.items()}
+    return compute_pair_features(dog, store.gather(rows), names)
+
+def score_matrix(rows: dict, cols: dict) -> tuple:
+    """
+    Component and overall scores for every (row dog, column dog) pair, given
+    trait columns shaped to broadcast (e.g. rows as (n, 1) and cols as (m,)).
+    """
+    behavioral = _behavioral_scores(
+        rows['energy_level'], rows['playfulness'], rows['training_level'],
+        cols['energy_level'], cols['playfulness'], cols['training_level']
+    )
+    physical = _physical_scores(rows['size'], rows['age'], cols['size'], cols['age'])
+    social = _social_scores(
+        rows['good_with_dogs'], rows['friendliness'], cols['good_with_dogs'], cols['friendliness']
+    )
+    location = _location_scores(rows['location'], cols['location'])
+    overall = _overall_scores(behavioral, physical, social, location)
+    return behavioral, physical, social, location, overall
+
+_DATABASE_POOL = None
+_MOCK_POOL = None
+
+# Nightly top-N lists written by match_precompute.py
+PRECOMPUTED_MATCHES = PrecomputedMatches()
+
+def _load_candidate_pool() -> CandidatePool:
+    """Candidates to score: the dog database, or 3-8 seeded mock dogs while it is empty."""
+    global _DATABASE_POOL, _MOCK_POOL
+    if not MOCK_DOG_DATABASE:
+        if _MOCK_POOL is None:
+            rng = random.Random(MOCK_POOL_SEED)
+            _MOCK_POOL = CandidatePool([_generate_mock_target_dog(rng) for _ in range(rng.randint(3, 8))])
+        return _MOCK_POOL
+    # Re-intern only when the database has changed (any add, update or remove)
+    if _DATABASE_POOL is None or _DATABASE_POOL.version != MOCK_DOG_DATABASE.version:
+        _DATABASE_POOL = CandidatePool(MOCK_DOG_DATABASE.profiles(), MOCK_DOG_DATABASE.version)
+    return _DATABASE_POOL
+
+def calculate_compatibility(request: DogMatchRequest, seed: Optional[int] = None) -> CompatibilityResponse:
     """
     Calculate compatibility score between the input dog profile and potential matches.
     Uses ML-based scoring considering behavioral traits, physical characteristics, and preferences.
+    The mock target dog is drawn from ``seed`` (by default derived from the profile),
+    so identical requests always produce identical results.
     """
+    dog_hash = _profile_hash(request.dog_profile)
+    if seed is None:
+        seed = int(dog_hash[:16], 16)
+    # Generate a mock target dog for demonstration
+    return _score_candidate(request, _generate_mock_target_dog(random.Random(seed)), dog_hash)
+
+def _score_candidate(request: DogMatchRequest, target_dog: dict,
+                     dog_hash: Optional[str] = None, target_key: Optional[str] = None) -> CompatibilityResponse:
+    """Score the requesting dog against one candidate dog, memoized in SCORE_CACHE."""
     dog = request.dog_profile
+    key = (dog_hash or _profile_hash(dog), target_key or candidate_key(target_dog), MODEL_VERSION)
+    scores = SCORE_CACHE.get(key)
     
-    # Generate a mock target dog for demonstration
-    target_dog = _generate_mock_target_dog()
-    
-    # Calculate compatibility components
-    behavioral_score = _calculate_behavioral_compatibility(dog, target_dog)
-    physical_score = _calculate_physical_compatibility(dog, target_dog)
-    social_score = _calculate_social_compatibility(dog, target_dog)
-    location_score = _calculate_location_compatibility(dog, target_dog)
-    
-    # Weighted overall compatibility score
-    weights = {
-        'behavioral': 0.4,
-        'physical': 0.25,
-        'social': 0.25,
-        'location': 0.1
-    }
+    if scores is None:
+        # Calculate compatibility components
+        behavioral_score = _calculate_behavioral_compatibility(dog, target_dog)
+        physical_score = _calculate_physical_compatibility(dog, target_dog)
+        social_score = _calculate_social_compatibility(dog, target_dog)
+        location_score = _calculate_location_compatibility(dog, target_dog)
+        
+        # Weighted overall compatibility score
+        overall_score = _overall_scores(behavioral_score, physical_score, social_score, location_score)
+        scores = (behavioral_score, physical_score, social_score, location_score, overall_score)
+        SCORE_CACHE.put(key, scores)
     
-    overall_score = (
-        behavioral_score * weights['behavioral'] +
-        physical_score * weights['physical'] +
-        social_score * weights['social'] +
-        location_score * weights['location']
+    return _build_response(target_dog, *scores, request.max_distance, dog.location)
+
+def _profile_hash(profile: DogProfile) -> str:
+    return profile_hash(profile.model_dump_json())
+
+def _overall_scores(behavioral, physical, social, location):
+    """Weighted overall compatibility; works on scalars and score matrices alike."""
+    return (
+        behavioral * COMPATIBILITY_WEIGHTS['behavioral'] +
+        physical * COMPATIBILITY_WEIGHTS['physical'] +
+        social * COMPATIBILITY_WEIGHTS['social'] +
+        location * COMPATIBILITY_WEIGHTS['location']
     )
-    
+
+def _build_response(target_dog: dict, behavioral_score: float, physical_score: float,
+                    social_score: float, location_score: float, overall_score: float,
+                    max_distance: float, location: str) -> CompatibilityResponse:
+    """Assemble the API response for one scored candidate."""
     # Generate match reasons
     match_reasons = _generate_match_reasons(
         behavioral_score, physical_score, social_score, location_score
@@ -63,7 +264,7 @@ def calculate_compatibility(request: DogMatchRequest) -> CompatibilityResponse:
             'location': round(location_score, 3),
             'overall': round(overall_score, 3)
         },
-        distance_miles=round(random.uniform(0.5, request.max_distance), 1),
+        distance_miles=round(_distance_miles(location, target_dog, max_distance), 1),
         match_reasons=match_reasons,
         prediction_time=datetime.now()
     )
@@ -73,10 +274,15 @@ def find_matches(request: DogMatchRequest) -> List[CompatibilityResponse]:
     Find multiple compatible dog matches based on the request criteria.
     """
     matches = []
-    num_matches = random.randint(3, 8)  # Generate 3-8 potential matches
+    pool = _load_candidate_pool()
+    dog_hash = _profile_hash(request.dog_profile)
+    
+    # Drop dogs this dog has already liked or passed before scoring anything
+    if request.dog_id is not None:
+        pool = pool.select(SEEN_SETS.unseen_mask(request.dog_id, pool.ids))
     
-    for _ in range(num_matches):
-        compatibility = calculate_compatibility(request)
+    for target_dog, target_key in zip(pool.dogs, pool.keys):
+        compatibility = _score_candidate(request, target_dog, dog_hash, target_key)
         
         # Only include matches above minimum compatibility score
         if compatibility.compatibility_score >= request.min_compatibility_score:
@@ -87,18 +293,71 @@ def find_matches(request: DogMatchRequest) -> List[CompatibilityResponse]:
     
     return matches
 
+def find_matches_batch(request: BatchMatchRequest) -> BatchMatchResponse:
+    """
+    Rank matches for several profiles (e.g. a multi-dog household) in one pass.
+    The candidate pool is fetched once and every profile is scored against it
+    as a profiles x candidates matrix using the same component formulas.
+    """
+    criteria = request.criteria
+    pool = _load_candidate_pool()
+    cand = pool.columns()
+    profiles = request.profiles
+    
+    # Profile traits as column vectors so they broadcast against candidate rows
+    rows = {name: values[:, np.newaxis]
+            for name, values in trait_columns([_profile_record(p) for p in profiles]).items()}
+    behavioral, physical, social, location, overall = score_matrix(rows, cand)
+    overall = np.round(overall, 3)
+    
+    eligible = overall >= criteria.min_compatibility_score
+    # Drop dogs each profile has already liked or passed
+    for row, dog_id in enumerate(request.dog_ids or []):
+        if dog_id is not None:
+            eligible[row] &= SEEN_SETS.unseen_mask(dog_id, pool.ids)
+    
+    results = []
+    for row, profile in enumerate(profiles):
+        keep = np.flatnonzero(eligible[row])
+        # Sort by compatibility score (highest first)
+        ranked = keep[np.argsort(-overall[row, keep], kind='stable')]
+        matches = [
+            _build_response(
+                pool.dogs[col], float(behavioral[row, col]), float(physical[row, col]),
+                float(social[row, col]), float(location[row, col]), float(overall[row, col]),
+                criteria.max_distance, profile.location
+            )
+            for col in ranked
+        ]
+        results.append(ProfileMatches(dog_name=profile.name, matches=matches))
+    
+    return BatchMatchResponse(results=results)
+
+def get_precomputed_matches(dog_id: str, limit: int = 20) -> Optional[TopMatchesResponse]:
+    """
+    Serve a dog's precomputed top matches straight from the store, skipping
+    dogs it has swiped on since the lists were built. None if not precomputed.
+    """
+    top = PRECOMPUTED_MATCHES.top_matches(dog_id)
+    if top is None:
+        return None
+    candidate_ids, scores = top
+    unseen = SEEN_SETS.unseen_mask(dog_id, DOG_IDS.intern_many(candidate_ids.tolist()))
+    matches = [
+        RankedMatch(dog_id=candidate_id, compatibility_score=round(score, 3))
+        for candidate_id, score in zip(candidate_ids[unseen][:limit].tolist(), scores[unseen][:limit].tolist())
+    ]
+    return TopMatchesResponse(dog_id=dog_id, matches=matches)
+
 def process_swipe(swipe: SwipeAction) -> dict:
     """
     Process a swipe action (like or pass) and check for mutual matches.
     """
-    # Record the swipe in match history
-    swipe_key = f"{swipe.user_dog_id}_{swipe.target_dog_id}"
-    reverse_swipe_key = f"{swipe.target_dog_id}_{swipe.user_dog_id}"
-    
-    MATCH_HISTORY[swipe_key] = {
-        'action': swipe.action,
-        'timestamp': swipe.timestamp
-    }
+    # Record the swipe and check for a mutual like in a single atomic step
+    match_id = get_swipe_store().record_swipe(
+        swipe.user_dog_id, swipe.target_dog_id, swipe.action, swipe.timestamp
+    )
+    SEEN_SETS.record(swipe.user_dog_id, swipe.target_dog_id)
     
     result = {
         'swipe_recorded': True,
@@ -106,13 +365,8 @@ def process_swipe(swipe: SwipeAction) -> dict:
         'match_created': False
     }
     
-    # Check if this creates a mutual match (both dogs liked each other)
-    if (swipe.action == 'like' and 
-        reverse_swipe_key in MATCH_HISTORY and 
-        MATCH_HISTORY[reverse_swipe_key]['action'] == 'like'):
-        
-        # Create a match!
-        match_id = str(uuid.uuid4())
+    # Both dogs liked each other
+    if match_id is not None:
         result.update({
             'match_created': True,
             'match_id': match_id,
@@ -121,75 +375,113 @@ def process_swipe(swipe: SwipeAction) -> dict:
     
     return result
 
-def _generate_mock_target_dog() -> dict:
-    """Generate a mock target dog for demonstration purposes."""
+def _generate_mock_target_dog(rng: Optional[random.Random] = None) -> dict:
+    """Generate a mock target dog for demonstration purposes (reproducible with a seeded ``rng``)."""
+    rng = rng or random.Random()
     breeds = ['Labrador', 'Golden Retriever', 'German Shepherd', 'Beagle', 'Bulldog', 'Poodle', 'Mixed Breed']
     sizes = ['small', 'medium', 'large', 'giant']
     locations = ['Downtown', 'Suburbs', 'Uptown', 'Riverside', 'Park District']
     
     return {
-        'id': str(uuid.uuid4()),
-        'name': random.choice(['Buddy', 'Luna', 'Charlie', 'Bella', 'Max', 'Daisy', 'Cooper']),
-        'breed': random.choice(breeds),
-        'age': random.randint(1, 12),
-        'size': random.choice(sizes),
-        'weight': random.uniform(10, 150),
-        'energy_level': random.randint(1, 5),
-        'friendliness': random.randint(1, 5),
-        'playfulness': random.randint(1, 5),
-        'training_level': random.randint(1, 5),
-        'good_with_dogs': random.choice([True, False]),
-        'good_with_kids': random.choice([True, False]),
-        'good_with_cats': random.choice([True, False]),
-        'location': random.choice(locations)
+        'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'name': rng.choice(['Buddy', 'Luna', 'Charlie', 'Bella', 'Max', 'Daisy', 'Cooper']),
+        'breed': rng.choice(breeds),
+        'age': rng.randint(1, 12),
+        'size': rng.choice(sizes),
+        'weight': rng.uniform(10, 150),
+        'energy_level': rng.randint(1, 5),
+        'friendliness': rng.randint(1, 5),
+        'playfulness': rng.randint(1, 5),
+        'training_level': rng.randint(1, 5),
+        'good_with_dogs': rng.choice([True, False]),
+        'good_with_kids': rng.choice([True, False]),
+        'good_with_cats': rng.choice([True, False]),
+        'location': rng.choice(locations)
     }
 
-def _calculate_behavioral_compatibility(dog1: DogProfile, dog2: dict) -> float:
-    """Calculate behavioral compatibility score between two dogs."""
+SIZE_MAP = {'small': 1, 'medium': 2, 'large': 3, 'giant': 4}
+
+# The component scores below take scalars or broadcastable NumPy arrays, so the
+# same formulas score one pair or a whole profiles x candidates matrix.
+def _behavioral_scores(energy1, play1, training1, energy2, play2, training2):
+    """Behavioral compatibility from energy, playfulness and training levels."""
     # Energy level compatibility (closer levels are better)
-    energy_diff = abs(dog1.energy_level - dog2['energy_level'])
-    energy_score = max(0, (5 - energy_diff) / 5)
+    energy_score = np.maximum(0, (5 - np.abs(energy1 - energy2)) / 5)
     
     # Playfulness compatibility
-    play_diff = abs(dog1.playfulness - dog2['playfulness'])
-    play_score = max(0, (5 - play_diff) / 5)
+    play_score = np.maximum(0, (5 - np.abs(play1 - play2)) / 5)
     
     # Training level (well-trained dogs often get along better)
-    training_score = (dog1.training_level + dog2['training_level']) / 10
+    training_score = (training1 + training2) / 10
     
     return (energy_score + play_score + training_score) / 3
 
-def _calculate_physical_compatibility(dog1: DogProfile, dog2: dict) -> float:
-    """Calculate physical compatibility based on size and age."""
+def _physical_scores(size1, age1, size2, age2):
+    """Physical compatibility from numeric size codes (see SIZE_MAP) and ages."""
     # Size compatibility (similar sizes often play better together)
-    size_map = {'small': 1, 'medium': 2, 'large': 3, 'giant': 4}
-    size1 = size_map.get(dog1.size, 2)
-    size2 = size_map.get(dog2['size'], 2)
-    size_diff = abs(size1 - size2)
-    size_score = max(0, (4 - size_diff) / 4)
+    size_score = np.maximum(0, (4 - np.abs(size1 - size2)) / 4)
     
     # Age compatibility (similar ages often have similar energy)
-    age_diff = abs(dog1.age - dog2['age'])
-    age_score = max(0, (10 - age_diff) / 10)
+    age_score = np.maximum(0, (10 - np.abs(age1 - age2)) / 10)
     
     return (size_score + age_score) / 2
 
+def _social_scores(good_with_dogs1, friendliness1, good_with_dogs2, friendliness2):
+    """Social compatibility; low but not zero unless both are good with dogs."""
+    # Friendliness levels, with a bonus for being good with dogs
+    friendly_score = np.minimum(1.0, (friendliness1 + friendliness2) / 10 + 0.3)
+    return np.where(np.logical_and(good_with_dogs1, good_with_dogs2), friendly_score, 0.3)
+
+def _calculate_behavioral_compatibility(dog1: DogProfile, dog2: dict) -> float:
+    """Calculate behavioral compatibility score between two dogs."""
+    return float(_behavioral_scores(
+        dog1.energy_level, dog1.playfulness, dog1.training_level,
+        dog2['energy_level'], dog2['playfulness'], dog2['training_level']
+    ))
+
+def _calculate_physical_compatibility(dog1: DogProfile, dog2: dict) -> float:
+    """Calculate physical compatibility based on size and age."""
+    return float(_physical_scores(
+        SIZE_MAP.get(dog1.size, 2), dog1.age, SIZE_MAP.get(dog2['size'], 2), dog2['age']
+    ))
+
 def _calculate_social_compatibility(dog1: DogProfile, dog2: dict) -> float:
     """Calculate social compatibility based on social preferences."""
-    # Both must be good with dogs for high compatibility
-    if not (dog1.good_with_dogs and dog2['good_with_dogs']):
-        return 0.3  # Low but not zero compatibility
-    
-    # Friendliness levels
-    friendliness_avg = (dog1.friendliness + dog2['friendliness']) / 10
-    
-    return min(1.0, friendliness_avg + 0.3)  # Bonus for being good with dogs
+    return float(_social_scores(
+        dog1.good_with_dogs, dog1.friendliness, dog2['good_with_dogs'], dog2['friendliness']
+    ))
+
+def _stable_unit(*parts: str) -> float:
+    """Deterministic pseudo-random value in [0, 1) for the given key parts."""
+    h = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    return int(h[:8], 16) / 0x100000000
+
+def _location_scores(location1, location2):
+    """
+    Location-based compatibility (mock implementation): 1.0 within the same
+    area, otherwise a stable per-area-pair value in [0.6, 0.9).
+    """
+    # In a real system, this would use geographic distance calculation.
+    # Score each distinct pair of areas once, then gather into the full shape.
+    areas1, codes1 = np.unique(np.asarray(location1, dtype=object), return_inverse=True)
+    areas2, codes2 = np.unique(np.asarray(location2, dtype=object), return_inverse=True)
+    table = np.array([
+        [1.0 if a == b else 0.6 + 0.3 * _stable_unit(*sorted((a, b))) for b in areas2]
+        for a in areas1
+    ]).reshape(len(areas1), len(areas2))
+    return table[codes1.reshape(np.shape(location1)), codes2.reshape(np.shape(location2))]
+
+def _distance_miles(location: str, target_dog: dict, max_distance: float) -> float:
+    """Mock distance to a candidate, stable for a given (area, candidate) pair."""
+    return 0.5 + (max_distance - 0.5) * _stable_unit(location, target_dog['id'])
 
 def _calculate_location_compatibility(dog1: DogProfile, dog2: dict) -> float:
     """Calculate location-based compatibility (mock implementation)."""
-    # For demonstration, assume random compatibility based on location
-    # In a real system, this would use geographic distance calculation
-    return random.uniform(0.6, 1.0)
+    return float(_location_scores(dog1.location, dog2['location']))
+
+def _profile_record(profile: DogProfile) -> dict:
+    """A request profile in the same dict shape as candidate dogs."""
+    return profile.model_dump()
 
 def _generate_match_reasons(behavioral: float, physical: float, social: float, location: float) -> List[str]:
     """Generate human-readable match reasons based on compatibility scores."""
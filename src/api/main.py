@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import hashlib
+import heapq
+import json
 import math
 import re
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 
-from fastapi import FastAPI
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+from .destination_store import DestinationStore, DestinationView
+from .inference import find_matches_batch, get_precomputed_matches
+from .schemas import BatchMatchRequest, BatchMatchResponse, TopMatchesResponse
+
 app = FastAPI(title="Off-the-Beaten-Path Travel API")
 
 # ----------------------------
@@ -18,6 +30,13 @@ NEG_CUES = ["bucket list", "must-see", "tourist hotspot", "crowded"]
 
 TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z\-']{2,}")
 
+# Tags the UI offers as geotype / culture / experience filters; they get the lowest tag bits
+FILTER_TAGS = [
+    "coastal", "mountain", "island", "urban", "desert", "forest", "river", "lake",
+    "food", "art", "history", "music", "markets", "festivals", "crafts",
+    "quiet", "nightlife", "adventure", "local", "hiking", "kayak", "wildlife", "scenic", "photography",
+]
+
 # ----------------------------
 # Tiny in-memory "corpus"
 # Replace with your IR index later
@@ -70,9 +89,28 @@ CORPUS = [
     },
 ]
 
+# context_signal is 0.5 + tanh(.) * 0.25, so never above this
+CONTEXT_SIGNAL_MAX = 0.75
+
 # Precompute a "bloomish" set: top-N by popularity
 BLOOM_THRESHOLD = 1000  # anything above is considered too popular
-BLOOM_SET = {row["destination"] for row in CORPUS if row["popularity"] >= BLOOM_THRESHOLD}
+
+# Serving copy of the corpus and what is derived from it, set by load_corpus
+DESTINATIONS: DestinationStore = None
+BLOOM_SET: set = set()
+POPULARITY_RANGE = (0, 0)
+
+
+def load_corpus(records: List[dict]) -> None:
+    """Replace the searchable corpus with ``records`` (dicts shaped like CORPUS entries)."""
+    global DESTINATIONS, BLOOM_SET, POPULARITY_RANGE
+    DESTINATIONS = DestinationStore(records, bit_tags=FILTER_TAGS)
+    popularity = DESTINATIONS.popularity
+    BLOOM_SET = {DESTINATIONS.name(i) for i in np.flatnonzero(popularity >= BLOOM_THRESHOLD)}
+    POPULARITY_RANGE = (int(popularity.min()), int(popularity.max())) if len(popularity) else (0, 0)
+
+
+load_corpus(CORPUS)
 
 
 # ----------------------------
@@ -83,6 +121,7 @@ class Filters(BaseModel):
     culture: List[str] = []
     experience: List[str] = []
     min_confidence: float = 0.0
+    strict: bool = False  # drop destinations matching none of the selected attributes
 
 
 class Retrieval(BaseModel):
@@ -98,8 +137,10 @@ class Retrieval(BaseModel):
 class SearchRequest(BaseModel):
     query: str
     filters: Filters
-    retrieval: Retrieval
+    retrieval: Retrieval  # retrieval.k is the page size
     ui: Optional[Dict] = None
+    cursor: Optional[str] = None  # next_cursor of the previous page
+    fields: Optional[List[str]] = None  # Result fields to return; default all (see MAP_FIELDS)
 
 
 class Result(BaseModel):
@@ -120,6 +161,41 @@ class SearchResponse(BaseModel):
     query: str
     params: Dict[str, object]
     results: List[Result]
+    total: Optional[int] = None  # results across all pages
+    next_cursor: Optional[str] = None  # pass as `cursor` for the next page; None on the last page
+
+
+@dataclass
+class ResultRecord:
+    """
+    A ``Result`` as a plain slotted record. Search responses are built from
+    these and encoded directly by FastJSONResponse; ``Result`` and
+    ``SearchResponse`` remain the documented schema.
+    """
+    __slots__ = ("destination", "country", "lat", "lon", "score", "confidence", "trend_delta",
+                 "tags", "context_cues", "snippets", "why")
+    destination: str
+    country: str
+    lat: Optional[float]
+    lon: Optional[float]
+    score: float
+    confidence: Optional[float]
+    trend_delta: Optional[float]
+    tags: List[str]
+    context_cues: Dict[str, Dict[str, int]]
+    snippets: List[str]
+    why: Dict[str, object]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, which serializes dataclasses such as ResultRecord natively."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+# Projection for map rendering: destination (the result id), score and coordinates
+MAP_FIELDS = ["destination", "score", "confidence", "lat", "lon"]
 
 
 # ----------------------------
@@ -139,14 +215,23 @@ def cue_counts(texts: List[str]) -> Dict[str, Dict[str, int]]:
     return {"positive": pos, "negative": neg}
 
 
-def attribute_score(filters: Filters, tags: List[str]) -> float:
-    """Match user-selected attributes to destination tags."""
+def attribute_scores(filters: Filters) -> tuple:
+    """
+    Match user-selected attributes to destination tags, for the whole corpus:
+    (score per destination, indices of the destinations to rank).
+
+    The score is the share of selected attributes among a destination's
+    lowercased tags, from a popcount of the tag bitmasks against the filters
+    compiled once into a mask. With ``filters.strict`` destinations matching
+    none of them are dropped up front.
+    """
     want = set([*filters.geotype, *filters.culture, *filters.experience])
     if not want:
-        return 0.5  # neutral if no explicit filters
-    have = set(t.lower() for t in tags)
-    inter = len(want & have)
-    return inter / max(1, len(want))
+        # neutral if no explicit filters
+        return np.full(len(DESTINATIONS), 0.5), np.arange(len(DESTINATIONS))
+    overlap = DESTINATIONS.tag_overlap(DESTINATIONS.tag_mask(want))
+    rows = np.flatnonzero(overlap) if filters.strict else np.arange(len(DESTINATIONS))
+    return overlap / max(1, len(want)), rows
 
 
 def query_term_score(query: str, texts: List[str]) -> float:
@@ -177,8 +262,7 @@ def zipf_penalty(popularity: int, strength: float, tier_bucketing: bool) -> floa
     popularity is a proxy for rank/frequency (bigger => more popular).
     """
     # normalize popularity roughly (0..1) over corpus
-    pops = [r["popularity"] for r in CORPUS]
-    pmin, pmax = min(pops), max(pops)
+    pmin, pmax = POPULARITY_RANGE
     if pmax == pmin:
         base = 0.0
     else:
@@ -207,6 +291,177 @@ def deterministic_trend(name: str, date_range: str) -> float:
     return (val - 0.5) * 0.4  # -0.2..+0.2
 
 
+def ranking_weights(model: str) -> tuple:
+    """(attribute, context, query) weights; BM25/TF-IDF lean on text."""
+    # weights tuned lightly; tweak as you evaluate
+    if model == "attribute+context":
+        return 0.5, 0.35, 0.15
+    return 0.2, 0.2, 0.6
+
+
+def score_destination(req: SearchRequest, row: DestinationView, a: float, w_attr: float, w_ctx: float,
+                      w_qry: float) -> Optional[tuple]:
+    """
+    Ranked entry (score, row, base, confidence, context, term overlap, penalty)
+    for one destination with attribute score ``a``, or None if the Bloom or
+    confidence filter drops it.
+    """
+    snippets = row.snippets  # decoded once per row
+    # Bloom filter exclusion
+    if req.retrieval.use_bloom and row.destination in BLOOM_SET:
+        # allow through only if strong positive context present (escape hatch)
+        cues = cue_counts(snippets)
+        pos_count = sum(cues["positive"].values()) if cues["positive"] else 0
+        if pos_count < 1:
+            # skip this row
+            return None
+
+    c = context_signal(snippets)
+    q = query_term_score(req.query, snippets)
+
+    base = w_attr * a + w_ctx * c + w_qry * q  # 0..~1 (roughly)
+    penalty = zipf_penalty(row.popularity, req.retrieval.zipf_penalty, req.retrieval.tier_bucketing)
+    score = round(max(0.0, base * (1.0 - penalty)), 4)
+
+    conf = max(0.0, min(1.0, base))  # simple placeholder
+    if conf < req.filters.min_confidence:
+        return None
+    return score, row, base, conf, c, q, penalty
+
+
+def rank_destinations(req: SearchRequest, w_attr: float, w_ctx: float, w_qry: float) -> List[tuple]:
+    """Every destination that passes the filters as ``score_destination`` entries, best first."""
+    scores, rows = attribute_scores(req.filters)
+    ranked = [entry for entry in (score_destination(req, DESTINATIONS[i], float(scores[i]), w_attr, w_ctx, w_qry)
+                                  for i in rows.tolist())
+              if entry is not None]
+    # sort by score desc (stable, so ties keep corpus order and pages do not shift)
+    ranked.sort(key=lambda entry: entry[0], reverse=True)
+    return ranked
+
+
+def score_upper_bound(req: SearchRequest, popularity: int, a: float, w_attr: float, w_ctx: float,
+                      w_qry: float) -> float:
+    """
+    Largest score a destination can get, from the cheap attribute (``a``) and
+    popularity terms only: the text-based context and query terms are taken
+    at their maxima.
+    """
+    base = w_attr * a + w_ctx * CONTEXT_SIGNAL_MAX + w_qry * 1.0
+    penalty = zipf_penalty(popularity, req.retrieval.zipf_penalty, req.retrieval.tier_bucketing)
+    return round(max(0.0, base * (1.0 - penalty)), 4)
+
+
+def iter_ranked(req: SearchRequest, w_attr: float, w_ctx: float, w_qry: float):
+    """
+    Yield ``score_destination`` entries in final ranking order as soon as
+    each one is settled, i.e. no unscored destination can still outrank it.
+    Destinations are scored in descending upper-bound order and held in a
+    heap until their score beats the next bound (threshold algorithm).
+    """
+    scores, rows = attribute_scores(req.filters)
+    popularity = DESTINATIONS.popularity
+    bounds = sorted(((score_upper_bound(req, int(popularity[i]), float(scores[i]), w_attr, w_ctx, w_qry), i)
+                     for i in rows.tolist()),
+                    key=lambda bound: (-bound[0], bound[1]))
+    ready = []  # (-score, corpus index, entry): ties keep corpus order, as in rank_destinations
+    for position, (_, i) in enumerate(bounds):
+        entry = score_destination(req, DESTINATIONS[i], float(scores[i]), w_attr, w_ctx, w_qry)
+        if entry is not None:
+            heapq.heappush(ready, (-entry[0], i, entry))
+        next_bound = bounds[position + 1][0] if position + 1 < len(bounds) else -1.0
+        while ready and -ready[0][0] > next_bound:
+            yield heapq.heappop(ready)[2]
+    while ready:
+        yield heapq.heappop(ready)[2]
+
+
+def build_result(req: SearchRequest, entry: tuple, fields: Optional[set] = None):
+    """
+    Result for one ranked entry as a ``ResultRecord``, or with ``fields`` a
+    dict of just those fields (in schema order).
+    """
+    score, row, base, conf, c, q, penalty = entry
+    if fields is not None and fields <= _CHEAP_FIELDS:
+        values = {"destination": row["destination"], "country": row["country"],
+                  "lat": row.get("lat"), "lon": row.get("lon"), "score": score, "confidence": round(conf, 4)}
+        return {name: values[name] for name in ResultRecord.__slots__ if name in fields}
+
+    trend = deterministic_trend(row["destination"], req.retrieval.date_range) if req.retrieval.use_trends else None
+    result = ResultRecord(
+        destination=row["destination"],
+        country=row["country"],
+        lat=row.get("lat"),
+        lon=row.get("lon"),
+        score=score,
+        confidence=round(conf, 4),
+        trend_delta=round(trend, 3) if trend is not None else None,
+        tags=row["tags"],
+        context_cues=cue_counts(row["snippets"]),
+        snippets=row["snippets"],
+        why={
+            "attribute_match": {k: 1.0 for k in set(req.filters.geotype + req.filters.culture + req.filters.experience) if k in row["tags"]},
+            "context_score": round(c, 3),
+            "term_overlap": round(q, 3),
+            "bloom_filtered": row["destination"] in BLOOM_SET and req.retrieval.use_bloom,
+            "zipf_penalty_applied": round(penalty, 3),
+        },
+    )
+    if fields is None:
+        return result
+    return {name: getattr(result, name) for name in ResultRecord.__slots__ if name in fields}
+
+
+# Fields build_result can fill without scoring cues, trends or explanations
+_CHEAP_FIELDS = {"destination", "country", "lat", "lon", "score", "confidence"}
+
+
+def _projection(fields: Optional[List[str]]) -> Optional[set]:
+    """Validated ``fields`` projection; destination is always included as the result id."""
+    if fields is None:
+        return None
+    unknown = set(fields) - set(Result.model_fields)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown result fields: {sorted(unknown)}")
+    return set(fields) | {"destination"}
+
+
+def search_params(req: SearchRequest, w_attr: float, w_ctx: float, w_qry: float) -> Dict[str, object]:
+    """Resolved parameters echoed back as diagnostics."""
+    return {
+        "filters": req.filters.model_dump(),
+        "retrieval": req.retrieval.model_dump(),
+        "weights": {"attribute": w_attr, "context": w_ctx, "query": w_qry},
+        "bloom_threshold": BLOOM_THRESHOLD,
+    }
+
+
+def search_fingerprint(req: SearchRequest) -> str:
+    """Hash of everything that determines the ranking (not the page size, cursor or projection)."""
+    key = {
+        "query": req.query,
+        "filters": req.filters.model_dump(),
+        "retrieval": req.retrieval.model_dump(exclude={"k"}),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{fingerprint}".encode()).decode()
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """Offset stored in ``cursor``; 400 for malformed cursors or ones from a different search."""
+    try:
+        offset, cursor_fingerprint = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+    if cursor_fingerprint != fingerprint or offset < 0:
+        raise HTTPException(status_code=400, detail="Cursor does not belong to this search")
+    return offset
+
+
 # ----------------------------
 # API
 # ----------------------------
@@ -215,7 +470,25 @@ def health():
     return {"status": "ok"}
 
 
-@app.post("/search", response_model=SearchResponse)
+@app.post("/match/batch", response_model=BatchMatchResponse)
+def match_batch(req: BatchMatchRequest):
+    """
+    Rank matches for up to 10 dog profiles (e.g. one household) in one pass:
+    the candidate pool is fetched once and scored as a profiles x candidates matrix.
+    """
+    return find_matches_batch(req)
+
+
+@app.get("/match/{dog_id}/top", response_model=TopMatchesResponse)
+def match_top(dog_id: str, limit: int = 20):
+    """Serve a dog's precomputed top matches (see api/match_precompute.py)."""
+    top = get_precomputed_matches(dog_id, limit)
+    if top is None:
+        raise HTTPException(status_code=404, detail=f"No precomputed matches for dog {dog_id}")
+    return top
+
+
+@app.post("/search", response_model=SearchResponse, response_class=FastJSONResponse)
 def search(req: SearchRequest):
     """
     Ranking formula (simple but aligned with your write-up):
@@ -227,75 +500,67 @@ def search(req: SearchRequest):
     Then apply penalties/filters:
       - Bloom filter: drop very popular destinations if user enabled it
       - Zipf penalty: score *= (1 - penalty)
+      - Strict filters: drop destinations matching no selected attribute
 
     Confidence ~ clipped(base) for now.
+
+    Results are paged by ``retrieval.k``: pass ``next_cursor`` back as
+    ``cursor`` for the next page. ``fields`` limits each result to the named
+    fields (e.g. MAP_FIELDS for map rendering).
     """
-    # weights tuned lightly; tweak as you evaluate
-    w_attr = 0.5 if req.retrieval.model == "attribute+context" else 0.2
-    w_ctx  = 0.35 if req.retrieval.model == "attribute+context" else 0.2
-    w_qry  = 0.15 if req.retrieval.model == "attribute+context" else 0.6  # BM25/TF-IDF lean on text
-
-    results: List[Result] = []
-
-    for row in CORPUS:
-        # Bloom filter exclusion
-        if req.retrieval.use_bloom and row["destination"] in BLOOM_SET:
-            # allow through only if strong positive context present (escape hatch)
-            cues = cue_counts(row["snippets"])
-            pos_count = sum(cues["positive"].values()) if cues["positive"] else 0
-            if pos_count < 1:
-                # skip this row
-                continue
-
-        a = attribute_score(req.filters, row["tags"])
-        c = context_signal(row["snippets"])
-        q = query_term_score(req.query, row["snippets"])
-
-        base = w_attr * a + w_ctx * c + w_qry * q  # 0..~1 (roughly)
-        penalty = zipf_penalty(row["popularity"], req.retrieval.zipf_penalty, req.retrieval.tier_bucketing)
-        score = max(0.0, base * (1.0 - penalty))
-
-        conf = max(0.0, min(1.0, base))  # simple placeholder
-        if conf < req.filters.min_confidence:
-            continue
-
-        trend = deterministic_trend(row["destination"], req.retrieval.date_range) if req.retrieval.use_trends else None
-        cues = cue_counts(row["snippets"])
-
-        results.append(
-            Result(
-                destination=row["destination"],
-                country=row["country"],
-                lat=row.get("lat"),
-                lon=row.get("lon"),
-                score=round(score, 4),
-                confidence=round(conf, 4),
-                trend_delta=round(trend, 3) if trend is not None else None,
-                tags=row["tags"],
-                context_cues=cues,
-                snippets=row["snippets"],
-                why={
-                    "attribute_match": {k: 1.0 for k in set(req.filters.geotype + req.filters.culture + req.filters.experience) if k in row["tags"]},
-                    "context_score": round(c, 3),
-                    "term_overlap": round(q, 3),
-                    "bloom_filtered": row["destination"] in BLOOM_SET and req.retrieval.use_bloom,
-                    "zipf_penalty_applied": round(penalty, 3),
-                },
-            )
-        )
-
-    # sort by score desc and trim to k
-    results.sort(key=lambda r: r.score, reverse=True)
-    results = results[: max(1, req.retrieval.k)]
-
-    # Build response
-    return SearchResponse(
-        query=req.query,
-        params={
-            "filters": req.filters.model_dump(),
-            "retrieval": req.retrieval.model_dump(),
-            "weights": {"attribute": w_attr, "context": w_ctx, "query": w_qry},
-            "bloom_threshold": BLOOM_THRESHOLD,
-        },
-        results=results,
-    )
+    w_attr, w_ctx, w_qry = ranking_weights(req.retrieval.model)
+    fields = _projection(req.fields)
+    ranked = rank_destinations(req, w_attr, w_ctx, w_qry)
+
+    # Page through the ranking; the cursor is only valid for the same search
+    fingerprint = search_fingerprint(req)
+    offset = decode_cursor(req.cursor, fingerprint) if req.cursor else 0
+    page_size = max(1, req.retrieval.k)
+    page = ranked[offset: offset + page_size]
+    end = offset + len(page)
+
+    # Build response: returned as a Response, so FastAPI does not re-validate it against SearchResponse
+    return FastJSONResponse({
+        "query": req.query,
+        "params": search_params(req, w_attr, w_ctx, w_qry),
+        "results": [build_result(req, entry, fields) for entry in page],
+        "total": len(ranked),
+        "next_cursor": encode_cursor(end, fingerprint) if end < len(ranked) else None,
+    })
+
+
+@app.post("/search/stream")
+def search_stream(req: SearchRequest):
+    """
+    Streaming variant of /search (same request, ranking, paging and
+    ``fields``) as NDJSON, one JSON object per line:
+
+      {"type": "result", "rank": 1, "result": {...}}   as soon as each result is settled
+      {"type": "summary", "query": ..., "params": {...}, "total": ..., "next_cursor": ...}
+
+    Results are sent in ranking order before the rest of the corpus is
+    scored (see iter_ranked); the summary follows once the scan completes.
+    """
+    w_attr, w_ctx, w_qry = ranking_weights(req.retrieval.model)
+    fields = _projection(req.fields)
+    fingerprint = search_fingerprint(req)
+    offset = decode_cursor(req.cursor, fingerprint) if req.cursor else 0
+    page_size = max(1, req.retrieval.k)
+
+    def lines():
+        total = 0
+        for entry in iter_ranked(req, w_attr, w_ctx, w_qry):
+            if offset <= total < offset + page_size:
+                result = build_result(req, entry, fields)
+                yield orjson.dumps({"type": "result", "rank": total + 1, "result": result}) + b"\n"
+            total += 1
+        end = min(offset + page_size, total)
+        yield orjson.dumps({
+            "type": "summary",
+            "query": req.query,
+            "params": search_params(req, w_attr, w_ctx, w_qry),
+            "total": total,
+            "next_cursor": encode_cursor(end, fingerprint) if end < total else None,
+        }) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
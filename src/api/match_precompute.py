@@ -0,0 +1,158 @@
+"""
+Offline job that precomputes each dog's top-N compatible candidates.
+
+Dogs are blocked by region (their ``location``) so scoring is all-pairs only
+within a block, using the same component scores as ``calculate_compatibility``.
+Each block is written to the store read by ``match_store.PrecomputedMatches``
+together with a content fingerprint in the manifest. Re-running the job
+recomputes only the blocks whose profiles changed, so a single profile edit
+refreshes one region.
+
+Usage (from ``src/``):
+    python -m api.match_precompute --profiles data/processed/dogs.json --output models/precomputed
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .inference import MODEL_VERSION, score_matrix, trait_columns
+from .match_store import DEFAULT_STORE_DIR, MANIFEST_FILE, load_manifest
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 50
+ROW_CHUNK = 1024  # rows scored at once, bounds each block's score matrix to ROW_CHUNK x block size
+
+# Fields that influence scores; anything else (names, photos) never triggers a refresh
+SCORED_FIELDS = ("id", "energy_level", "playfulness", "training_level", "size", "age",
+                 "good_with_dogs", "friendliness", "location")
+
+
+def region_of(dog: dict) -> str:
+    return dog["location"]
+
+
+def block_fingerprint(dogs: List[dict]) -> str:
+    """Content hash of a region block, independent of input order."""
+    records = sorted(json.dumps([dog[f] for f in SCORED_FIELDS], default=str) for dog in dogs)
+    return hashlib.sha256("\n".join(records).encode()).hexdigest()
+
+
+def _block_file(region: str) -> str:
+    return hashlib.sha1(region.encode()).hexdigest()[:16] + ".npz"
+
+
+def score_block(dogs: List[dict], top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-N candidate indices and scores for every dog in one region block."""
+    n = len(dogs)
+    k = min(top_n, n - 1)
+    top_idx = np.full((n, top_n), -1, dtype=np.int32)
+    top_scores = np.zeros((n, top_n), dtype=np.float16)
+    if k <= 0:
+        return top_idx, top_scores
+
+    cols = trait_columns(dogs)
+    for start in range(0, n, ROW_CHUNK):
+        stop = min(start + ROW_CHUNK, n)
+        rows = {name: values[start:stop, np.newaxis] for name, values in cols.items()}
+        overall = score_matrix(rows, cols)[-1]
+        # A dog is never its own match
+        overall[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        part = np.argpartition(-overall, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(overall, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        top_idx[start:stop, :k] = np.take_along_axis(part, order, axis=1)
+        top_scores[start:stop, :k] = np.take_along_axis(part_scores, order, axis=1)
+    return top_idx, top_scores
+
+
+def precompute_matches(dogs: List[dict], store_dir: str = DEFAULT_STORE_DIR,
+                       top_n: int = DEFAULT_TOP_N, force: bool = False) -> Dict[str, int]:
+    """
+    Refresh the precomputed store for ``dogs``. Only region blocks whose
+    fingerprint changed (or every block when ``force``, ``top_n`` or the model
+    version changes) are rescored. Returns counts of recomputed, unchanged and
+    removed blocks.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    if manifest.get("top_n") != top_n or manifest.get("model_version") != MODEL_VERSION:
+        force = True
+
+    regions: Dict[str, List[dict]] = defaultdict(list)
+    for dog in dogs:
+        regions[region_of(dog)].append(dog)
+
+    blocks = {}
+    stats = {"recomputed": 0, "unchanged": 0, "removed": 0}
+    for region, block in regions.items():
+        fingerprint = block_fingerprint(block)
+        previous = manifest["blocks"].get(region)
+        if not force and previous is not None and previous["fingerprint"] == fingerprint:
+            blocks[region] = previous
+            stats["unchanged"] += 1
+            continue
+
+        top_idx, top_scores = score_block(block, top_n)
+        filename = _block_file(region)
+        tmp_path = os.path.join(store_dir, filename + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                dog_ids=np.array([dog["id"] for dog in block]),
+                top_idx=top_idx,
+                top_scores=top_scores,
+            )
+        os.replace(tmp_path, os.path.join(store_dir, filename))
+        blocks[region] = {
+            "file": filename,
+            "fingerprint": fingerprint,
+            "dogs": len(block),
+            "computed_at": datetime.now().isoformat(),
+        }
+        stats["recomputed"] += 1
+        logger.info(f"Scored region '{region}' ({len(block)} dogs)")
+
+    for region, entry in manifest["blocks"].items():
+        if region not in blocks:
+            path = os.path.join(store_dir, entry["file"])
+            if os.path.exists(path):
+                os.remove(path)
+            stats["removed"] += 1
+
+    # Write the manifest last (atomically) so readers never see a half-updated store
+    tmp_path = os.path.join(store_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"top_n": top_n, "model_version": MODEL_VERSION, "blocks": blocks}, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, MANIFEST_FILE))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute top-N dog matches per region block")
+    parser.add_argument("--profiles", required=True, help="JSON file with a list of dog records")
+    parser.add_argument("--output", default=DEFAULT_STORE_DIR, help="Directory of the precomputed store")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N, help="Matches kept per dog")
+    parser.add_argument("--force", action="store_true", help="Recompute every block")
+    args = parser.parse_args()
+
+    with open(args.profiles) as f:
+        dogs = json.load(f)
+    logger.info(f"Precomputing top-{args.top_n} matches for {len(dogs)} dogs...")
+    stats = precompute_matches(dogs, args.output, args.top_n, args.force)
+    logger.info(f"Blocks recomputed: {stats['recomputed']}, unchanged: {stats['unchanged']}, "
+                f"removed: {stats['removed']}")
+
+
+if __name__ == "__main__":
+    main()
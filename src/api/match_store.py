@@ -0,0 +1,112 @@
+"""
+Compact on-disk store of precomputed top-N matches, served directly by the API.
+
+One compressed ``.npz`` file per region block holds the block's dog ids, each
+dog's top-N candidate indices (int32, -1 padded) and their float16 scores. A
+``manifest.json`` maps regions to block files and content fingerprints; it is
+written by ``match_precompute`` and watched here so refreshed blocks are
+picked up without restarting workers.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_STORE_DIR = os.getenv("PRECOMPUTED_MATCHES_DIR", "models/precomputed")
+MANIFEST_FILE = "manifest.json"
+
+
+def load_manifest(store_dir: str) -> dict:
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"top_n": None, "blocks": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+class PrecomputedMatches:
+    """
+    Read side of the store, as served by the API. When the manifest changes,
+    only the dog ids of new or changed blocks are read (to map dogs to
+    regions); a block's top-N arrays are loaded on the first lookup in its
+    region and kept until its fingerprint changes.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        self._manifest_mtime: Optional[float] = None
+        self._dog_region: Dict[str, str] = {}
+        self._blocks: Dict[str, dict] = {}
+        self._manifest: dict = {"blocks": {}}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        path = os.path.join(self.store_dir, MANIFEST_FILE)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        with self._lock:
+            manifest = load_manifest(self.store_dir)
+            # Keep already-indexed (and loaded) blocks whose contents did not change
+            blocks = {region: block for region, block in self._blocks.items()
+                      if manifest["blocks"].get(region, {}).get("fingerprint") == block["fingerprint"]}
+            dog_region = {}
+            for region, entry in manifest["blocks"].items():
+                block = blocks.get(region) or self._index_block(entry)
+                blocks[region] = block
+                dog_region.update((dog_id, region) for dog_id in block["row"])
+            self._manifest, self._blocks, self._dog_region = manifest, blocks, dog_region
+            self._manifest_mtime = mtime
+
+    def _index_block(self, entry: dict) -> dict:
+        """A block's dog ids and row index; its top-N arrays are left for ``_load_block``."""
+        with np.load(os.path.join(self.store_dir, entry["file"])) as data:
+            dog_ids = data["dog_ids"]  # npz members are read individually
+        return {
+            "fingerprint": entry["fingerprint"],
+            "file": entry["file"],
+            "dog_ids": dog_ids,
+            "row": {dog_id: i for i, dog_id in enumerate(dog_ids.tolist())},
+            "top_idx": None,
+            "top_scores": None,
+        }
+
+    def _load_block(self, region: str) -> dict:
+        """The region's block with its top-N arrays, reading them on first use."""
+        block = self._blocks[region]
+        if block["top_idx"] is not None:
+            return block
+        with self._lock:
+            block = self._blocks[region]
+            if block["top_idx"] is None:
+                with np.load(os.path.join(self.store_dir, block["file"])) as data:
+                    block = {**block, "top_idx": data["top_idx"], "top_scores": data["top_scores"]}
+                    if not np.array_equal(data["dog_ids"], block["dog_ids"]):
+                        # Rewritten by a newer precompute run than the manifest we indexed
+                        dog_ids = data["dog_ids"]
+                        block.update(dog_ids=dog_ids, row={dog_id: i for i, dog_id in enumerate(dog_ids.tolist())})
+                self._blocks[region] = block
+        return block
+
+    def top_matches(self, dog_id: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Candidate ids and scores for ``dog_id`` (best first), or None if not precomputed."""
+        self._refresh()
+        region = self._dog_region.get(dog_id)
+        if region is None:
+            return None
+        try:
+            block = self._load_block(region)
+        except FileNotFoundError:
+            return None  # block removed by a precompute run whose manifest is not picked up yet
+        row = block["row"].get(dog_id)
+        if row is None:
+            return None
+        idx = block["top_idx"][row]
+        idx = idx[idx >= 0]
+        return block["dog_ids"][idx], block["top_scores"][row, :len(idx)].astype(float)
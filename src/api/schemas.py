@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -36,6 +36,7 @@ class DogProfile(BaseModel):
 # Dog Matching Request
 class DogMatchRequest(BaseModel):
     dog_profile: DogProfile
+    dog_id: Optional[str] = Field(None, description="ID of the requesting dog; already-swiped dogs are excluded")
     max_distance: float = Field(default=10.0, ge=0, le=100, description="Max distance in miles")
     preferred_size: Optional[str] = Field(None, description="Preferred size for matches")
     min_compatibility_score: float = Field(default=0.5, ge=0, le=1.0, description="Minimum compatibility score")
@@ -68,5 +69,31 @@ class MatchResult(BaseModel):
 
 # Batch Match Request
 class BatchMatchRequest(BaseModel):
-    profiles: List[DogProfile] = Field(..., min_items=1, max_items=10)
-    criteria: DogMatchRequest
\ No newline at end of file
+    profiles: List[DogProfile] = Field(..., min_length=1, max_length=10)
+    criteria: DogMatchRequest
+    dog_ids: Optional[List[Optional[str]]] = Field(None, description="IDs of the profiles, in order; already-swiped dogs are excluded")
+
+    @model_validator(mode="after")
+    def _one_dog_id_per_profile(self):
+        if self.dog_ids is not None and len(self.dog_ids) != len(self.profiles):
+            raise ValueError(f"dog_ids has {len(self.dog_ids)} entries for {len(self.profiles)} profiles")
+        return self
+
+# Ranked matches for one profile of a batch request
+class ProfileMatches(BaseModel):
+    dog_name: str
+    matches: List[CompatibilityResponse]
+
+# Batch Match Response
+class BatchMatchResponse(BaseModel):
+    results: List[ProfileMatches]
+
+# A precomputed match, served without re-scoring
+class RankedMatch(BaseModel):
+    dog_id: str
+    compatibility_score: float = Field(..., ge=0, le=1.0)
+
+# Precomputed top matches for one dog
+class TopMatchesResponse(BaseModel):
+    dog_id: str
+    matches: List[RankedMatch]
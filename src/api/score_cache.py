@@ -0,0 +1,58 @@
+"""
+LRU memoization of compatibility scores.
+
+Scoring is a pure function of (requesting profile, candidate, model version),
+so component scores are cached under that key and repeated match pages are
+served without re-scoring. Bumping ``MODEL_VERSION`` invalidates old entries.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("SCORE_CACHE_SIZE", "100000"))
+
+ScoreKey = Tuple[str, str, str]  # (profile hash, candidate key, model version)
+
+
+def profile_hash(profile_json: str) -> str:
+    """Stable digest of a serialized profile."""
+    return hashlib.sha256(profile_json.encode()).hexdigest()[:32]
+
+
+class ScoreCache:
+    """Thread-safe LRU cache with hit/miss counters."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ScoreKey) -> Optional[tuple]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: ScoreKey, value: tuple) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
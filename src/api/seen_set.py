@@ -0,0 +1,191 @@
+"""
+Compact per-dog "already swiped" sets used to drop candidates before scoring.
+
+Dog ids are interned to dense integers once, and each dog's swiped targets are
+held in a roaring-bitmap-style set: integers are bucketed by their high 16 bits,
+and each bucket is a sorted uint16 array while sparse or a 65536-bit bitmap
+once it fills up. Membership for a whole candidate array is answered in bulk
+with NumPy, so excluding seen dogs costs a few vector ops instead of a
+dict lookup per candidate.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+ARRAY_CONTAINER_MAX = 4096  # beyond this a bitmap (8 KiB) is smaller than the array
+BITMAP_WORDS = 1 << 10  # 1024 x 64 bits = one 16-bit bucket
+SEEN_SET_TTL_SECONDS = 300  # reload from the swipe store to pick up other workers' swipes
+SEEN_SET_MAX_ENTRIES = int(os.getenv("SEEN_SET_MAX_ENTRIES", "50000"))
+
+
+class DogIdIndex:
+    """Interns string dog ids into dense non-negative integers."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, dog_id: str) -> int:
+        idx = self._ids.get(dog_id)
+        if idx is None:
+            with self._lock:
+                idx = self._ids.get(dog_id)
+                if idx is None:
+                    idx = self._ids[dog_id] = len(self._names)
+                    self._names.append(dog_id)
+        return idx
+
+    def intern_many(self, dog_ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.intern(d) for d in dog_ids), dtype=np.uint32)
+
+    def name(self, idx: int) -> str:
+        return self._names[idx]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class RoaringSet:
+    """Roaring-bitmap-style set of uint32 values with bulk membership tests."""
+
+    __slots__ = ("_containers", "_size")
+
+    def __init__(self, values: Optional[Iterable[int]] = None):
+        self._containers: Dict[int, np.ndarray] = {}
+        self._size = 0
+        if values is not None:
+            self.update(np.fromiter(values, dtype=np.uint32))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if container.dtype == np.uint16:
+            pos = np.searchsorted(container, low)
+            return bool(pos < len(container) and container[pos] == low)
+        return bool((int(container[low >> 6]) >> (low & 63)) & 1)
+
+    def add(self, value: int) -> None:
+        self.update(np.array([value], dtype=np.uint32))
+
+    def update(self, values: np.ndarray) -> None:
+        """Add many values at once, converting buckets to bitmaps as they fill."""
+        values = np.asarray(values, dtype=np.uint32)
+        if values.size == 0:
+            return
+        highs = values >> 16
+        lows = (values & 0xFFFF).astype(np.uint16)
+        for high in np.unique(highs):
+            new = lows[highs == high]
+            key = int(high)
+            container = self._containers.get(key)
+            if container is None or container.dtype == np.uint16:
+                merged = np.union1d(container, new) if container is not None else np.unique(new)
+                before = 0 if container is None else len(container)
+                self._size += len(merged) - before
+                self._containers[key] = (merged.astype(np.uint16) if len(merged) <= ARRAY_CONTAINER_MAX
+                                         else self._to_bitmap(merged))
+            else:
+                before = self._bitmap_count(container)
+                np.bitwise_or.at(container, new >> 6, np.left_shift(np.uint64(1), (new & 63).astype(np.uint64)))
+                self._size += self._bitmap_count(container) - before
+
+    def contains_many(self, values: np.ndarray) -> np.ndarray:
+        """Boolean mask of which ``values`` are members."""
+        values = np.asarray(values, dtype=np.uint32)
+        mask = np.zeros(values.shape, dtype=bool)
+        if not self._containers or values.size == 0:
+            return mask
+        highs = values >> 16
+        lows = values & 0xFFFF
+        for key, container in self._containers.items():
+            sel = np.flatnonzero(highs == key)
+            if sel.size == 0:
+                continue
+            low = lows[sel]
+            if container.dtype == np.uint16:
+                pos = np.minimum(np.searchsorted(container, low), len(container) - 1)
+                mask[sel] = container[pos] == low
+            else:
+                mask[sel] = ((container[low >> 6] >> (low & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+        return mask
+
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self._containers.values())
+
+    @staticmethod
+    def _to_bitmap(lows: np.ndarray) -> np.ndarray:
+        bitmap = np.zeros(BITMAP_WORDS, dtype=np.uint64)
+        lows = lows.astype(np.uint64)
+        np.bitwise_or.at(bitmap, (lows >> np.uint64(6)).astype(np.intp), np.uint64(1) << (lows & np.uint64(63)))
+        return bitmap
+
+    @staticmethod
+    def _bitmap_count(bitmap: np.ndarray) -> int:
+        return int(np.unpackbits(bitmap.view(np.uint8)).sum())
+
+
+class SeenSetRegistry:
+    """
+    Per-dog seen-sets, loaded lazily from the swipe store and kept current by
+    ``record`` as swipes arrive. Entries are reloaded after ``ttl_seconds`` so
+    swipes handled by other workers are eventually reflected.
+
+    Entries are kept in load order: expired ones are swept from the front on
+    every load and swipe, and at most ``max_entries`` are held (oldest load
+    evicted first), so memory stays bounded however many dogs swipe.
+    """
+
+    def __init__(self, index: DogIdIndex, loader: Callable[[str], List[str]],
+                 ttl_seconds: float = SEEN_SET_TTL_SECONDS, max_entries: int = SEEN_SET_MAX_ENTRIES):
+        self._index = index
+        self._loader = loader
+        self._ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, RoaringSet]]" = OrderedDict()  # dog id -> (loaded at, set)
+        self._lock = threading.Lock()
+
+    def get(self, dog_id: str) -> RoaringSet:
+        now = time.monotonic()
+        entry = self._entries.get(dog_id)
+        if entry is not None and now - entry[0] <= self._ttl:
+            return entry[1]
+        seen = RoaringSet(self._index.intern_many(self._loader(dog_id)))
+        with self._lock:
+            self._entries[dog_id] = (now, seen)
+            self._entries.move_to_end(dog_id)
+            self._evict(now)
+        return seen
+
+    def record(self, user_dog_id: str, target_dog_id: str) -> None:
+        """Incrementally add a swipe to an already-loaded seen-set."""
+        with self._lock:
+            self._evict(time.monotonic())
+            entry = self._entries.get(user_dog_id)
+            if entry is not None:
+                entry[1].add(self._index.intern(target_dog_id))
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and the oldest ones beyond ``max_entries`` (caller holds the lock)."""
+        while self._entries:
+            loaded_at, _ = next(iter(self._entries.values()))
+            if now - loaded_at <= self._ttl and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def unseen_mask(self, dog_id: str, candidate_ids: np.ndarray) -> np.ndarray:
+        """Boolean mask selecting the candidates ``dog_id`` has not swiped on yet."""
+        return ~self.get(dog_id).contains_many(candidate_ids)
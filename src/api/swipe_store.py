@@ -0,0 +1,250 @@
+"""
+Persistent swipe/match storage shared by every API worker.
+
+Postgres (``DATABASE_URL``, as provisioned by docker-compose) is the production
+backend. When no Postgres URL is configured a SQLite database is used instead,
+so the swipe flow can be exercised locally without any services running.
+
+Both backends keep one row per (user_dog_id, target_dog_id) under a unique
+index and detect mutual likes atomically with the swipe itself, so concurrent
+workers can never both miss (or both create) the same match. Only the swipe
+that creates a match reports it; repeating a like on an existing match does not.
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+DEFAULT_SQLITE_URL = "sqlite:///data/processed/swipes.db"
+MAX_SERIALIZATION_RETRIES = 5
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS swipes (
+        user_dog_id TEXT NOT NULL,
+        target_dog_id TEXT NOT NULL,
+        action TEXT NOT NULL,
+        swiped_at TIMESTAMP NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS swipes_pair_idx ON swipes (user_dog_id, target_dog_id)",
+    """
+    CREATE TABLE IF NOT EXISTS matches (
+        match_id TEXT PRIMARY KEY,
+        dog1_id TEXT NOT NULL,
+        dog2_id TEXT NOT NULL,
+        matched_at TIMESTAMP NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS matches_pair_idx ON matches (dog1_id, dog2_id)",
+]
+
+# Upsert the swipe, check for the reverse like and register the match in one
+# statement. Run under SERIALIZABLE so two dogs liking each other at the same
+# moment cannot both read a snapshot without the other's swipe.
+PG_RECORD_SWIPE = """
+WITH recorded AS (
+    INSERT INTO swipes (user_dog_id, target_dog_id, action, swiped_at)
+    VALUES (%(user_dog_id)s, %(target_dog_id)s, %(action)s, %(swiped_at)s)
+    ON CONFLICT (user_dog_id, target_dog_id)
+    DO UPDATE SET action = EXCLUDED.action, swiped_at = EXCLUDED.swiped_at
+    RETURNING action
+), mutual AS (
+    SELECT 1
+    FROM recorded r
+    JOIN swipes s
+      ON s.user_dog_id = %(target_dog_id)s AND s.target_dog_id = %(user_dog_id)s
+    WHERE r.action = 'like' AND s.action = 'like'
+)
+INSERT INTO matches (match_id, dog1_id, dog2_id, matched_at)
+SELECT %(match_id)s, %(dog1_id)s, %(dog2_id)s, %(swiped_at)s FROM mutual
+ON CONFLICT (dog1_id, dog2_id) DO NOTHING
+RETURNING match_id
+"""
+
+SQLITE_UPSERT_SWIPE = """
+INSERT INTO swipes (user_dog_id, target_dog_id, action, swiped_at)
+VALUES (:user_dog_id, :target_dog_id, :action, :swiped_at)
+ON CONFLICT (user_dog_id, target_dog_id)
+DO UPDATE SET action = excluded.action, swiped_at = excluded.swiped_at
+"""
+
+SQLITE_CREATE_MATCH = """
+INSERT INTO matches (match_id, dog1_id, dog2_id, matched_at)
+SELECT :match_id, :dog1_id, :dog2_id, :swiped_at
+WHERE :action = 'like' AND EXISTS (
+    SELECT 1 FROM swipes
+    WHERE user_dog_id = :target_dog_id AND target_dog_id = :user_dog_id AND action = 'like'
+)
+ON CONFLICT (dog1_id, dog2_id) DO NOTHING
+"""
+
+def _swipe_params(user_dog_id: str, target_dog_id: str, action: str, swiped_at: datetime) -> dict:
+    """Bind parameters shared by both backends; match pairs are stored in sorted order."""
+    dog1_id, dog2_id = sorted((user_dog_id, target_dog_id))
+    return {
+        "user_dog_id": user_dog_id,
+        "target_dog_id": target_dog_id,
+        "action": action,
+        "swiped_at": swiped_at,
+        "match_id": str(uuid.uuid4()),
+        "dog1_id": dog1_id,
+        "dog2_id": dog2_id,
+    }
+
+
+class SwipeStore(ABC):
+    """Interface for swipe/match persistence."""
+
+    @abstractmethod
+    def record_swipe(self, user_dog_id: str, target_dog_id: str, action: str,
+                     swiped_at: datetime) -> Optional[str]:
+        """Record a swipe and return the match id if it creates a new mutual like."""
+
+    @abstractmethod
+    def swiped_targets(self, user_dog_id: str) -> List[str]:
+        """Return every dog id the given dog has already liked or passed."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release any pooled connections."""
+
+
+class PostgresSwipeStore(SwipeStore):
+    """Postgres-backed store using a thread-safe psycopg2 connection pool."""
+
+    def __init__(self, url: str, min_connections: int = 1, max_connections: int = 10):
+        import psycopg2.pool  # imported lazily so SQLite-only setups need no driver
+
+        # DATABASE_URL uses the SQLAlchemy form (postgresql+psycopg2://...)
+        dsn = url.replace("+psycopg2", "", 1)
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections, dsn)
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                for statement in SCHEMA_STATEMENTS:
+                    cur.execute(statement)
+            conn.commit()
+
+    @contextmanager
+    def _connection(self) -> Iterator["psycopg2.extensions.connection"]:
+        conn = self._pool.getconn()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def record_swipe(self, user_dog_id: str, target_dog_id: str, action: str,
+                     swiped_at: datetime) -> Optional[str]:
+        from psycopg2.extensions import ISOLATION_LEVEL_SERIALIZABLE, TransactionRollbackError
+
+        params = _swipe_params(user_dog_id, target_dog_id, action, swiped_at)
+        for attempt in range(MAX_SERIALIZATION_RETRIES):
+            with self._connection() as conn:
+                conn.set_isolation_level(ISOLATION_LEVEL_SERIALIZABLE)
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(PG_RECORD_SWIPE, params)
+                        row = cur.fetchone()
+                    conn.commit()
+                    return row[0] if row else None
+                except TransactionRollbackError:
+                    # Lost a serialization race with the reverse swipe; retry
+                    conn.rollback()
+                    if attempt == MAX_SERIALIZATION_RETRIES - 1:
+                        raise
+        return None
+
+    def swiped_targets(self, user_dog_id: str) -> List[str]:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT target_dog_id FROM swipes WHERE user_dog_id = %s", (user_dog_id,))
+                rows = cur.fetchall()
+            conn.commit()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        self._pool.closeall()
+
+
+class SQLiteSwipeStore(SwipeStore):
+    """
+    SQLite fallback for local development and tests.
+
+    Each thread gets its own connection; writes take the database lock up front
+    (BEGIN IMMEDIATE) so the upsert and the mutual-like check are atomic.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path == ":memory:":
+            # A named shared-cache database lets every thread see the same data
+            self._target, self._uri = f"file:swipes-{uuid.uuid4().hex}?mode=memory&cache=shared", True
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._target, self._uri = path, False
+        self._local = threading.local()
+        # Keeps an in-memory database alive for the lifetime of the store
+        self._anchor = self._connect()
+        for statement in SCHEMA_STATEMENTS:
+            self._anchor.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._target, uri=self._uri, isolation_level=None,
+                               check_same_thread=False, timeout=30)
+        if not self._uri:
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def record_swipe(self, user_dog_id: str, target_dog_id: str, action: str,
+                     swiped_at: datetime) -> Optional[str]:
+        params = _swipe_params(user_dog_id, target_dog_id, action, swiped_at.isoformat())
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(SQLITE_UPSERT_SWIPE, params)
+            created = conn.execute(SQLITE_CREATE_MATCH, params).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return params["match_id"] if created else None
+
+    def swiped_targets(self, user_dog_id: str) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT target_dog_id FROM swipes WHERE user_dog_id = ?", (user_dog_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        self._anchor.close()
+
+
+def _sqlite_path(url: str) -> str:
+    """Translate sqlite:///relative.db, sqlite:////abs.db and sqlite:// into a path."""
+    path = url.split("://", 1)[1]
+    if path in ("", "/", "/:memory:"):
+        return ":memory:"
+    return path[1:] if path.startswith("/") else path
+
+
+def create_swipe_store(url: Optional[str] = None) -> SwipeStore:
+    """Build the store for ``url`` (defaults to ``DATABASE_URL``, then local SQLite)."""
+    url = url or os.getenv("DATABASE_URL") or DEFAULT_SQLITE_URL
+    if url.startswith("sqlite"):
+        return SQLiteSwipeStore(_sqlite_path(url))
+    return PostgresSwipeStore(url)
@@ -0,0 +1,102 @@
+"""
+Fitted cleaning statistics as a small, versioned artifact.
+
+``run_processing`` fits the imputation values and price outlier bounds once and
+saves them here as JSON. Serving code loads the artifact and applies it to a
+single record or a micro-batch of dicts without pandas and without the training
+data, so training-time and serving-time imputation are identical.
+"""
+
+import hashlib
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+FORMAT_VERSION = 1
+DEFAULT_STATS_PATH = "models/trained/cleaning_stats.json"
+
+
+def _plain(value):
+    """NumPy scalars -> Python scalars, so the artifact is plain JSON."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class CleaningStats:
+    """Imputation values and price outlier bounds fitted on a dataset."""
+
+    __slots__ = ("rows", "null_counts", "fill_values", "lower_bound", "upper_bound", "fitted_at")
+
+    def __init__(self, rows: int, null_counts: Dict[str, int], fill_values: Dict[str, object],
+                 lower_bound: float, upper_bound: float, fitted_at: Optional[str] = None):
+        self.rows = int(rows)
+        self.null_counts = {column: int(count) for column, count in null_counts.items()}
+        self.fill_values = {column: _plain(value) for column, value in fill_values.items()}
+        self.lower_bound = float(lower_bound)
+        self.upper_bound = float(upper_bound)
+        self.fitted_at = fitted_at or datetime.now().isoformat()
+
+    @property
+    def version(self) -> str:
+        """Content hash of everything that changes the cleaned output."""
+        payload = json.dumps([self.fill_values, self.lower_bound, self.upper_bound], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def to_dict(self) -> Dict:
+        return {
+            "format_version": FORMAT_VERSION,
+            "version": self.version,
+            "fitted_at": self.fitted_at,
+            "rows": self.rows,
+            "null_counts": self.null_counts,
+            "fill_values": self.fill_values,
+            "lower_bound": self.lower_bound,
+            "upper_bound": self.upper_bound,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CleaningStats":
+        if data.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cleaning stats format: {data.get('format_version')}")
+        return cls(data["rows"], data["null_counts"], data["fill_values"],
+                   data["lower_bound"], data["upper_bound"], data["fitted_at"])
+
+    def save(self, path: str = DEFAULT_STATS_PATH) -> None:
+        """Write the artifact atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_STATS_PATH) -> "CleaningStats":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def is_outlier(self, record: Dict) -> bool:
+        """Whether a record's price is outside the bounds (records without a price never are)."""
+        price = record.get("price")
+        return not _is_missing(price) and not self.lower_bound <= price <= self.upper_bound
+
+    def apply(self, record: Dict) -> Dict:
+        """Impute one record; returns a new dict and leaves ``record`` untouched."""
+        cleaned = dict(record)
+        for column, value in self.fill_values.items():
+            if _is_missing(cleaned.get(column)):
+                cleaned[column] = value
+        return cleaned
+
+    def apply_batch(self, records: Iterable[Dict], drop_outliers: bool = False) -> List[Dict]:
+        """Impute a micro-batch; ``drop_outliers`` also filters by the price bounds as training did."""
+        cleaned = [self.apply(record) for record in records]
+        if drop_outliers:
+            cleaned = [record for record in cleaned if not self.is_outlier(record)]
+        return cleaned
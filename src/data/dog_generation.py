@@ -0,0 +1,683 @@
+"""
+Shared synthetic dog data generation used by both generator scripts.
+
+Dog names and the compatibility scoring live here once, on top of the breed,
+location and activity reference data in ``features.dog_columns``, so the plain
+and image-backed generators (and serving) cannot drift apart. A
+``ProfileCatalog`` fixes everything a run draws from (breeds, names and
+optionally images) and precomputes the breed trait table as arrays, so profiles
+and pairs are generated column-wise without per-profile dict lookups.
+"""
+
+import glob
+import logging
+import os
+import random
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data.image_catalog import DEFAULT_CATALOG_DIR, DEFAULT_IMAGES_DIR, load_catalog
+from data.shards import (IMAGE_PROFILE_SCHEMA, PAIR_SCHEMA, PROFILE_SCHEMA, SHARD_FORMATS, clear_shards,
+                         read_shards, run_shards, shard_path, write_shard)
+from features.bitops import popcount
+from features.dog_columns import (ACTIVITIES, BREED_CHARACTERISTICS, LOCATION_COORDS, LOCATIONS, SIZE_CODES,
+                                   get_breed_characteristics, state_code)
+from features.pair_features import DogFeatureStore
+
+logger = logging.getLogger(__name__)
+
+# Image filename breed key -> standardized breed name
+BREED_KEY_MAPPING = {
+    "labrador": "Labrador Retriever",
+    "retriever-golden": "Golden Retriever",
+    "german-shepherd": "German Shepherd",
+    "bulldog-english": "Bulldog",
+    "bulldog-french": "French Bulldog",
+    "poodle-standard": "Poodle",
+    "poodle-miniature": "Poodle",
+    "poodle-medium": "Poodle",
+    "poodle-toy": "Poodle",
+    "beagle": "Beagle",
+    "husky": "Siberian Husky",
+    "terrier-yorkshire": "Yorkshire Terrier",
+    "dachshund": "Dachshund",
+    "rottweiler": "Rottweiler",
+    "boxer": "Boxer",
+    "chihuahua": "Chihuahua",
+    "pug": "Pug",
+    "shiba": "Shiba Inu",
+    "corgi-cardigan": "Corgi",
+    "australian-shepherd": "Australian Shepherd",
+    "mix": "Mixed Breed",
+    "mastiff-english": "Mastiff",
+    "greyhound-italian": "Greyhound",
+    "spaniel-cocker": "Cocker Spaniel",
+    "setter-irish": "Irish Setter",
+    "pointer-german": "German Pointer",
+    "schnauzer-miniature": "Miniature Schnauzer",
+    "terrier-boston": "Boston Terrier",
+    "maltese": "Maltese",
+    "havanese": "Havanese",
+    "borzoi": "Borzoi",
+    "basenji": "Basenji",
+    "whippet": "Whippet",
+    "akita": "Akita",
+    "samoyed": "Samoyed",
+    "malamute": "Alaskan Malamute",
+}
+
+DOG_NAMES = [
+    "Buddy", "Luna", "Charlie", "Bella", "Max", "Lucy", "Cooper", "Daisy",
+    "Rocky", "Molly", "Bear", "Stella", "Tucker", "Zoe", "Duke", "Lola",
+    "Milo", "Ruby", "Jack", "Penny", "Teddy", "Chloe", "Oliver", "Nala",
+    "Leo", "Rosie", "Zeus", "Maya", "Finn", "Sadie", "Oscar", "Coco"
+]
+
+# The image-backed dataset draws from a larger name pool
+EXTENDED_DOG_NAMES = DOG_NAMES + [
+    "Atlas", "Roxy", "Ace", "Willow", "Thor", "Hazel", "Scout", "Ivy",
+    "Ranger", "Nova", "Chief", "Sage", "Storm", "Juniper", "Rex", "Autumn"
+]
+
+SIZE_NAMES = np.array(["Small", "Medium", "Large"])
+# Inclusive weight range per size code (Small, Medium, Large)
+WEIGHT_LOW = np.array([5, 25, 60])
+WEIGHT_HIGH = np.array([25, 60, 120])
+
+ACTIVITY_BITS = 1 << np.arange(len(ACTIVITIES), dtype=np.uint16)
+ACTIVITY_CHUNK = 1_000_000  # rows per activity draw, bounds the (rows x 15) key matrix
+
+# State code per location index, so "same state" is an integer comparison
+LOCATION_STATE_CODE = np.array([state_code(location) for location in LOCATIONS])
+LOCATION_LATITUDE = np.array([LOCATION_COORDS[location][0] for location in LOCATIONS])
+LOCATION_LONGITUDE = np.array([LOCATION_COORDS[location][1] for location in LOCATIONS])
+
+
+@lru_cache(maxsize=None)
+def normalize_breed_name(breed_key: str) -> str:
+    """Convert image filename breed key to standardized breed name."""
+    # Return mapped name or create a title case version
+    return BREED_KEY_MAPPING.get(breed_key, breed_key.replace('-', ' ').title())
+
+
+def load_available_images(images_dir: str = DEFAULT_IMAGES_DIR,
+                          catalog_dir: Optional[str] = DEFAULT_CATALOG_DIR) -> Dict[str, List[str]]:
+    """
+    Load and categorize available dog images by breed. When an image catalogue
+    for ``images_dir`` exists, its thumbnails are used (near-duplicates
+    skipped) instead of scanning the directory.
+    """
+    catalog = load_catalog(catalog_dir) if catalog_dir else None
+    if catalog is not None and os.path.normpath(catalog["images_dir"]) == os.path.normpath(images_dir):
+        breed_images: Dict[str, List[str]] = {}
+        for entry in catalog["images"]:
+            if entry["breed_key"] and entry["duplicate_of"] is None:
+                breed_images.setdefault(normalize_breed_name(entry["breed_key"]), []).append(entry["thumbnail"])
+        logger.info(f"Loaded {sum(len(paths) for paths in breed_images.values())} catalogued thumbnails "
+                    f"for {len(breed_images)} breeds from {catalog_dir}")
+        return breed_images
+
+    if not os.path.exists(images_dir):
+        logger.warning(f"Images directory {images_dir} not found. Using synthetic data only.")
+        return {}
+
+    breed_images: Dict[str, List[str]] = {}
+    image_files = sorted(glob.glob(os.path.join(images_dir, "*.jpg")))
+
+    for image_path in image_files:
+        filename = os.path.basename(image_path)
+        # Extract breed from filename (everything before the first underscore)
+        if '_' in filename:
+            breed_name = normalize_breed_name(filename.split('_')[0])
+            breed_images.setdefault(breed_name, []).append(image_path)
+
+    logger.info(f"Found images for {len(breed_images)} breeds, total {len(image_files)} images")
+    return breed_images
+
+
+class BreedTable:
+    """Trait arrays for a fixed list of breeds, indexed by breed position."""
+
+    def __init__(self, breeds: Sequence[str]):
+        traits = [get_breed_characteristics(breed) for breed in breeds]
+        self.names = np.array(breeds)
+        self.energy = np.array([t["energy"] for t in traits])
+        self.friendliness = np.array([t["friendliness"] for t in traits])
+        self.training = np.array([t["training"] for t in traits])
+        self.size_code = np.array([list(SIZE_NAMES).index(t["size"]) for t in traits])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@lru_cache(maxsize=None)
+def breed_table(breeds: Tuple[str, ...]) -> BreedTable:
+    """Build (once per breed list) the trait table for ``breeds``."""
+    return BreedTable(breeds)
+
+
+class ProfileCatalog:
+    """
+    Everything a generation run draws from: the breed trait table, the name
+    pool and, in image mode, one flat array of image paths grouped by breed.
+
+    With ``image_columns`` set, profiles carry ``profile_image`` and
+    ``image_filename``; breeds without photos get a placeholder image.
+    """
+
+    def __init__(self, breeds: Sequence[str], names: Sequence[str],
+                 breed_images: Optional[Dict[str, List[str]]] = None, image_columns: bool = False):
+        self.breeds = breed_table(tuple(breeds))
+        self.names = np.array(names)
+        self.image_columns = image_columns or breed_images is not None
+        breed_images = breed_images or {}
+        counts = np.array([len(breed_images.get(breed, ())) for breed in breeds])
+        self.image_paths = np.array([path for breed in breeds for path in breed_images.get(breed, ())], dtype=object)
+        self.image_counts = counts
+        self.image_offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+
+    @classmethod
+    def base(cls) -> "ProfileCatalog":
+        """The predefined breeds and names of the plain generator."""
+        return cls(list(BREED_CHARACTERISTICS), DOG_NAMES)
+
+    @classmethod
+    def from_images(cls, breed_images: Dict[str, List[str]]) -> "ProfileCatalog":
+        """Breeds taken from the image collection, falling back to the predefined breeds."""
+        breeds = list(breed_images) if breed_images else list(BREED_CHARACTERISTICS)
+        return cls(breeds, EXTENDED_DOG_NAMES, breed_images, image_columns=True)
+
+    @property
+    def profile_schema(self):
+        return IMAGE_PROFILE_SCHEMA if self.image_columns else PROFILE_SCHEMA
+
+
+BASE_CATALOG = ProfileCatalog.base()
+
+
+@lru_cache(maxsize=1)
+def activity_lists() -> np.ndarray:
+    """Lookup table from a 15-bit activity mask to its list of activity names."""
+    table = np.empty(1 << len(ACTIVITIES), dtype=object)
+    for mask in range(len(table)):
+        table[mask] = [a for bit, a in enumerate(ACTIVITIES) if mask >> bit & 1]
+    return table
+
+
+def draw_activity_masks(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    Uniform random subsets of 3-6 activities, one 15-bit mask per dog.
+    Ranking i.i.d. keys and keeping the lowest k is equivalent to random.sample.
+    """
+    masks = np.empty(n, dtype=np.uint16)
+    for start in range(0, n, ACTIVITY_CHUNK):
+        stop = min(start + ACTIVITY_CHUNK, n)
+        counts = rng.integers(3, 7, stop - start)
+        ranks = rng.random((stop - start, len(ACTIVITIES)), dtype=np.float32).argsort(axis=1).argsort(axis=1)
+        chosen = ranks < counts[:, np.newaxis]
+        masks[start:stop] = (chosen * ACTIVITY_BITS).sum(axis=1)
+    return masks
+
+
+def generate_dog_profile(dog_id: int, catalog: ProfileCatalog = BASE_CATALOG) -> Dict:
+    """Generate a single realistic dog profile with characteristics."""
+    breeds = catalog.breeds
+    b = random.randrange(len(breeds))
+    breed = str(breeds.names[b])
+    size = str(SIZE_NAMES[breeds.size_code[b]])
+
+    # Add some variance to breed characteristics
+    energy_level = max(1, min(10, int(breeds.energy[b]) + random.randint(-2, 2)))
+    friendliness = max(1, min(10, int(breeds.friendliness[b]) + random.randint(-2, 2)))
+    training_level = max(1, min(10, int(breeds.training[b]) + random.randint(-2, 2)))
+
+    # Generate other attributes
+    age = random.randint(1, 15)
+    playfulness = max(1, min(10, energy_level + random.randint(-3, 3)))
+
+    # Size consistency
+    weight = random.randint(int(WEIGHT_LOW[breeds.size_code[b]]), int(WEIGHT_HIGH[breeds.size_code[b]]))
+
+    profile = {
+        "dog_id": dog_id,
+        "name": str(random.choice(catalog.names)),
+        "breed": breed,
+        "age": age,
+        "weight": weight,
+        "size": size,
+        "gender": random.choice(["Male", "Female"]),
+        "energy_level": energy_level,
+        "friendliness": friendliness,
+        "playfulness": playfulness,
+        "training_level": training_level,
+        "location": random.choice(LOCATIONS),
+        "favorite_activities": random.sample(ACTIVITIES, random.randint(3, 6)),
+        "is_neutered": random.choice([True, False]),
+        "good_with_kids": random.choice([True, False, True]),  # Bias toward True
+        "good_with_dogs": random.choice([True, False, True, True]),  # Bias toward True
+        "vaccination_status": random.choice(["Up to date", "Needs update", "Up to date", "Up to date"]),
+    }
+
+    if catalog.image_columns:
+        # Select a random image for this breed
+        count = catalog.image_counts[b]
+        profile_image = catalog.image_paths[catalog.image_offsets[b] + random.randrange(count)] if count else None
+        profile["profile_image"] = profile_image if profile_image else f"placeholder_{breed.lower().replace(' ', '_')}.jpg"
+        profile["image_filename"] = os.path.basename(profile_image) if profile_image else None
+
+    return profile
+
+
+def generate_profile_columns(num_profiles: int, rng: np.random.Generator, start_id: int = 0,
+                             catalog: ProfileCatalog = BASE_CATALOG) -> Dict[str, np.ndarray]:
+    """
+    Draw every trait for a whole population at once. Same distributions as
+    generate_dog_profile, with favorite activities kept as 15-bit masks.
+    """
+    n = num_profiles
+    breeds = catalog.breeds
+    breed_idx = rng.integers(0, len(breeds), n)
+
+    # Add some variance to breed characteristics
+    energy_level = np.clip(breeds.energy[breed_idx] + rng.integers(-2, 3, n), 1, 10)
+    friendliness = np.clip(breeds.friendliness[breed_idx] + rng.integers(-2, 3, n), 1, 10)
+    training_level = np.clip(breeds.training[breed_idx] + rng.integers(-2, 3, n), 1, 10)
+
+    # Generate other attributes
+    age = rng.integers(1, 16, n)
+    playfulness = np.clip(energy_level + rng.integers(-3, 4, n), 1, 10)
+
+    # Size consistency
+    size_code = breeds.size_code[breed_idx]
+    weight = rng.integers(WEIGHT_LOW[size_code], WEIGHT_HIGH[size_code] + 1)
+
+    columns = {
+        "dog_id": np.arange(start_id, start_id + n),
+        "name_idx": rng.integers(0, len(catalog.names), n),
+        "breed_idx": breed_idx,
+        "age": age,
+        "weight": weight,
+        "size_code": size_code,
+        "is_male": rng.random(n) < 0.5,
+        "energy_level": energy_level,
+        "friendliness": friendliness,
+        "playfulness": playfulness,
+        "training_level": training_level,
+        "location_idx": rng.integers(0, len(LOCATIONS), n),
+        "activity_mask": draw_activity_masks(rng, n),
+        "is_neutered": rng.random(n) < 0.5,
+        "good_with_kids": rng.random(n) < 2 / 3,  # Bias toward True
+        "good_with_dogs": rng.random(n) < 3 / 4,  # Bias toward True
+        "vaccinated": rng.random(n) < 3 / 4,
+    }
+
+    if catalog.image_columns:
+        # A uniformly chosen image of the dog's breed, -1 when the breed has none
+        counts = catalog.image_counts[breed_idx]
+        pick = (rng.random(n) * counts).astype(np.int64)
+        columns["image_idx"] = np.where(counts > 0, catalog.image_offsets[breed_idx] + pick, -1)
+    return columns
+
+
+def profiles_frame(columns: Dict[str, np.ndarray], catalog: ProfileCatalog = BASE_CATALOG) -> pd.DataFrame:
+    """Decode columnar traits into the same DataFrame layout as generate_dog_profile."""
+    breed = catalog.breeds.names[columns["breed_idx"]]
+    df = pd.DataFrame({
+        "dog_id": columns["dog_id"],
+        "name": catalog.names[columns["name_idx"]],
+        "breed": breed,
+        "age": columns["age"],
+        "weight": columns["weight"],
+        "size": SIZE_NAMES[columns["size_code"]],
+        "gender": np.where(columns["is_male"], "Male", "Female"),
+        "energy_level": columns["energy_level"],
+        "friendliness": columns["friendliness"],
+        "playfulness": columns["playfulness"],
+        "training_level": columns["training_level"],
+        "location": np.array(LOCATIONS)[columns["location_idx"]],
+        # Rows with the same activity set share one list object
+        "favorite_activities": activity_lists()[columns["activity_mask"]],
+        "is_neutered": columns["is_neutered"],
+        "good_with_kids": columns["good_with_kids"],
+        "good_with_dogs": columns["good_with_dogs"],
+        "vaccination_status": np.where(columns["vaccinated"], "Up to date", "Needs update"),
+    })
+
+    if catalog.image_columns:
+        image_idx = columns["image_idx"]
+        has_image = image_idx >= 0
+        placeholders = np.array([f"placeholder_{name.lower().replace(' ', '_')}.jpg" for name in catalog.breeds.names],
+                                dtype=object)
+        paths = placeholders[columns["breed_idx"]]
+        paths[has_image] = catalog.image_paths[image_idx[has_image]]
+        filenames = np.full(len(paths), None, dtype=object)
+        filenames[has_image] = [os.path.basename(path) for path in paths[has_image]]
+        df["profile_image"] = paths
+        df["image_filename"] = filenames
+    return df
+
+
+def generate_dog_profiles(num_profiles: int, seed: int = None,
+                          catalog: ProfileCatalog = BASE_CATALOG) -> pd.DataFrame:
+    """Generate ``num_profiles`` dog profiles in one vectorized pass (seedable)."""
+    columns = generate_profile_columns(num_profiles, np.random.default_rng(seed), catalog=catalog)
+    return profiles_frame(columns, catalog)
+
+
+def calculate_compatibility_score(dog1: Dict, dog2: Dict, noise: bool = True) -> float:
+    """
+    Calculate compatibility score between two dogs based on multiple factors.
+    Returns a score between 0-100. This is the scalar reference for
+    compatibility_scores; pass noise=False to compare the two exactly.
+    """
+    score = 0.0
+
+    # Energy level compatibility (30% weight)
+    energy_diff = abs(dog1["energy_level"] - dog2["energy_level"])
+    energy_score = max(0, 100 - (energy_diff * 15))  # Penalize large differences
+    score += energy_score * 0.30
+
+    # Size compatibility (20% weight)
+    sizes = {"Small": 1, "Medium": 2, "Large": 3}
+    size_diff = abs(sizes[dog1["size"]] - sizes[dog2["size"]])
+    size_score = max(0, 100 - (size_diff * 25))
+    score += size_score * 0.20
+
+    # Friendliness bonus (15% weight)
+    friendliness_avg = (dog1["friendliness"] + dog2["friendliness"]) / 2
+    friendliness_score = friendliness_avg * 10
+    score += friendliness_score * 0.15
+
+    # Age compatibility (10% weight)
+    age_diff = abs(dog1["age"] - dog2["age"])
+    age_score = max(0, 100 - (age_diff * 8))
+    score += age_score * 0.10
+
+    # Activity overlap (15% weight)
+    common_activities = len(set(dog1["favorite_activities"]) & set(dog2["favorite_activities"]))
+    activity_score = min(100, common_activities * 20)
+    score += activity_score * 0.15
+
+    # Location proximity (10% weight) - simplified by state
+    dog1_state = dog1["location"].split(", ")[-1]
+    dog2_state = dog2["location"].split(", ")[-1]
+    location_score = 100 if dog1_state == dog2_state else 50
+    score += location_score * 0.10
+
+    # Bonus factors
+    if dog1["good_with_dogs"] and dog2["good_with_dogs"]:
+        score += 5
+
+    if dog1["vaccination_status"] == "Up to date" and dog2["vaccination_status"] == "Up to date":
+        score += 5
+
+    # Add some randomness for realism
+    if noise:
+        score += random.uniform(-5, 5)
+
+    return max(0, min(100, score))
+
+
+def sample_pair_indices(rng: np.random.Generator, num_profiles: int, num_pairs: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairs of distinct profile indices, like random.sample(profiles, 2) per pair."""
+    first = rng.integers(0, num_profiles, num_pairs)
+    second = rng.integers(0, num_profiles - 1, num_pairs)
+    second += second >= first
+    return first, second
+
+
+def compatibility_scores(columns: Dict[str, np.ndarray], first: np.ndarray, second: np.ndarray,
+                         rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Array version of calculate_compatibility_score for many pairs at once.
+    Noise is added only when ``rng`` is given.
+    """
+    score = np.zeros(len(first))
+
+    # Energy level compatibility (30% weight)
+    energy_diff = np.abs(columns["energy_level"][first] - columns["energy_level"][second])
+    score += np.maximum(0, 100 - (energy_diff * 15)) * 0.30
+
+    # Size compatibility (20% weight)
+    size_diff = np.abs(columns["size_code"][first] - columns["size_code"][second])
+    score += np.maximum(0, 100 - (size_diff * 25)) * 0.20
+
+    # Friendliness bonus (15% weight)
+    friendliness_avg = (columns["friendliness"][first] + columns["friendliness"][second]) / 2
+    score += (friendliness_avg * 10) * 0.15
+
+    # Age compatibility (10% weight)
+    age_diff = np.abs(columns["age"][first] - columns["age"][second])
+    score += np.maximum(0, 100 - (age_diff * 8)) * 0.10
+
+    # Activity overlap (15% weight)
+    common_activities = popcount(columns["activity_mask"][first] & columns["activity_mask"][second])
+    score += np.minimum(100, common_activities.astype(np.int64) * 20) * 0.15
+
+    # Location proximity (10% weight) - simplified by state
+    same_state = LOCATION_STATE_CODE[columns["location_idx"][first]] == LOCATION_STATE_CODE[columns["location_idx"][second]]
+    score += np.where(same_state, 100, 50) * 0.10
+
+    # Bonus factors
+    score += np.where(columns["good_with_dogs"][first] & columns["good_with_dogs"][second], 5, 0)
+    score += np.where(columns["vaccinated"][first] & columns["vaccinated"][second], 5, 0)
+
+    # Add some randomness for realism
+    if rng is not None:
+        score += rng.uniform(-5, 5, len(first))
+
+    return np.clip(score, 0, 100)
+
+
+def dog_feature_columns(columns: Dict[str, np.ndarray], catalog: ProfileCatalog = BASE_CATALOG) -> Dict[str, np.ndarray]:
+    """Per-dog columns of ``features.pair_features`` for generated (columnar) profiles."""
+    breeds = catalog.breeds
+    breed_idx = columns["breed_idx"]
+    return {
+        "energy_level": columns["energy_level"],
+        "friendliness": columns["friendliness"],
+        "playfulness": columns["playfulness"],
+        "training_level": columns["training_level"],
+        "age": columns["age"],
+        "weight": columns["weight"],
+        "size_code": columns["size_code"],
+        "breed_energy": breeds.energy[breed_idx],
+        "breed_friendliness": breeds.friendliness[breed_idx],
+        "breed_training": breeds.training[breed_idx],
+        "latitude": LOCATION_LATITUDE[columns["location_idx"]],
+        "longitude": LOCATION_LONGITUDE[columns["location_idx"]],
+        "state_code": LOCATION_STATE_CODE[columns["location_idx"]],
+        "activity_mask": columns["activity_mask"],
+        "good_with_dogs": columns["good_with_dogs"],
+        "vaccinated": columns["vaccinated"],
+    }
+
+
+def _map_unique(values: np.ndarray, fn, dtype=None) -> np.ndarray:
+    """``fn`` applied to each distinct value once, broadcast back to ``values``."""
+    codes, uniques = pd.factorize(values)
+    return np.array([fn(value) for value in uniques], dtype=dtype)[codes]
+
+
+def _activity_masks(activities: pa.ChunkedArray) -> np.ndarray:
+    """Activity bitmasks from a list column, or from its "['Fetch', ...]" CSV string form."""
+    if pa.types.is_string(activities.type) or pa.types.is_large_string(activities.type):
+        stripped = pc.replace_substring_regex(activities, pattern=r"[\[\]']", replacement="")
+        activities = pc.split_pattern(stripped, pattern=", ")
+    activity_bit = {activity: 1 << bit for bit, activity in enumerate(ACTIVITIES)}
+    flat = pc.list_flatten(activities).to_numpy(zero_copy_only=False)
+    masks = np.zeros(len(activities), dtype=np.uint16)
+    np.bitwise_or.at(masks, pc.list_parent_indices(activities).to_numpy(),
+                     _map_unique(flat, lambda activity: activity_bit.get(activity, 0), np.uint16))
+    return masks
+
+
+def profile_table_feature_columns(table: pa.Table) -> Dict[str, np.ndarray]:
+    """
+    Same columns as ``features.dog_columns.profile_feature_columns`` for a
+    profile table (Arrow shards or CSV), with string columns mapped once per
+    distinct value.
+    """
+    def column(name):
+        return table.column(name).to_numpy()
+
+    def strings(name):
+        return table.column(name).cast(pa.string()).to_numpy(zero_copy_only=False)
+
+    breeds, locations = strings("breed"), strings("location")
+    return {
+        "energy_level": column("energy_level").astype(np.int64),
+        "friendliness": column("friendliness").astype(np.int64),
+        "playfulness": column("playfulness").astype(np.int64),
+        "training_level": column("training_level").astype(np.int64),
+        "age": column("age").astype(np.int64),
+        "weight": column("weight").astype(np.float64),
+        "size_code": _map_unique(strings("size"), lambda size: SIZE_CODES.get(size.lower(), 1), np.int64),
+        "breed_energy": _map_unique(breeds, lambda breed: get_breed_characteristics(breed)["energy"], np.int64),
+        "breed_friendliness": _map_unique(breeds, lambda breed: get_breed_characteristics(breed)["friendliness"],
+                                          np.int64),
+        "breed_training": _map_unique(breeds, lambda breed: get_breed_characteristics(breed)["training"], np.int64),
+        "latitude": _map_unique(locations, lambda location: LOCATION_COORDS.get(location, (np.nan, np.nan))[0]),
+        "longitude": _map_unique(locations, lambda location: LOCATION_COORDS.get(location, (np.nan, np.nan))[1]),
+        "state_code": _map_unique(locations, state_code, np.int64),
+        "activity_mask": _activity_masks(table.column("favorite_activities")),
+        "good_with_dogs": column("good_with_dogs").astype(bool),
+        "vaccinated": strings("vaccination_status") == "Up to date",
+    }
+
+
+def dog_feature_store(columns: Dict[str, np.ndarray], catalog: ProfileCatalog = BASE_CATALOG) -> DogFeatureStore:
+    """Columnar per-dog feature store for generated profiles, keyed by dog_id."""
+    return DogFeatureStore(columns["dog_id"], dog_feature_columns(columns, catalog))
+
+
+# Derived pair columns of the training data, all defined in features.pair_features
+PAIR_FRAME_FEATURES = ["energy_diff", "age_diff", "weight_diff", "size_match", "same_location",
+                       "activity_overlap", "both_good_with_dogs", "both_vaccinated"]
+
+
+def generate_compatibility_pair_frame(columns: Dict[str, np.ndarray], num_pairs: int,
+                                      rng: np.random.Generator, noise: bool = True,
+                                      catalog: ProfileCatalog = BASE_CATALOG) -> pd.DataFrame:
+    """Sample ``num_pairs`` pairs of distinct dogs and build their training features."""
+    if len(columns["dog_id"]) < 2:
+        return pd.DataFrame(columns=PAIR_SCHEMA.names)
+    first, second = sample_pair_indices(rng, len(columns["dog_id"]), num_pairs)
+    col = {name: (values[first], values[second]) for name, values in columns.items()}
+    derived = dog_feature_store(columns, catalog).pair_features(first, second, PAIR_FRAME_FEATURES)
+
+    return pd.DataFrame({
+        # Dog 1 features
+        "dog1_id": col["dog_id"][0],
+        "dog1_energy": col["energy_level"][0],
+        "dog1_friendliness": col["friendliness"][0],
+        "dog1_playfulness": col["playfulness"][0],
+        "dog1_age": col["age"][0],
+        "dog1_weight": col["weight"][0],
+        "dog1_training": col["training_level"][0],
+
+        # Dog 2 features
+        "dog2_id": col["dog_id"][1],
+        "dog2_energy": col["energy_level"][1],
+        "dog2_friendliness": col["friendliness"][1],
+        "dog2_playfulness": col["playfulness"][1],
+        "dog2_age": col["age"][1],
+        "dog2_weight": col["weight"][1],
+        "dog2_training": col["training_level"][1],
+
+        # Derived features
+        **derived,
+
+        # Target variable
+        "compatibility_score": compatibility_scores(columns, first, second, rng if noise else None),
+    })
+
+
+def _generate_shard(shard_index: int, seed_seq: np.random.SeedSequence, start_id: int,
+                    num_profiles: int, num_pairs: int, output_dir: str, fmt: str,
+                    catalog: ProfileCatalog) -> Dict:
+    """Worker: generate and write one profiles shard and one pairs shard."""
+    rng = np.random.default_rng(seed_seq)
+    columns = generate_profile_columns(num_profiles, rng, start_id, catalog)
+    write_shard(profiles_frame(columns, catalog), shard_path(output_dir, "profiles", shard_index, fmt),
+                catalog.profile_schema, fmt)
+
+    # Pairs are drawn within the shard; profiles are i.i.d. so the pair distribution is unchanged
+    pairs_df = generate_compatibility_pair_frame(columns, num_pairs, rng, catalog=catalog)
+    write_shard(pairs_df, shard_path(output_dir, "pairs", shard_index, fmt), PAIR_SCHEMA, fmt)
+    return {"profiles": num_profiles, "pairs": len(pairs_df)}
+
+
+def add_generation_arguments(parser, num_profiles: int, num_pairs: int, output_dir: str) -> None:
+    """Command-line options shared by both generator scripts."""
+    parser.add_argument("--num-profiles", type=int, default=num_profiles, help="Number of dog profiles to generate")
+    parser.add_argument("--num-pairs", type=int, default=num_pairs, help="Number of compatibility pairs to generate")
+    parser.add_argument("--output-profiles", type=str, default="data/raw/dog_profiles.csv", help="Output file for dog profiles")
+    parser.add_argument("--output-pairs", type=str, default="data/raw/dog_compatibility_pairs.csv", help="Output file for compatibility pairs")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible datasets")
+    parser.add_argument("--shards", type=int, default=0, help="Write N Parquet/Arrow shards in parallel instead of single CSV files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for sharded mode (default: all cores)")
+    parser.add_argument("--output-dir", type=str, default=output_dir, help="Output directory for sharded mode")
+    parser.add_argument("--format", choices=SHARD_FORMATS, default="parquet", help="Shard format for sharded mode")
+
+
+def _log_score_statistics(scores: np.ndarray) -> None:
+    logger.info(f"Compatibility score statistics:")
+    logger.info(f"  Mean: {scores.mean():.2f}")
+    logger.info(f"  Std: {scores.std(ddof=1):.2f}")
+    logger.info(f"  Min: {scores.min():.2f}")
+    logger.info(f"  Max: {scores.max():.2f}")
+
+
+def _log_breed_distribution(breeds: pd.Series) -> None:
+    breed_counts = breeds.value_counts()
+    logger.info(f"Top 10 breeds in dataset:")
+    for breed, count in breed_counts.head(10).items():
+        logger.info(f"  {breed}: {count}")
+
+
+def run_generation(args, catalog: ProfileCatalog = BASE_CATALOG, report_breeds: bool = False) -> None:
+    """Generate and save a dataset as configured by ``add_generation_arguments`` options."""
+    if args.shards:
+        logger.info(f"Generating {args.num_profiles} profiles and {args.num_pairs} pairs in {args.shards} shards...")
+        for dataset in ("profiles", "pairs"):
+            removed = clear_shards(os.path.join(args.output_dir, dataset))
+            if removed:
+                logger.info(f"Removed {removed} shards of an earlier run from {args.output_dir}/{dataset}")
+        run_shards(_generate_shard, args.shards, args.num_profiles, args.num_pairs, args.seed,
+                   args.workers, output_dir=args.output_dir, fmt=args.format, catalog=catalog)
+        logger.info(f"Saved shards to {args.output_dir}")
+        _log_score_statistics(read_shards(os.path.join(args.output_dir, "pairs")).column("compatibility_score").to_numpy())
+        if report_breeds:
+            _log_breed_distribution(read_shards(os.path.join(args.output_dir, "profiles")).column("breed").to_pandas())
+        return
+
+    logger.info(f"Generating {args.num_profiles} dog profiles...")
+
+    # Generate dog profiles
+    rng = np.random.default_rng(args.seed)
+    columns = generate_profile_columns(args.num_profiles, rng, catalog=catalog)
+    profiles_df = profiles_frame(columns, catalog)
+
+    # Save profiles
+    profiles_df.to_csv(args.output_profiles, index=False)
+    logger.info(f"Saved {len(profiles_df)} dog profiles to {args.output_profiles}")
+
+    # Generate compatibility pairs
+    logger.info(f"Generating {args.num_pairs} compatibility pairs...")
+    pairs_df = generate_compatibility_pair_frame(columns, args.num_pairs, rng, catalog=catalog)
+
+    # Save pairs
+    pairs_df.to_csv(args.output_pairs, index=False)
+    logger.info(f"Saved {len(pairs_df)} compatibility pairs to {args.output_pairs}")
+
+    _log_score_statistics(pairs_df["compatibility_score"].to_numpy())
+    if report_breeds:
+        _log_breed_distribution(profiles_df["breed"])
+
+    logger.info("Data generation complete!")
@@ -0,0 +1,252 @@
+"""
+Image ingest stage for dog profile pictures.
+
+Scans the image directory once and writes a catalogue manifest with each
+photo's breed, dimensions, content hash (SHA-256) and perceptual hash (pHash),
+plus a fixed-size JPEG thumbnail per photo. Thumbnails are produced in parallel
+worker processes, and re-runs only process files whose size or mtime changed.
+Photos whose pHashes are within ``max_distance`` bits of an earlier photo are
+flagged as near-duplicates so generators can skip them.
+
+Consumers (``dog_generation.load_available_images``) read the manifest instead
+of globbing the directory and serve the small thumbnails, not the originals.
+
+Usage (from the repository root):
+    PYTHONPATH=src python -m data.image_catalog --images-dir data/profile_pictures/dogs
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from features.bitops import popcount
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGES_DIR = "data/profile_pictures/dogs"
+DEFAULT_CATALOG_DIR = "data/processed/image_catalog"
+MANIFEST_FILE = "manifest.json"
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_SIZE = 256  # pixels per side; photos are center-cropped to a square
+THUMBNAIL_QUALITY = 85
+DEFAULT_MAX_DISTANCE = 6  # pHash bits; <= 6 of 64 is the same photo re-encoded, resized or lightly edited
+
+PHASH_SIZE = 32  # side of the grayscale image the DCT runs on
+PHASH_BITS = 8  # keep the lowest 8 x 8 frequencies -> 64-bit hash
+PHASH_WIDTH = PHASH_BITS * PHASH_BITS  # bits per hash
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2-D DCT is ``D @ X @ D.T``."""
+    k = np.arange(n)[:, np.newaxis]
+    basis = np.cos(np.pi * (2 * np.arange(n) + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    basis[0] /= np.sqrt(2)
+    return basis
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def perceptual_hash(image: Image.Image) -> int:
+    """64-bit DCT pHash: low frequencies of a 32x32 grayscale image thresholded at their median."""
+    pixels = np.asarray(image.convert("L").resize((PHASH_SIZE, PHASH_SIZE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:PHASH_BITS, :PHASH_BITS].ravel()
+    # The DC term only tracks overall brightness, so it is left out of the median
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def breed_key(filename: str) -> Optional[str]:
+    """Breed key of an image filename (everything before the first underscore)."""
+    return filename.split("_")[0] if "_" in filename else None
+
+
+def _thumbnail(image: Image.Image, size: int) -> Image.Image:
+    """Center-crop to a square and resize to ``size`` x ``size``."""
+    width, height = image.size
+    side = min(width, height)
+    left, top = (width - side) // 2, (height - side) // 2
+    return image.crop((left, top, left + side, top + side)).resize((size, size), Image.LANCZOS)
+
+
+def _ingest_image(path: str, thumbnail_dir: str, size: int) -> Dict:
+    """Worker: hash one photo and write its thumbnail."""
+    with open(path, "rb") as f:
+        content = f.read()
+    stat = os.stat(path)
+    filename = os.path.basename(path)
+    thumbnail_path = os.path.join(thumbnail_dir, filename)
+
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert("RGB")
+        width, height = image.size
+        phash = perceptual_hash(image)
+        tmp_path = thumbnail_path + ".tmp"
+        _thumbnail(image, size).save(tmp_path, format="JPEG", quality=THUMBNAIL_QUALITY)
+        os.replace(tmp_path, thumbnail_path)
+
+    return {
+        "path": path,
+        "filename": filename,
+        "breed_key": breed_key(filename),
+        "width": width,
+        "height": height,
+        "bytes": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "phash": f"{phash:016x}",
+        "thumbnail": thumbnail_path,
+    }
+
+
+def _bands(count: int) -> List[Tuple[int, int]]:
+    """(shift, mask) of ``count`` near-equal bit ranges covering the 64-bit hash."""
+    if count > PHASH_WIDTH:
+        return [(0, 0)]  # more bands than bits: one band that puts every hash in the same bucket
+    edges = np.linspace(0, PHASH_WIDTH, count + 1).round().astype(int)
+    return [(int(lo), (1 << int(hi - lo)) - 1) for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def _band_matches(hashes: np.ndarray, shift: int, mask: int, max_distance: int) -> np.ndarray:
+    """Pairs ``i * n + j`` (``i < j``) that agree on one band and differ in at most ``max_distance`` bits."""
+    n = len(hashes)
+    keys = (hashes >> np.uint64(shift)) & np.uint64(mask)
+    order = np.argsort(keys, kind="stable")  # stable, so each bucket lists indices in ascending order
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    pairs = [np.empty(0, dtype=np.int64)]
+    for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+        members = order[start:start + size].astype(np.int64)
+        i, j = np.triu_indices(size, 1)
+        first, second = members[i], members[j]
+        close = popcount(hashes[first] ^ hashes[second]) <= max_distance
+        pairs.append(first[close] * n + second[close])
+    return np.concatenate(pairs)
+
+
+def find_near_duplicates(phashes: List[str], max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Tuple[int, int, int]]:
+    """
+    All pairs ``(i, j, distance)`` with ``i < j`` whose pHashes differ in at most
+    ``max_distance`` bits, sorted by ``(i, j)``.
+
+    The hash is split into ``max_distance + 1`` bands. Two hashes that differ in
+    at most ``max_distance`` bits agree exactly on at least one band, so only
+    hashes sharing a bucket in some band are compared, instead of all n^2 pairs.
+    """
+    hashes = np.array([int(h, 16) for h in phashes], dtype=np.uint64)
+    n = len(hashes)
+    if n < 2:
+        return []
+    pairs = np.unique(np.concatenate([_band_matches(hashes, shift, mask, max_distance)
+                                      for shift, mask in _bands(max_distance + 1)]))
+    first, second = pairs // n, pairs % n
+    distances = popcount(hashes[first] ^ hashes[second])
+    return list(zip(first.tolist(), second.tolist(), distances.tolist()))
+
+
+def _scan(images_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(images_dir, "*.jpg")))
+
+
+def load_catalog(catalog_dir: str = DEFAULT_CATALOG_DIR) -> Optional[Dict]:
+    """The catalogue manifest, or None if ``build_catalog`` has not been run."""
+    path = os.path.join(catalog_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_catalog(images_dir: str = DEFAULT_IMAGES_DIR, catalog_dir: str = DEFAULT_CATALOG_DIR,
+                  size: int = THUMBNAIL_SIZE, max_distance: int = DEFAULT_MAX_DISTANCE,
+                  workers: Optional[int] = None, force: bool = False) -> Dict:
+    """
+    Scan ``images_dir`` and refresh the manifest and thumbnails in ``catalog_dir``.
+    Photos already catalogued with the same size and mtime are not reprocessed
+    unless ``force`` is set or the thumbnail size changed.
+    """
+    thumbnail_dir = os.path.join(catalog_dir, THUMBNAIL_DIR)
+    os.makedirs(thumbnail_dir, exist_ok=True)
+
+    previous = load_catalog(catalog_dir)
+    known = {}
+    if previous is not None and previous.get("thumbnail_size") == size and not force:
+        known = {entry["path"]: entry for entry in previous["images"]}
+
+    entries, pending = {}, []
+    for path in _scan(images_dir):
+        stat = os.stat(path)
+        entry = known.get(path)
+        if entry and entry["bytes"] == stat.st_size and entry["mtime"] == stat.st_mtime \
+                and os.path.exists(entry["thumbnail"]):
+            entries[path] = entry
+        else:
+            pending.append(path)
+
+    if pending:
+        logger.info(f"Processing {len(pending)} new or changed images ({len(entries)} unchanged)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_ingest_image, pending, [thumbnail_dir] * len(pending), [size] * len(pending),
+                               chunksize=max(1, len(pending) // (4 * (workers or os.cpu_count() or 1))))
+            for entry in results:
+                entries[entry["path"]] = entry
+
+    # Drop thumbnails of photos that were removed from the directory
+    current = {os.path.basename(path) for path in entries}
+    for filename in os.listdir(thumbnail_dir):
+        if filename not in current:
+            os.remove(os.path.join(thumbnail_dir, filename))
+
+    images = [entries[path] for path in sorted(entries)]
+    for entry in images:
+        entry["duplicate_of"] = None
+        entry.pop("duplicate_distance", None)
+    # Flag every photo that is a near-duplicate of an earlier one
+    for i, j, distance in find_near_duplicates([entry["phash"] for entry in images], max_distance):
+        if images[j]["duplicate_of"] is None:
+            images[j]["duplicate_of"] = images[i]["filename"]
+            images[j]["duplicate_distance"] = distance
+
+    manifest = {
+        "images_dir": images_dir,
+        "thumbnail_size": size,
+        "max_distance": max_distance,
+        "images": images,
+    }
+    # Write the manifest last (atomically) so readers never see a half-built catalogue
+    tmp_path = os.path.join(catalog_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(catalog_dir, MANIFEST_FILE))
+
+    duplicates = sum(entry["duplicate_of"] is not None for entry in images)
+    logger.info(f"Catalogued {len(images)} images ({duplicates} near-duplicates) in {catalog_dir}")
+    return manifest
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Build the dog image catalogue: manifest, thumbnails and pHashes")
+    parser.add_argument("--images-dir", type=str, default=DEFAULT_IMAGES_DIR, help="Directory containing dog images")
+    parser.add_argument("--output-dir", type=str, default=DEFAULT_CATALOG_DIR, help="Directory for the manifest and thumbnails")
+    parser.add_argument("--size", type=int, default=THUMBNAIL_SIZE, help="Thumbnail side length in pixels")
+    parser.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE, help="pHash bit distance treated as a near-duplicate")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Reprocess every image")
+    args = parser.parse_args()
+
+    build_catalog(args.images_dir, args.output_dir, args.size, args.max_distance, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 # src/data/processor.py
+import argparse
 import pandas as pd
 import numpy as np
+from collections import Counter
 from pathlib import Path
 import logging
+import numbers
+
+from data.cleaning_stats import DEFAULT_STATS_PATH, CleaningStats
+from data.sketches import TDigest
 
 # Set up logging
 logging.basicConfig(
@@ -16,52 +22,229 @@ def load_data(file_path):
     logger.info(f"Loading data from {file_path}")
     return pd.read_csv(file_path)
 
-def clean_data(df):
-    """Clean the dataset by handling missing values and outliers."""
+def log_stats(stats):
+    for column, value in stats.fill_values.items():
+        kind = 'median' if isinstance(value, (int, float)) else 'mode'
+        logger.info(f"Found {stats.null_counts[column]} missing values in {column}; "
+                    f"filling with {kind}: {value}")
+    logger.info(f"Price bounds: [{stats.lower_bound:.2f}, {stats.upper_bound:.2f}] (stats version {stats.version})")
+
+def _iqr_bounds(Q1, Q3):
+    IQR = Q3 - Q1
+    return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+
+def _tie_key(value):
+    """Sort key that orders numbers before strings, so mixed int/str ties never compare across types."""
+    if isinstance(value, numbers.Number):
+        return (0, value, '')
+    return (1, 0, str(value))
+
+def _mode_of_counts(counts):
+    """Most frequent value, ties broken by the smallest value like Series.mode()[0]."""
+    top = max(counts.values())
+    return min((value for value, count in counts.items() if count == top), key=_tie_key)
+
+def compute_column_stats(df):
+    """
+    Null counts, medians, modes and price quartiles for the whole frame in one
+    pass: a single isnull() reduction and one quantile() call over every
+    numeric column that needs it, instead of per-column scans.
+    """
+    null_counts = df.isnull().sum()
+    missing = null_counts[null_counts > 0].index
+    numeric_columns = df.select_dtypes(include='number').columns
+    
+    # Medians of the numeric columns to impute, and price quartiles, in one call
+    quantile_columns = [c for c in numeric_columns if c in missing or c == 'price']
+    quantiles = df[quantile_columns].quantile([0.25, 0.5, 0.75]) if quantile_columns else None
+    
+    fill_values = {}
+    for column in missing:
+        if column in numeric_columns:
+            fill_values[column] = quantiles.at[0.5, column]
+        else:
+            fill_values[column] = _mode_of_counts(df[column].value_counts(sort=False).to_dict())
+    
+    if null_counts['price']:
+        # Quartiles are taken after imputation, so imputed prices count toward them
+        price = df['price'].to_numpy(dtype=np.float64)
+        price = np.where(np.isnan(price), fill_values['price'], price)
+        Q1, Q3 = np.quantile(price, [0.25, 0.75])
+    else:
+        Q1, Q3 = quantiles.at[0.25, 'price'], quantiles.at[0.75, 'price']
+    lower_bound, upper_bound = _iqr_bounds(Q1, Q3)
+    
+    return CleaningStats(len(df), null_counts[missing].to_dict(), fill_values, lower_bound, upper_bound)
+
+def clean_data(df, stats=None):
+    """
+    Clean the dataset by handling missing values and outliers. Missing values
+    are filled in place (``df`` is modified); the returned frame has price
+    outliers removed. Pass precomputed ``stats`` to skip fitting.
+    """
     logger.info("Cleaning dataset")
     
-    # Make a copy to avoid modifying the original dataframe
-    df_cleaned = df.copy()
+    if stats is None:
+        stats = compute_column_stats(df)
+    log_stats(stats)
     
     # Handle missing values
-    for column in df_cleaned.columns:
-        missing_count = df_cleaned[column].isnull().sum()
-        if missing_count > 0:
-            logger.info(f"Found {missing_count} missing values in {column}")
-            
-            # For numeric columns, fill with median
-            if pd.api.types.is_numeric_dtype(df_cleaned[column]):
-                median_value = df_cleaned[column].median()
-                df_cleaned[column] = df_cleaned[column].fillna(median_value)
-                logger.info(f"Filled missing values in {column} with median: {median_value}")
-            # For categorical columns, fill with mode
+    if stats.fill_values:
+        df.fillna(stats.fill_values, inplace=True)
+    
+    # Handle outliers in price (target variable) using the IQR bounds
+    keep = df['price'].between(stats.lower_bound, stats.upper_bound).to_numpy()
+    outlier_count = len(keep) - int(keep.sum())
+    if outlier_count:
+        logger.info(f"Found {outlier_count} outliers in price column")
+        df = df[keep]
+        logger.info(f"Removed outliers. New dataset shape: {df.shape}")
+    
+    return df
+
+# Numeric columns with at most this many distinct values keep exact counts,
+# so their median is exact (and a whole number for integer-valued columns)
+EXACT_COUNT_LIMIT = 1024
+
+class _NumericSummary:
+    """Streaming median of one numeric column: exact counts while small, t-digest beyond."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.digest = None
+
+    def update(self, values):
+        values = values.dropna().to_numpy(dtype=np.float64)
+        if self.digest is None:
+            uniques, counts = np.unique(values, return_counts=True)
+            self.counts.update(dict(zip(uniques.tolist(), counts.tolist())))
+            if len(self.counts) <= EXACT_COUNT_LIMIT:
+                return
+            # Too many distinct values: switch to the sketch
+            self.digest = TDigest()
+            self.digest.update(np.fromiter(self.counts, dtype=np.float64),
+                               np.fromiter(self.counts.values(), dtype=np.float64))
+            self.counts = None
+            return
+        self.digest.update(values)
+
+    def median(self):
+        if self.digest is not None:
+            return self.digest.quantile(0.5)
+        if not self.counts:
+            return np.nan
+        values = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[v] for v in values])
+        total = cumulative[-1]
+        # Same as Series.median: average the two middle values for an even count
+        lower = values[np.searchsorted(cumulative, (total - 1) // 2 + 1)]
+        upper = values[np.searchsorted(cumulative, total // 2 + 1)]
+        return (lower + upper) / 2
+
+def scan_data(input_file, chunksize):
+    """
+    First streaming pass: null counts, medians/modes for imputation and the
+    price IQR bounds, using bounded memory (exact counts or a t-digest per column).
+    """
+    null_counts = Counter()
+    kinds = {}  # column -> set of "chunk parsed as numeric" flags seen
+    summaries = {}
+    category_counts = {}
+    price_digest = TDigest()
+    rows = 0
+    
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        rows += len(chunk)
+        null_counts.update(chunk.isnull().sum().to_dict())
+        for column in chunk.columns:
+            values = chunk[column]
+            # A chunk where the column is entirely missing says nothing about its type
+            if values.isnull().all():
+                continue
+            is_numeric = pd.api.types.is_numeric_dtype(values)
+            kinds.setdefault(column, set()).add(is_numeric)
+            if is_numeric:
+                summaries.setdefault(column, _NumericSummary()).update(values)
             else:
-                mode_value = df_cleaned[column].mode()[0]
-                df_cleaned[column] = df_cleaned[column].fillna(mode_value)
-                logger.info(f"Filled missing values in {column} with mode: {mode_value}")
-    
-    # Handle outliers in price (target variable)
-    # Using IQR method to identify outliers
-    Q1 = df_cleaned['price'].quantile(0.25)
-    Q3 = df_cleaned['price'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+                category_counts.setdefault(column, Counter()).update(values.dropna().value_counts().to_dict())
+        price_digest.update(chunk['price'].to_numpy(dtype=np.float64))
     
-    # Filter out extreme outliers
-    outliers = df_cleaned[(df_cleaned['price'] < lower_bound) | 
-                          (df_cleaned['price'] > upper_bound)]
+    # Columns parsed as numbers in some chunks and as text in others are text
+    # when the file is read whole; recount them from their raw strings
+    mixed = sorted(column for column, seen in kinds.items() if len(seen) > 1)
+    if mixed:
+        logger.info(f"Recounting mixed-type columns as text: {', '.join(mixed)}")
+        for column in mixed:
+            summaries.pop(column, None)
+            category_counts[column] = Counter()
+        for chunk in pd.read_csv(input_file, chunksize=chunksize, usecols=mixed, dtype=str):
+            for column in mixed:
+                category_counts[column].update(chunk[column].dropna().value_counts().to_dict())
+    numeric = {column: kinds.get(column, {True}) == {True} for column in null_counts}
     
-    if not outliers.empty:
-        logger.info(f"Found {len(outliers)} outliers in price column")
-        df_cleaned = df_cleaned[(df_cleaned['price'] >= lower_bound) & 
-                                (df_cleaned['price'] <= upper_bound)]
-        logger.info(f"Removed outliers. New dataset shape: {df_cleaned.shape}")
+    fill_values = {}
+    for column, missing_count in null_counts.items():
+        if missing_count == 0:
+            continue
+        if numeric[column]:
+            fill_values[column] = summaries[column].median() if column in summaries else np.nan
+        elif column in category_counts:
+            fill_values[column] = _mode_of_counts(category_counts[column])
     
-    return df_cleaned
+    # Imputed prices count toward the quantiles, as in clean_data
+    if null_counts['price'] and 'price' in fill_values:
+        price_digest.add(fill_values['price'], null_counts['price'])
+    lower_bound, upper_bound = _iqr_bounds(price_digest.quantile(0.25), price_digest.quantile(0.75))
+    
+    missing = {column: count for column, count in null_counts.items() if count}
+    return CleaningStats(rows, missing, fill_values, lower_bound, upper_bound)
+
+def process_data_chunked(input_file, output_file, chunksize=100_000, stats=None):
+    """
+    Out-of-core processing pipeline: scan once for imputation values and outlier
+    bounds (unless fitted ``stats`` are given), then impute, filter and append
+    chunk by chunk. Peak memory is one chunk plus the per-column sketches,
+    independent of file size.
+    """
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    
+    if stats is None:
+        logger.info(f"Scanning {input_file} in chunks of {chunksize} rows")
+        stats = scan_data(input_file, chunksize)
+        logger.info(f"Scanned {stats.rows} rows")
+    log_stats(stats)
+    
+    rows = kept = 0
+    for i, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+        rows += len(chunk)
+        chunk.fillna(stats.fill_values, inplace=True)
+        chunk = chunk[chunk['price'].between(stats.lower_bound, stats.upper_bound)]
+        chunk.to_csv(output_file, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        kept += len(chunk)
+    
+    logger.info(f"Removed {rows - kept} outliers in price column")
+    logger.info(f"Saved {kept} processed rows to {output_file}")
+    return stats
 
-def process_data(input_file, output_file):
-    """Full data processing pipeline."""
+def process_data(input_file, output_file, chunksize=None, stats_file=None, fit=True):
+    """
+    Full data processing pipeline. Pass ``chunksize`` to stream files that do
+    not fit in memory. With ``fit`` the cleaning statistics are fitted on the
+    input and saved to ``stats_file`` (if given); otherwise the artifact in
+    ``stats_file`` is loaded and applied as-is.
+    """
+    stats = None
+    if not fit:
+        stats = CleaningStats.load(stats_file)
+        logger.info(f"Loaded cleaning stats {stats.version} from {stats_file}")
+    
+    if chunksize:
+        stats = process_data_chunked(input_file, output_file, chunksize, stats)
+        if fit and stats_file:
+            stats.save(stats_file)
+            logger.info(f"Saved cleaning stats {stats.version} to {stats_file}")
+        return stats
+    
     # Create output directory if it doesn't exist
     output_path = Path(output_file).parent
     output_path.mkdir(parents=True, exist_ok=True)
@@ -71,7 +254,12 @@ def process_data(input_file, output_file):
     logger.info(f"Loaded data with shape: {df.shape}")
     
     # Clean data
-    df_cleaned = clean_data(df)
+    if stats is None:
+        stats = compute_column_stats(df)
+        if stats_file:
+            stats.save(stats_file)
+            logger.info(f"Saved cleaning stats {stats.version} to {stats_file}")
+    df_cleaned = clean_data(df, stats)
     
     # Save processed data
     df_cleaned.to_csv(output_file, index=False)
@@ -79,9 +267,19 @@ def process_data(input_file, output_file):
     
     return df_cleaned
 
+def main():
+    parser = argparse.ArgumentParser(description='Clean the raw housing data.')
+    parser.add_argument('--input', default='data/raw/house_data.csv', help='Path to raw CSV file')
+    parser.add_argument('--output', default='data/processed/cleaned_house_data.csv', help='Path for cleaned CSV file')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Rows per chunk; streams the file out-of-core instead of loading it whole')
+    parser.add_argument('--stats', default=DEFAULT_STATS_PATH, help='Path of the cleaning stats artifact')
+    parser.add_argument('--apply-stats', action='store_true',
+                        help='Apply the existing stats artifact instead of fitting new statistics')
+    
+    args = parser.parse_args()
+    
+    process_data(args.input, args.output, args.chunksize, args.stats, fit=not args.apply_stats)
+
 if __name__ == "__main__":
-    # Example usage
-    process_data(
-        input_file="data/raw/house_data.csv", 
-        output_file="data/processed/cleaned_house_data.csv"
-    )
+    main()
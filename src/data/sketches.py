@@ -0,0 +1,78 @@
+"""
+Mergeable streaming quantile sketch for out-of-core processing.
+
+``TDigest`` is a merging t-digest: the data is summarized by a bounded number of
+weighted centroids, kept small near the tails (q -> 0 or 1) and large near the
+median through the k1 scale function. Whole chunks are folded in with NumPy, so
+the per-value cost is a sort and a few vector ops, and memory stays at
+O(compression) no matter how many values are seen.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+DEFAULT_COMPRESSION = 200  # roughly the number of centroids kept; accuracy ~ 1/compression near the median
+
+
+class TDigest:
+    """Approximate quantiles over a stream of numeric chunks."""
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: Iterable[float], weights: Optional[np.ndarray] = None) -> None:
+        """Fold a chunk of values (NaNs are ignored) into the digest."""
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = ~np.isnan(values)
+        values, weights = values[keep], weights[keep]
+        if values.size == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._merge(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self.update(np.array([value]), np.array([weight]))
+
+    def merge(self, other: "TDigest") -> None:
+        """Combine another digest (e.g. from a parallel worker) into this one."""
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._merge(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _merge(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Scale function k1: centroid index grows fastest at the tails
+        q_mid = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+        self.count = float(total)
+
+    def quantile(self, q: float) -> float:
+        """Approximate ``q``-quantile, interpolating between centroid centers."""
+        if not self.count:
+            return float("nan")
+        if len(self.means) == 1:
+            return float(self.means[0])
+        # Position of each centroid's center in the cumulative weight, with min/max pinned at the ends
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.count]
+        values = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q * self.count, positions, values))
+
+    def __len__(self) -> int:
+        return len(self.means)
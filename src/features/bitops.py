@@ -0,0 +1,19 @@
+# src/features/bitops.py
+"""
+Bit counting shared by every bitmask in the project: activity masks (pair
+features and compatibility scores), pHash distances (image catalogue) and
+the /search tag masks.
+"""
+import numpy as np
+
+# Number of set bits for every 16-bit value
+POPCOUNT_16 = np.array([bin(value).count('1') for value in range(1 << 16)], dtype=np.uint8)
+
+
+def popcount(values):
+    """Set bits of each element of an unsigned integer array (any width), as uint8 of the same shape."""
+    values = np.asarray(values)
+    if values.dtype.itemsize <= 2:
+        return POPCOUNT_16[values]
+    words = np.ascontiguousarray(values).view(np.uint16).reshape(*values.shape, values.dtype.itemsize // 2)
+    return POPCOUNT_16[words].sum(axis=-1, dtype=np.uint8)
@@ -0,0 +1,145 @@
+# src/features/dog_columns.py
+"""
+Per-dog reference data (breed traits, locations, activities) and the builder
+of the per-dog columns consumed by ``features.pair_features``.
+
+Both the synthetic generator (``data.dog_generation``) and the API serving path
+import from here, so this module only needs numpy: serving builds the same
+columns without pulling in pandas, pyarrow or the image catalogue.
+"""
+import hashlib
+from typing import Dict, Sequence
+
+import numpy as np
+
+# Dog breed data with typical characteristics
+BREED_CHARACTERISTICS = {
+    "Golden Retriever": {"energy": 7, "friendliness": 9, "size": "Large", "training": 8},
+    "Labrador Retriever": {"energy": 8, "friendliness": 9, "size": "Large", "training": 8},
+    "German Shepherd": {"energy": 8, "friendliness": 6, "size": "Large", "training": 9},
+    "Bulldog": {"energy": 3, "friendliness": 7, "size": "Medium", "training": 4},
+    "Poodle": {"energy": 6, "friendliness": 7, "size": "Medium", "training": 9},
+    "Beagle": {"energy": 7, "friendliness": 8, "size": "Medium", "training": 6},
+    "Border Collie": {"energy": 10, "friendliness": 7, "size": "Medium", "training": 10},
+    "French Bulldog": {"energy": 4, "friendliness": 8, "size": "Small", "training": 5},
+    "Siberian Husky": {"energy": 10, "friendliness": 6, "size": "Large", "training": 6},
+    "Yorkshire Terrier": {"energy": 6, "friendliness": 5, "size": "Small", "training": 5},
+    "Dachshund": {"energy": 5, "friendliness": 6, "size": "Small", "training": 4},
+    "Mixed Breed": {"energy": 6, "friendliness": 7, "size": "Medium", "training": 6},
+}
+
+# Extended breed characteristics including more breeds from the image collection
+EXTENDED_BREED_CHARACTERISTICS = {
+    **BREED_CHARACTERISTICS,
+    "Boxer": {"energy": 8, "friendliness": 8, "size": "Large", "training": 7},
+    "Chihuahua": {"energy": 7, "friendliness": 4, "size": "Small", "training": 5},
+    "Pug": {"energy": 4, "friendliness": 8, "size": "Small", "training": 6},
+    "Shiba Inu": {"energy": 6, "friendliness": 5, "size": "Medium", "training": 4},
+    "Corgi": {"energy": 7, "friendliness": 8, "size": "Medium", "training": 7},
+    "Australian Shepherd": {"energy": 9, "friendliness": 7, "size": "Medium", "training": 9},
+    "Mastiff": {"energy": 4, "friendliness": 7, "size": "Large", "training": 6},
+    "Greyhound": {"energy": 6, "friendliness": 6, "size": "Large", "training": 6},
+    "Cocker Spaniel": {"energy": 6, "friendliness": 8, "size": "Medium", "training": 7},
+    "Irish Setter": {"energy": 8, "friendliness": 8, "size": "Large", "training": 7},
+    "German Pointer": {"energy": 9, "friendliness": 7, "size": "Large", "training": 8},
+    "Miniature Schnauzer": {"energy": 6, "friendliness": 7, "size": "Small", "training": 8},
+    "Boston Terrier": {"energy": 6, "friendliness": 8, "size": "Small", "training": 7},
+    "Maltese": {"energy": 5, "friendliness": 7, "size": "Small", "training": 6},
+    "Havanese": {"energy": 6, "friendliness": 9, "size": "Small", "training": 7},
+    "Borzoi": {"energy": 5, "friendliness": 5, "size": "Large", "training": 5},
+    "Basenji": {"energy": 7, "friendliness": 5, "size": "Medium", "training": 4},
+    "Whippet": {"energy": 6, "friendliness": 7, "size": "Medium", "training": 6},
+    "Akita": {"energy": 6, "friendliness": 4, "size": "Large", "training": 6},
+    "Samoyed": {"energy": 8, "friendliness": 8, "size": "Large", "training": 7},
+    "Alaskan Malamute": {"energy": 8, "friendliness": 6, "size": "Large", "training": 6},
+}
+
+# Default characteristics for unknown breeds
+DEFAULT_BREED_CHARACTERISTICS = {"energy": 6, "friendliness": 7, "size": "Medium", "training": 6}
+
+LOCATIONS = [
+    "San Francisco, CA", "Oakland, CA", "Berkeley, CA", "San Jose, CA",
+    "New York, NY", "Brooklyn, NY", "Manhattan, NY", "Queens, NY",
+    "Los Angeles, CA", "Santa Monica, CA", "Beverly Hills, CA", "Pasadena, CA",
+    "Seattle, WA", "Portland, OR", "Austin, TX", "Denver, CO",
+    "Chicago, IL", "Boston, MA", "Miami, FL", "Atlanta, GA"
+]
+
+# Approximate (latitude, longitude) of each location, for pair distances
+LOCATION_COORDS = {
+    "San Francisco, CA": (37.7749, -122.4194), "Oakland, CA": (37.8044, -122.2712),
+    "Berkeley, CA": (37.8715, -122.2730), "San Jose, CA": (37.3382, -121.8863),
+    "New York, NY": (40.7128, -74.0060), "Brooklyn, NY": (40.6782, -73.9442),
+    "Manhattan, NY": (40.7831, -73.9712), "Queens, NY": (40.7282, -73.7949),
+    "Los Angeles, CA": (34.0522, -118.2437), "Santa Monica, CA": (34.0195, -118.4912),
+    "Beverly Hills, CA": (34.0736, -118.4004), "Pasadena, CA": (34.1478, -118.1445),
+    "Seattle, WA": (47.6062, -122.3321), "Portland, OR": (45.5152, -122.6784),
+    "Austin, TX": (30.2672, -97.7431), "Denver, CO": (39.7392, -104.9903),
+    "Chicago, IL": (41.8781, -87.6298), "Boston, MA": (42.3601, -71.0589),
+    "Miami, FL": (25.7617, -80.1918), "Atlanta, GA": (33.7490, -84.3880),
+}
+
+ACTIVITIES = [
+    "Fetch", "Swimming", "Hiking", "Running", "Tug of War",
+    "Frisbee", "Agility", "Walks", "Dog Parks", "Beach Days",
+    "Camping", "Jogging", "Socializing", "Training", "Playing"
+]
+
+# API profiles use lowercase sizes and may be "giant"
+SIZE_CODES = {"small": 0, "medium": 1, "large": 2, "giant": 3}
+STATE_CODES = {state: code for code, state in enumerate(sorted({location.split(", ")[-1] for location in LOCATIONS}))}
+
+# Traits (energy, friendliness, playfulness, training) are scored 1-TRAIT_SCALE in
+# the generated training data and in the breed table
+TRAIT_SCALE = 10
+TRAIT_FIELDS = ("energy_level", "friendliness", "playfulness", "training_level")
+
+
+def get_breed_characteristics(breed_name: str) -> Dict:
+    """Get breed characteristics, with defaults for unmapped breeds."""
+    return EXTENDED_BREED_CHARACTERISTICS.get(breed_name, DEFAULT_BREED_CHARACTERISTICS)
+
+
+def state_code(location: str) -> int:
+    """Code of the state suffix ("City, ST"); unknown states get a stable negative code."""
+    state = location.split(", ")[-1]
+    code = STATE_CODES.get(state)
+    return code if code is not None else -1 - int(hashlib.sha1(state.encode()).hexdigest()[:7], 16)
+
+
+def _trait_column(values, trait_scale: int) -> np.ndarray:
+    """Trait scores mapped linearly from 1-trait_scale onto the 1-TRAIT_SCALE training scale."""
+    values = np.asarray(values, dtype=np.int64)
+    if trait_scale == TRAIT_SCALE:
+        return values
+    return 1 + (values - 1) * ((TRAIT_SCALE - 1) / (trait_scale - 1))
+
+
+def profile_feature_columns(profiles: Sequence[Dict], trait_scale: int = TRAIT_SCALE) -> Dict[str, np.ndarray]:
+    """
+    Per-dog columns of ``features.pair_features`` for profile dicts (generated
+    rows or API profiles). Traits scored 1-``trait_scale`` are rescaled to the
+    1-10 training scale. Unknown locations have NaN coordinates; profiles
+    without vaccination status or activities count as not vaccinated / none.
+    """
+    traits = [get_breed_characteristics(p["breed"]) for p in profiles]
+    coords = [LOCATION_COORDS.get(p["location"], (np.nan, np.nan)) for p in profiles]
+    activity_bit = {activity: 1 << bit for bit, activity in enumerate(ACTIVITIES)}
+    columns = {field: _trait_column([p[field] for p in profiles], trait_scale) for field in TRAIT_FIELDS}
+    columns.update({
+        "age": np.array([p["age"] for p in profiles], dtype=np.int64),
+        "weight": np.array([p["weight"] for p in profiles], dtype=np.float64),
+        "size_code": np.array([SIZE_CODES.get(str(p["size"]).lower(), 1) for p in profiles], dtype=np.int64),
+        "breed_energy": np.array([t["energy"] for t in traits], dtype=np.int64),
+        "breed_friendliness": np.array([t["friendliness"] for t in traits], dtype=np.int64),
+        "breed_training": np.array([t["training"] for t in traits], dtype=np.int64),
+        "latitude": np.array([c[0] for c in coords]),
+        "longitude": np.array([c[1] for c in coords]),
+        "state_code": np.array([state_code(p["location"]) for p in profiles], dtype=np.int64),
+        "activity_mask": np.array([sum(activity_bit.get(a, 0) for a in p.get("favorite_activities", ()))
+                                   for p in profiles], dtype=np.uint16),
+        "good_with_dogs": np.array([bool(p["good_with_dogs"]) for p in profiles]),
+        "vaccinated": np.array([p.get("vaccinated", p.get("vaccination_status") == "Up to date")
+                                for p in profiles], dtype=bool),
+    })
+    return columns
@@ -1,4 +1,7 @@
 # src/features/engineer.py
+import glob
+import os
+import shutil
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -8,6 +11,9 @@ from sklearn.preprocessing import OneHotEncoder
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 import joblib
+from scipy import sparse
+
+from features.sparse_io import save_sparse_features, shard_dir
 
 # Set up logging
 logging.basicConfig(
@@ -42,13 +48,19 @@ def create_features(df):
     # Do NOT one-hot encode categorical variables here; let the preprocessor handle it
     return df_featured
 
-def create_preprocessor():
-    """Create a preprocessing pipeline."""
+# Define feature groups
+CATEGORICAL_FEATURES = ['location', 'condition']
+NUMERICAL_FEATURES = ['sqft', 'bedrooms', 'bathrooms', 'house_age', 'price_per_sqft', 'bed_bath_ratio']
+
+def create_preprocessor(categories='auto'):
+    """
+    Create a preprocessing pipeline. ``categories`` fixes the one-hot
+    vocabularies (one list per categorical feature) instead of learning them in fit.
+    """
     logger.info("Creating preprocessor pipeline")
     
-    # Define feature groups
-    categorical_features = ['location', 'condition']
-    numerical_features = ['sqft', 'bedrooms', 'bathrooms', 'house_age', 'price_per_sqft', 'bed_bath_ratio']
+    categorical_features = CATEGORICAL_FEATURES
+    numerical_features = NUMERICAL_FEATURES
     
     # Preprocessing for numerical features
     numerical_transformer = Pipeline(steps=[
@@ -57,21 +69,27 @@ def create_preprocessor():
     
     # Preprocessing for categorical features
     categorical_transformer = Pipeline(steps=[
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+        ('onehot', OneHotEncoder(categories=categories, handle_unknown='ignore'))
     ])
     
-    # Combine preprocessors in a column transformer
+    # Combine preprocessors in a column transformer; keep the output sparse so
+    # one-hot blocks of high-cardinality columns are never densified
     preprocessor = ColumnTransformer(
         transformers=[
             ('num', numerical_transformer, numerical_features),
             ('cat', categorical_transformer, categorical_features)
-        ]
+        ],
+        sparse_threshold=1.0
     )
     
     return preprocessor
 
-def run_feature_engineering(input_file, output_file, preprocessor_file):
-    """Full feature engineering pipeline."""
+def run_feature_engineering(input_file, output_file, preprocessor_file, output_format='sparse'):
+    """
+    Full feature engineering pipeline. The default ``sparse`` format writes a
+    memory-mappable CSR directory (see ``sparse_io``) to ``output_file``;
+    ``csv`` writes the dense matrix as before.
+    """
     # Load cleaned data
     logger.info(f"Loading data from {input_file}")
     df = pd.read_csv(input_file)
@@ -92,7 +110,15 @@ def run_feature_engineering(input_file, output_file, preprocessor_file):
     logger.info(f"Saved preprocessor to {preprocessor_file}")
     
     # Save fully preprocessed data
-    df_transformed = pd.DataFrame(X_transformed)
+    feature_names = preprocessor.get_feature_names_out()
+    if output_format == 'sparse':
+        X_transformed = sparse.csr_matrix(X_transformed)
+        save_sparse_features(output_file, X_transformed, feature_names, y.values if y is not None else None)
+        logger.info(f"Saved sparse preprocessed data ({X_transformed.nnz} non-zeros) to {output_file}")
+        return X_transformed
+    
+    X_dense = X_transformed.toarray() if sparse.issparse(X_transformed) else X_transformed
+    df_transformed = pd.DataFrame(X_dense, columns=feature_names)
     if y is not None:
         df_transformed['price'] = y.values
     df_transformed.to_csv(output_file, index=False)
@@ -100,14 +126,101 @@ def run_feature_engineering(input_file, output_file, preprocessor_file):
     
     return df_transformed
 
-if __name__ == "__main__":
+def scan_feature_stats(input_file, chunksize):
+    """
+    First pass over the cleaned CSV: per-chunk ``create_features``, accumulating
+    the numeric sums/counts behind the imputer means and the one-hot vocabularies.
+    """
+    sums = pd.Series(0.0, index=NUMERICAL_FEATURES)
+    counts = pd.Series(0, index=NUMERICAL_FEATURES)
+    vocabularies = {column: set() for column in CATEGORICAL_FEATURES}
+    has_missing = {column: False for column in CATEGORICAL_FEATURES}
+    rows = 0
+    
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        featured = create_features(chunk)
+        rows += len(featured)
+        sums += featured[NUMERICAL_FEATURES].sum()
+        counts += featured[NUMERICAL_FEATURES].count()
+        for column in CATEGORICAL_FEATURES:
+            values = featured[column]
+            has_missing[column] |= bool(values.isnull().any())
+            vocabularies[column].update(values.dropna().unique())
+    
+    # Same vocabulary order as OneHotEncoder(categories='auto'): sorted, missing last
+    categories = [sorted(vocabularies[column]) + ([np.nan] if has_missing[column] else [])
+                  for column in CATEGORICAL_FEATURES]
+    return rows, sums / counts, categories
+
+def fit_preprocessor_from_stats(sample, means, categories):
+    """
+    Build the preprocessor from accumulated statistics alone: it is fitted on a
+    one-row stub of ``sample``'s columns holding the full-data means (so the
+    imputer learns exactly those) and with the one-hot vocabularies fixed up
+    front. The values in ``sample`` are never used, so a chunk with an
+    all-missing column cannot drop it; the result equals a one-shot fit.
+    """
+    stub = sample.iloc[:1].copy()
+    for column in NUMERICAL_FEATURES:
+        stub[column] = means[column]
+    for column, vocabulary in zip(CATEGORICAL_FEATURES, categories):
+        stub[column] = vocabulary[0] if len(vocabulary) else np.nan
+    preprocessor = create_preprocessor(categories=categories)
+    preprocessor.fit(stub)
+    return preprocessor
+
+def run_feature_engineering_chunked(input_file, output_dir, preprocessor_file, chunksize=100_000):
+    """
+    Incremental feature engineering for data larger than RAM. A first pass
+    accumulates imputer means and category vocabularies; a second pass
+    transforms chunk by chunk into sparse shards ``output_dir/part-NNNNN``
+    (read back with ``sparse_io.load_sparse_shards``).
+    """
+    logger.info(f"Scanning {input_file} in chunks of {chunksize} rows")
+    rows, means, categories = scan_feature_stats(input_file, chunksize)
+    logger.info(f"Scanned {rows} rows; vocabulary sizes: "
+                f"{dict(zip(CATEGORICAL_FEATURES, map(len, categories)))}")
+    
+    # Shards from an earlier, longer run would otherwise be read back with this one
+    for stale in glob.glob(os.path.join(output_dir, 'part-*')):
+        shutil.rmtree(stale)
+    
+    preprocessor = None
+    shards = 0
+    for i, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+        featured = create_features(chunk)
+        X = featured.drop(columns=['price'], errors='ignore')
+        y = featured['price'].values if 'price' in featured.columns else None
+        if preprocessor is None:
+            preprocessor = fit_preprocessor_from_stats(X, means, categories)
+            joblib.dump(preprocessor, preprocessor_file)
+            logger.info(f"Saved preprocessor to {preprocessor_file}")
+        X_transformed = sparse.csr_matrix(preprocessor.transform(X))
+        save_sparse_features(shard_dir(output_dir, i), X_transformed, preprocessor.get_feature_names_out(), y)
+        shards += 1
+    
+    logger.info(f"Saved {shards} sparse shards ({rows} rows) to {output_dir}")
+    return preprocessor
+
+def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Feature engineering for housing data.')
     parser.add_argument('--input', required=True, help='Path to cleaned CSV file')
-    parser.add_argument('--output', required=True, help='Path for output CSV file (engineered features)')
+    parser.add_argument('--output', required=True,
+                        help='Output path: a directory for sparse output, a CSV file for csv output')
     parser.add_argument('--preprocessor', required=True, help='Path for saving the preprocessor')
+    parser.add_argument('--format', choices=['sparse', 'csv'], default='sparse',
+                        help='Sparse memory-mappable CSR arrays (default) or dense CSV')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Rows per chunk; fits incrementally and writes sparse shards to --output')
     
     args = parser.parse_args()
     
-    run_feature_engineering(args.input, args.output, args.preprocessor)
+    if args.chunksize:
+        run_feature_engineering_chunked(args.input, args.output, args.preprocessor, args.chunksize)
+    else:
+        run_feature_engineering(args.input, args.output, args.preprocessor, args.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# src/features/fast_transform.py
+"""
+Compiled inference-time version of the fitted feature preprocessor.
+
+``ColumnTransformer.transform`` on a one-row DataFrame spends milliseconds in
+pandas and sklearn validation. ``CompiledPreprocessor`` extracts the fitted
+state once (imputer fill values, one-hot category -> output column maps) and
+fills a preallocated feature vector straight from a dict, a list of dicts or a
+NumPy structured array.
+"""
+import math
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _steps(transformer):
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps if step not in (None, 'passthrough')]
+    return [] if transformer == 'passthrough' else [transformer]
+
+
+class CompiledPreprocessor:
+    """Array-only equivalent of a fitted ColumnTransformer of imputers and one-hot encoders."""
+
+    __slots__ = ('numeric_columns', 'numeric_fill', 'numeric_slots',
+                 'categorical_columns', 'category_maps', 'category_indexes', 'category_slots', 'missing_slots',
+                 'n_features')
+
+    def __init__(self, preprocessor: ColumnTransformer):
+        self.numeric_columns, numeric_fill, numeric_slots = [], [], []
+        self.categorical_columns, self.category_maps = [], []
+        self.category_indexes, self.category_slots, self.missing_slots = [], [], []
+
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop' or len(columns) == 0:
+                continue
+            if isinstance(columns[0], (int, np.integer)):
+                columns = [preprocessor.feature_names_in_[i] for i in columns]
+            steps = _steps(transformer)
+            encoder = steps[-1] if steps and isinstance(steps[-1], OneHotEncoder) else None
+            imputers = [step for step in steps if isinstance(step, SimpleImputer)]
+            if len(imputers) + (encoder is not None) != len(steps):
+                unsupported = [type(step).__name__ for step in steps
+                               if not isinstance(step, (SimpleImputer, OneHotEncoder))]
+                raise ValueError(f"Cannot compile transformer '{name}': unsupported steps {unsupported}")
+
+            fill = imputers[-1].statistics_ if imputers else [np.nan] * len(columns)
+            if encoder is None:
+                for column, value in zip(columns, fill):
+                    self.numeric_columns.append(column)
+                    numeric_fill.append(value)
+                    numeric_slots.append(offset)
+                    offset += 1
+                continue
+
+            if encoder.drop is not None or encoder.handle_unknown != 'ignore':
+                raise ValueError(f"Cannot compile transformer '{name}': only drop=None, "
+                                 f"handle_unknown='ignore' encoders are supported")
+            for i, (column, categories) in enumerate(zip(columns, encoder.categories_)):
+                mapping = {category: offset + j for j, category in enumerate(categories)
+                           if not _is_missing(category)}
+                # Missing values are either imputed first or, if seen during fit, a category of their own
+                missing_slot = next((offset + j for j, category in enumerate(categories)
+                                     if _is_missing(category)), None)
+                if imputers and not _is_missing(imputers[-1].statistics_[i]):
+                    missing_slot = mapping[imputers[-1].statistics_[i]]
+                if missing_slot is not None:
+                    mapping[None] = missing_slot
+                self.categorical_columns.append(column)
+                self.category_maps.append(mapping)
+                known = [(category, slot) for category, slot in mapping.items() if category is not None]
+                self.category_indexes.append(pd.Index([category for category, _ in known], dtype=object))
+                self.category_slots.append(np.array([slot for _, slot in known], dtype=np.intp))
+                self.missing_slots.append(missing_slot)
+                offset += len(categories)
+
+        self.numeric_fill = np.array(numeric_fill, dtype=np.float64)
+        self.numeric_slots = np.array(numeric_slots, dtype=np.intp)
+        self.n_features = offset
+
+    @classmethod
+    def load(cls, preprocessor_file):
+        return cls(joblib.load(preprocessor_file))
+
+    def transform_record(self, record, out=None):
+        """Feature vector for one dict, written into ``out`` (overwritten) or a new array."""
+        if out is None:
+            out = np.zeros(self.n_features)
+        else:
+            out.fill(0.0)
+        for column, value, slot in zip(self.numeric_columns, self.numeric_fill, self.numeric_slots):
+            x = record.get(column)
+            out[slot] = value if _is_missing(x) else x
+        for column, categories in zip(self.categorical_columns, self.category_maps):
+            x = record.get(column)
+            slot = categories.get(None if _is_missing(x) else x)
+            if slot is not None:  # unknown categories encode as all zeros
+                out[slot] = 1.0
+        return out
+
+    def transform_records(self, records):
+        """Feature matrix for a list of dicts, written into one preallocated array."""
+        out = np.zeros((len(records), self.n_features))
+        for row, record in zip(out, records):
+            self.transform_record(record, row)
+        return out
+
+    def transform_array(self, data):
+        """Vectorized transform of a structured array or DataFrame (column access by name)."""
+        n = len(data)
+        out = np.zeros((n, self.n_features))
+        for column, value, slot in zip(self.numeric_columns, self.numeric_fill, self.numeric_slots):
+            x = np.asarray(data[column], dtype=np.float64)
+            out[:, slot] = np.where(np.isnan(x), value, x)
+        rows = np.arange(n)
+        for column, index, slots, missing_slot in zip(self.categorical_columns, self.category_indexes,
+                                                      self.category_slots, self.missing_slots):
+            x = np.asarray(data[column], dtype=object)
+            pos = index.get_indexer(x)  # -1 for unknown and missing values
+            target = np.where(pos >= 0, slots[pos], -1)
+            if missing_slot is not None:
+                target[pd.isna(x)] = missing_slot
+            hit = target >= 0  # unknown categories encode as all zeros
+            out[rows[hit], target[hit]] = 1.0
+        return out
@@ -0,0 +1,167 @@
+# src/features/pair_features.py
+"""
+Single definition of the dog-pair features used for compatibility training.
+
+Every feature is a vectorized function of two aligned blocks of per-dog
+columns (dog A and dog B). Per-dog columns are computed once and kept in a
+``DogFeatureStore``, so a pair feature for any set of pairs is a gather by row
+index followed by array arithmetic. Dataset generation
+(``data.dog_generation``) and model training (``models.train_model``) both go
+through ``compute_pair_features``. The API can build the same features for a
+profile against its candidate pool (``api.inference.candidate_pair_features``),
+but online scoring still ranks with its rule-based component scores: no
+trained model is served yet.
+
+Per-dog columns (see ``features.dog_columns.profile_feature_columns``):
+energy_level, friendliness, playfulness, training_level, age, weight,
+size_code, breed_energy, breed_friendliness, breed_training, latitude,
+longitude, state_code, activity_mask, good_with_dogs, vaccinated.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from features.bitops import popcount
+
+DEFAULT_CONFIG_PATH = 'configs/model_config.yaml'
+STORE_META_FILE = 'meta.json'
+EARTH_RADIUS_MILES = 3958.8
+
+def _abs_diff(column):
+    return lambda a, b: np.abs(a[column] - b[column])
+
+
+def _combined(column):
+    return lambda a, b: (a[column] + b[column]) / 2
+
+
+def _both(column):
+    return lambda a, b: (a[column] & b[column]).astype(np.int64)
+
+
+def _size_compatibility(a, b):
+    # 1.0 for the same size, 0.25 less per size step
+    return np.maximum(0.0, 1.0 - 0.25 * np.abs(a['size_code'] - b['size_code']))
+
+
+def _breed_compatibility(a, b):
+    # Similarity of the breeds' typical energy/friendliness/training on the 1-10 scale
+    diff = (np.abs(a['breed_energy'] - b['breed_energy'])
+            + np.abs(a['breed_friendliness'] - b['breed_friendliness'])
+            + np.abs(a['breed_training'] - b['breed_training']))
+    return 1.0 - diff / 27.0
+
+
+def _location_distance(a, b):
+    # Great-circle distance in miles; NaN when either location is unknown
+    lat1, lat2 = np.radians(a['latitude']), np.radians(b['latitude'])
+    dlat = lat2 - lat1
+    dlon = np.radians(b['longitude'] - a['longitude'])
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def _activity_overlap(a, b):
+    return popcount(a['activity_mask'] & b['activity_mask']).astype(np.int64)
+
+
+def _training_level_match(a, b):
+    return 1.0 - np.abs(a['training_level'] - b['training_level']) / 9.0
+
+
+def _socialization_score(a, b):
+    # Average friendliness (0-1), scaled by how many of the two get along with dogs
+    friendliness = (a['friendliness'] + b['friendliness']) / 20.0
+    return friendliness * (a['good_with_dogs'].astype(np.float64) + b['good_with_dogs']) / 2
+
+
+# Feature name -> f(dog_a_columns, dog_b_columns), in output column order
+PAIR_FEATURES = {
+    # Configured feature sets (configs/model_config.yaml)
+    'energy_level_diff': _abs_diff('energy_level'),
+    'friendliness_combined': _combined('friendliness'),
+    'playfulness_combined': _combined('playfulness'),
+    'size_compatibility': _size_compatibility,
+    'age_diff': _abs_diff('age'),
+    'breed_compatibility': _breed_compatibility,
+    'location_distance': _location_distance,
+    'activity_overlap': _activity_overlap,
+    'training_level_match': _training_level_match,
+    'socialization_score': _socialization_score,
+    # Derived columns of the generated training pairs
+    'energy_diff': _abs_diff('energy_level'),
+    'weight_diff': _abs_diff('weight'),
+    'size_match': lambda a, b: (a['size_code'] == b['size_code']).astype(np.int64),
+    'same_location': lambda a, b: (a['state_code'] == b['state_code']).astype(np.int64),
+    'both_good_with_dogs': _both('good_with_dogs'),
+    'both_vaccinated': _both('vaccinated'),
+}
+
+
+def load_feature_sets(config_path=DEFAULT_CONFIG_PATH):
+    """The ``feature_sets`` mapping of the model config."""
+    with open(config_path) as f:
+        return yaml.safe_load(f)['model']['feature_sets']
+
+
+def configured_features(config_path=DEFAULT_CONFIG_PATH):
+    """Flat list of the configured pair features, in config order."""
+    names = [name for feature_set in load_feature_sets(config_path).values() for name in feature_set]
+    unknown = [name for name in names if name not in PAIR_FEATURES]
+    if unknown:
+        raise ValueError(f"Configured pair features without a definition: {unknown}")
+    return names
+
+
+class DogFeatureStore:
+    """Per-dog feature columns with an id -> row index, stored column-wise."""
+
+    def __init__(self, ids, columns):
+        self.ids = np.asarray(ids)
+        self.columns = columns
+        self._index = pd.Index(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self, ids):
+        """Row positions of ``ids``; raises KeyError for unknown dogs."""
+        rows = self._index.get_indexer(np.asarray(ids))
+        if (rows < 0).any():
+            raise KeyError(f"Unknown dog ids: {np.asarray(ids)[rows < 0][:5].tolist()}")
+        return rows
+
+    def gather(self, rows):
+        return {name: values[rows] for name, values in self.columns.items()}
+
+    def pair_features(self, rows_a, rows_b, names=None):
+        """Pair features for aligned row-index arrays (broadcasting, e.g. (n, 1) x (m,), is allowed)."""
+        return compute_pair_features(self.gather(rows_a), self.gather(rows_b), names)
+
+    def save(self, path):
+        """Write each column as a ``.npy`` file under directory ``path``."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'ids.npy'), self.ids)
+        for name, values in self.columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+        with open(os.path.join(path, STORE_META_FILE), 'w') as f:
+            json.dump({'columns': list(self.columns), 'rows': len(self)}, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a saved store; columns are memory-mapped when ``mmap`` is set."""
+        with open(os.path.join(path, STORE_META_FILE)) as f:
+            meta = json.load(f)
+        mode = 'r' if mmap else None
+        ids = np.load(os.path.join(path, 'ids.npy'), mmap_mode=mode, allow_pickle=True)
+        columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode) for name in meta['columns']}
+        return cls(ids, columns)
+
+
+def compute_pair_features(a, b, names=None):
+    """Evaluate the named pair features (default: all) over per-dog column blocks ``a`` and ``b``."""
+    names = list(PAIR_FEATURES) if names is None else names
+    return {name: PAIR_FEATURES[name](a, b) for name in names}
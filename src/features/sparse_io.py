@@ -0,0 +1,75 @@
+# src/features/sparse_io.py
+"""
+Binary, memory-mappable storage for engineered feature matrices.
+
+A matrix is saved as a directory holding the CSR components as raw ``.npy``
+files (``data``, ``indices``, ``indptr``), the optional target vector and a
+``meta.json`` with the shape and the column names from
+``get_feature_names_out``. Loading memory-maps the arrays, so opening even a
+large matrix costs a few file opens and the OS pages in only what is read.
+Chunked pipelines write one such directory per shard (``part-NNNNN``).
+"""
+import glob
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+META_FILE = 'meta.json'
+FORMAT_VERSION = 1
+
+
+def save_sparse_features(path, X, feature_names, target=None):
+    """Write ``X`` (sparse or dense) as CSR arrays plus metadata under directory ``path``."""
+    X = sparse.csr_matrix(X)
+    X.sum_duplicates()
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'data.npy'), X.data.astype(np.float64, copy=False))
+    np.save(os.path.join(path, 'indices.npy'), X.indices)
+    np.save(os.path.join(path, 'indptr.npy'), X.indptr)
+    if target is not None:
+        np.save(os.path.join(path, 'target.npy'), np.asarray(target, dtype=np.float64))
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'shape': list(X.shape),
+        'nnz': int(X.nnz),
+        'feature_names': [str(name) for name in feature_names],
+        'has_target': target is not None,
+    }
+    # Metadata goes last: a directory with meta.json is complete
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_sparse_features(path, mmap=True):
+    """
+    Load a matrix saved by ``save_sparse_features``. Returns ``(X, feature_names, target)``
+    with ``X`` a CSR matrix backed by memory-mapped arrays when ``mmap`` is set.
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported feature matrix format: {meta.get('format_version')}")
+
+    mode = 'r' if mmap else None
+    arrays = [np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode) for name in ('data', 'indices', 'indptr')]
+    X = sparse.csr_matrix(tuple(arrays), shape=tuple(meta['shape']), copy=False)
+    target = np.load(os.path.join(path, 'target.npy'), mmap_mode=mode) if meta['has_target'] else None
+    return X, meta['feature_names'], target
+
+
+def shard_dir(output_dir, shard_index):
+    return os.path.join(output_dir, f'part-{shard_index:05d}')
+
+
+def load_sparse_shards(path, mmap=True):
+    """Load and stack every ``part-NNNNN`` shard under ``path`` (same return value as ``load_sparse_features``)."""
+    parts = sorted(glob.glob(os.path.join(path, 'part-*')))
+    if not parts:
+        raise FileNotFoundError(f"No feature shards found in {path}")
+    loaded = [load_sparse_features(part, mmap) for part in parts]
+    X = sparse.vstack([X for X, _, _ in loaded], format='csr')
+    targets = [target for _, _, target in loaded]
+    target = np.concatenate(targets) if all(t is not None for t in targets) else None
+    return X, loaded[0][1], target
@@ -0,0 +1,135 @@
+# src/models/tracking.py
+"""
+MLflow tracking for model training and latency benchmarks.
+
+Runs are logged to ``MLFLOW_TRACKING_URI`` when it is set and otherwise to
+a local SQLite store (``sqlite:///mlflow.db``). That is the backend the
+server in ``deployment/mlflow`` runs on, so tracking works offline and the
+same history can be browsed with
+``mlflow ui --backend-store-uri sqlite:///mlflow.db``. A file store
+(``file:./mlruns``) works as well; MLflow 3 only accepts it with
+``MLFLOW_ALLOW_FILE_STORE=true``.
+
+Usage (from the repository root):
+    PYTHONPATH=src python -m models.tracking --compare
+"""
+import argparse
+import logging
+import os
+import time
+
+import mlflow
+import numpy as np
+
+logger = logging.getLogger('model-training')
+
+DEFAULT_TRACKING_URI = 'sqlite:///mlflow.db'
+DEFAULT_EXPERIMENT = 'dog-compatibility'
+LATENCY_BATCH_SIZES = (1, 32, 256, 2048)
+LATENCY_PERCENTILES = (50, 90, 99)
+LATENCY_REPEATS = 50
+
+# Metrics compared between runs: (lower is better, relative change tolerated before flagging)
+REGRESSION_METRICS = {
+    'mae': (True, 0.01),
+    'rmse': (True, 0.01),
+    'r2_score': (False, 0.01),
+    'train_seconds': (True, 0.25),
+    'latency_b1_p99_ms': (True, 0.25),
+    'latency_b256_p99_ms': (True, 0.25),
+}
+
+
+def tracking_uri(uri=None):
+    return uri or os.getenv('MLFLOW_TRACKING_URI') or DEFAULT_TRACKING_URI
+
+
+def measure_latency(predict, X, batch_sizes=LATENCY_BATCH_SIZES, repeats=LATENCY_REPEATS, seed=0):
+    """
+    Latency percentiles of ``predict`` on batches of each size drawn from
+    ``X``: ``{batch_size: {'p50_ms': ..., 'p90_ms': ..., 'p99_ms': ..., 'us_per_row': ...}}``.
+    """
+    rng = np.random.default_rng(seed)
+    latency = {}
+    for batch_size in batch_sizes:
+        if batch_size > len(X):
+            continue
+        predict(X[:batch_size])  # warm-up
+        timings = np.empty(repeats)
+        for i in range(repeats):
+            start = rng.integers(0, len(X) - batch_size + 1)
+            batch = X[start:start + batch_size]
+            tic = time.perf_counter()
+            predict(batch)
+            timings[i] = time.perf_counter() - tic
+        stats = {f'p{q}_ms': float(np.percentile(timings, q)) * 1e3 for q in LATENCY_PERCENTILES}
+        stats['us_per_row'] = float(np.median(timings)) / batch_size * 1e6
+        latency[batch_size] = stats
+    return latency
+
+
+def latency_metrics(latency):
+    """Flat MLflow metric names (``latency_b256_p99_ms``) for a ``measure_latency`` result."""
+    return {f'latency_b{batch_size}_{name}': value
+            for batch_size, stats in latency.items() for name, value in stats.items()}
+
+
+def log_training_run(metrics, model_path, metrics_path, latency, uri=None, experiment=DEFAULT_EXPERIMENT):
+    """Log one training run (parameters, metrics, latency and artifacts); returns the run id."""
+    mlflow.set_tracking_uri(tracking_uri(uri))
+    mlflow.set_experiment(experiment)
+    with mlflow.start_run(run_name=f"{metrics['model']}-{metrics['trained_at']}") as run:
+        mlflow.set_tags({'model': metrics['model'], 'target': metrics['target']})
+        mlflow.log_params({**metrics['params'], 'model': metrics['model'],
+                           'features': ','.join(metrics['features']),
+                           'train_rows': metrics['rows']['train'], 'test_rows': metrics['rows']['test']})
+        mlflow.log_metrics({**metrics['performance'], **metrics['timings'],
+                            'boosting_rounds': metrics['boosting_rounds'],
+                            'search_seconds': metrics['search']['seconds'],
+                            **latency_metrics(latency)})
+        for name, report in metrics['comparison'].items():
+            mlflow.log_metrics({f'{name}.{key}': value
+                                for key, value in {**report['performance'], **report['timings']}.items()})
+        mlflow.log_artifact(model_path, artifact_path='model')
+        mlflow.log_artifact(metrics_path)
+    logger.info(f"Logged run {run.info.run_id} to {tracking_uri(uri)} (experiment '{experiment}')")
+    return run.info.run_id
+
+
+def compare_latest_runs(uri=None, experiment=DEFAULT_EXPERIMENT):
+    """
+    Changes in ``REGRESSION_METRICS`` between the two most recent runs:
+    ``{metric: (previous, latest, regressed)}``, where ``regressed`` means worse
+    by more than the metric's tolerance.
+    """
+    mlflow.set_tracking_uri(tracking_uri(uri))
+    runs = mlflow.search_runs(experiment_names=[experiment], order_by=['start_time DESC'], max_results=2)
+    if len(runs) < 2:
+        raise ValueError(f"Need two runs in experiment '{experiment}' to compare, found {len(runs)}")
+    latest, previous = runs.iloc[0], runs.iloc[1]
+    changes = {}
+    for metric, (lower_is_better, tolerance) in REGRESSION_METRICS.items():
+        column = f'metrics.{metric}'
+        if column not in runs or np.isnan(latest[column]) or np.isnan(previous[column]):
+            continue
+        change = (latest[column] - previous[column]) / abs(previous[column]) if previous[column] else 0.0
+        regressed = change > tolerance if lower_is_better else change < -tolerance
+        changes[metric] = (float(previous[column]), float(latest[column]), bool(regressed))
+    return changes
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Inspect tracked training runs.')
+    parser.add_argument('--tracking-uri', default=None, help=f'MLflow tracking URI (default: {DEFAULT_TRACKING_URI})')
+    parser.add_argument('--experiment', default=DEFAULT_EXPERIMENT, help='MLflow experiment name')
+    parser.add_argument('--compare', action='store_true', help='Compare the two most recent runs')
+    args = parser.parse_args()
+
+    if args.compare:
+        for metric, (previous, latest, regressed) in compare_latest_runs(args.tracking_uri, args.experiment).items():
+            logger.info(f"{metric}: {previous:.4g} -> {latest:.4g}{'  REGRESSION' if regressed else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# src/models/train_model.py
+"""
+Train the dog compatibility model described by ``configs/model_config.yaml``.
+
+Pairs and profiles are read as Arrow tables: sharded datasets from
+``data.generate_dog_data --shards`` (Arrow IPC shards are memory-mapped, so
+nothing is copied until features are computed) or the single CSV files of a
+plain run. The configured pair features come from ``features.pair_features``,
+the same definitions the generator derives its pair columns from.
+
+The search evaluates every ``search.param_grid`` combination with K-fold
+cross-validation, one (candidate, fold) fit per task across a process pool.
+Boosting stops early after ``n_iter_no_change`` rounds without improvement on
+the ``validation_fraction`` hold-out. The best parameters are refit on the
+training split and compared with sklearn's histogram-based gradient boosting
+on the same split. Metrics and timings are saved as a JSON artifact next to
+the model, together with prediction latency percentiles at several batch
+sizes, and the run is logged to MLflow (see ``models.tracking``).
+
+Usage (from the repository root):
+    PYTHONPATH=src python -m models.train_model --data-dir data/raw/dog_dataset
+    PYTHONPATH=src python -m models.train_model --profiles data/raw/dog_profiles.csv --pairs data/raw/dog_compatibility_pairs.csv
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pyarrow.csv as pcsv
+import yaml
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+
+from data.dog_generation import profile_table_feature_columns
+from data.shards import read_shards
+from features.pair_features import DogFeatureStore, configured_features
+from models.tracking import DEFAULT_EXPERIMENT, log_training_run, measure_latency
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('model-training')
+
+DEFAULT_CONFIG_PATH = 'configs/model_config.yaml'
+DEFAULT_MODEL_PATH = 'models/trained/dog_compatibility_model.pkl'
+DEFAULT_METRICS_PATH = 'models/trained/dog_compatibility_metrics.json'
+FEATURE_BLOCK_ROWS = 1_000_000  # pairs per block when building the feature matrix
+COMPATIBLE_THRESHOLD = 70  # score at which a pair counts as compatible (accuracy_at_threshold)
+LATENCY_SAMPLES = 200
+
+MODELS = ('GradientBoosting', 'HistGradientBoosting')
+
+
+def load_config(config_path=DEFAULT_CONFIG_PATH):
+    with open(config_path) as f:
+        return yaml.safe_load(f)['model']
+
+
+def load_tables(data_dir=None, profiles_path=None, pairs_path=None):
+    """Profile and pair tables from a shard directory or from the two CSV files."""
+    if data_dir:
+        return read_shards(os.path.join(data_dir, 'profiles')), read_shards(os.path.join(data_dir, 'pairs'))
+    if not (profiles_path and pairs_path):
+        raise ValueError("Pass a shard directory or both the profiles and pairs CSV files")
+    return pcsv.read_csv(profiles_path), pcsv.read_csv(pairs_path)
+
+
+def build_training_matrix(profiles, pairs, feature_names, target):
+    """Pair feature matrix (float64, in ``feature_names`` order) and target vector."""
+    store = DogFeatureStore(profiles.column('dog_id').to_numpy(), profile_table_feature_columns(profiles))
+    rows_a = store.rows(pairs.column('dog1_id').to_numpy())
+    rows_b = store.rows(pairs.column('dog2_id').to_numpy())
+
+    X = np.empty((pairs.num_rows, len(feature_names)))
+    for start in range(0, pairs.num_rows, FEATURE_BLOCK_ROWS):
+        block = slice(start, start + FEATURE_BLOCK_ROWS)
+        features = store.pair_features(rows_a[block], rows_b[block], feature_names)
+        for j, name in enumerate(feature_names):
+            X[block, j] = features[name]
+    y = pairs.column(target).to_numpy().astype(np.float64, copy=False)
+    return X, y
+
+
+def make_model(name, params):
+    """Estimator ``name`` with the config's GradientBoosting-style ``params``."""
+    if name == 'GradientBoosting':
+        return GradientBoostingRegressor(**params)
+    if name == 'HistGradientBoosting':
+        return HistGradientBoostingRegressor(
+            loss=params.get('loss', 'squared_error'),
+            learning_rate=params.get('learning_rate', 0.1),
+            max_iter=params.get('n_estimators', 100),
+            max_depth=params.get('max_depth'),
+            min_samples_leaf=params.get('min_samples_leaf', 20),
+            early_stopping=params.get('n_iter_no_change') is not None,
+            validation_fraction=params.get('validation_fraction', 0.1),
+            n_iter_no_change=params.get('n_iter_no_change') or 10,
+            tol=params.get('tol', 1e-7),
+            random_state=params.get('random_state'),
+        )
+    raise ValueError(f"Unknown model '{name}', expected one of {MODELS}")
+
+
+def boosting_rounds(model):
+    """Number of boosting rounds actually fitted (after early stopping)."""
+    return int(getattr(model, 'n_estimators_', getattr(model, 'n_iter_', 0)))
+
+
+def regression_metrics(y_true, y_pred):
+    return {
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'rmse': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        'r2_score': float(r2_score(y_true, y_pred)),
+        'accuracy_at_threshold': float(np.mean((y_true >= COMPATIBLE_THRESHOLD) == (y_pred >= COMPATIBLE_THRESHOLD))),
+    }
+
+
+# Search data, set once per worker process by the pool initializer
+_SEARCH_X = None
+_SEARCH_Y = None
+
+
+def _init_search_worker(X, y):
+    global _SEARCH_X, _SEARCH_Y
+    _SEARCH_X, _SEARCH_Y = X, y
+
+
+def _fit_fold(model_name, params, fold, cv_folds):
+    """Fit one candidate on one CV fold; returns (fold MAE, fit seconds, boosting rounds)."""
+    splits = KFold(n_splits=cv_folds, shuffle=True, random_state=params.get('random_state'))
+    train_idx, test_idx = list(splits.split(_SEARCH_X))[fold]
+    model = make_model(model_name, params)
+    start = time.perf_counter()
+    model.fit(_SEARCH_X[train_idx], _SEARCH_Y[train_idx])
+    fit_seconds = time.perf_counter() - start
+    mae = mean_absolute_error(_SEARCH_Y[test_idx], model.predict(_SEARCH_X[test_idx]))
+    return float(mae), fit_seconds, boosting_rounds(model)
+
+
+def search_hyperparameters(X, y, model_name, base_params, param_grid, cv_folds=3, workers=None):
+    """
+    Cross-validated grid search over ``param_grid`` (values override
+    ``base_params``). Returns the best parameters by mean CV MAE and one
+    result entry per candidate.
+    """
+    keys = list(param_grid)
+    candidates = [dict(base_params, **dict(zip(keys, values)))
+                  for values in itertools.product(*(param_grid[key] for key in keys))]
+    tasks = [(i, fold) for i in range(len(candidates)) for fold in range(cv_folds)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    logger.info(f"Searching {len(candidates)} candidates x {cv_folds} folds on {len(y)} rows "
+                f"with {workers} worker processes")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker, initargs=(X, y)) as pool:
+        futures = [pool.submit(_fit_fold, model_name, candidates[i], fold, cv_folds) for i, fold in tasks]
+        outcomes = [future.result() for future in futures]
+
+    results = []
+    for i, candidate in enumerate(candidates):
+        folds = [outcome for (c, _), outcome in zip(tasks, outcomes) if c == i]
+        results.append({
+            'params': {key: candidate[key] for key in keys},
+            'cv_mae': float(np.mean([mae for mae, _, _ in folds])),
+            'fit_seconds': float(np.mean([seconds for _, seconds, _ in folds])),
+            'boosting_rounds': float(np.mean([rounds for _, _, rounds in folds])),
+        })
+    best = min(range(len(candidates)), key=lambda i: results[i]['cv_mae'])
+    return candidates[best], results
+
+
+def evaluate_model(model_name, params, X_train, y_train, X_test, y_test):
+    """Fit on the training split; returns the model and its test metrics and timings."""
+    model = make_model(model_name, params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    # Single-pair latency, as for one online request
+    latencies = []
+    for row in X_test[:LATENCY_SAMPLES]:
+        start = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - start)
+
+    report = {
+        'performance': regression_metrics(y_test, y_pred),
+        'timings': {
+            'train_seconds': train_seconds,
+            'batch_predict_us_per_row': batch_seconds / max(len(y_test), 1) * 1e6,
+            'single_predict_ms_p50': float(np.median(latencies)) * 1e3,
+        },
+        'boosting_rounds': boosting_rounds(model),
+    }
+    return model, report
+
+
+def save_metrics(metrics, path=DEFAULT_METRICS_PATH):
+    """Write the metrics artifact atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(metrics, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def train(config_path=DEFAULT_CONFIG_PATH, data_dir=None, profiles_path=None, pairs_path=None,
+          model_path=DEFAULT_MODEL_PATH, metrics_path=DEFAULT_METRICS_PATH, workers=None, max_rows=None,
+          track=True, tracking_uri=None, experiment=DEFAULT_EXPERIMENT):
+    """Search, fit, save and (with ``track``) log the configured model; returns the metrics artifact."""
+    config = load_config(config_path)
+    model_name = config['best_model']
+    params = dict(config['parameters'])
+    search = config.get('search', {})
+    feature_names = configured_features(config_path)
+    seed = params.get('random_state')
+
+    logger.info("Loading pair data")
+    profiles, pairs = load_tables(data_dir, profiles_path, pairs_path)
+    X, y = build_training_matrix(profiles, pairs, feature_names, config['target_variable'])
+    logger.info(f"Built {X.shape[0]} x {X.shape[1]} feature matrix")
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=search.get('test_size', 0.2), random_state=seed)
+
+    # Search on a sample; early stopping keeps the larger n_estimators cheap
+    max_rows = max_rows or search.get('max_rows') or len(y_train)
+    sample = np.random.default_rng(seed).permutation(len(y_train))[:max_rows]
+    start = time.perf_counter()
+    best_params, results = search_hyperparameters(
+        X_train[sample], y_train[sample], model_name, params,
+        search.get('param_grid', {}), search.get('cv_folds', 3), workers)
+    search_seconds = time.perf_counter() - start
+    logger.info(f"Best parameters: {({key: best_params[key] for key in search.get('param_grid', {})})} "
+                f"(search took {search_seconds:.1f}s)")
+
+    reports, chosen = {}, None
+    for name in MODELS:
+        model, reports[name] = evaluate_model(name, best_params, X_train, y_train, X_test, y_test)
+        performance, timings = reports[name]['performance'], reports[name]['timings']
+        logger.info(f"{name}: MAE {performance['mae']:.3f}, RMSE {performance['rmse']:.3f}, "
+                    f"R2 {performance['r2_score']:.4f}, trained in {timings['train_seconds']:.2f}s "
+                    f"({reports[name]['boosting_rounds']} rounds), "
+                    f"{timings['batch_predict_us_per_row']:.2f} us/row batch, "
+                    f"{timings['single_predict_ms_p50']:.3f} ms single")
+        if name == model_name:
+            chosen = model
+
+    metrics = {
+        'model': model_name,
+        'trained_at': datetime.now().isoformat(),
+        'config': config_path,
+        'features': feature_names,
+        'target': config['target_variable'],
+        'params': best_params,
+        'rows': {'train': int(len(y_train)), 'test': int(len(y_test))},
+        'search': {
+            'cv_folds': search.get('cv_folds', 3),
+            'rows': int(len(sample)),
+            'seconds': search_seconds,
+            'results': results,
+        },
+        **reports[model_name],
+        'comparison': {name: report for name, report in reports.items() if name != model_name},
+    }
+    latency = measure_latency(chosen.predict, X_test)
+    metrics['latency'] = {str(batch_size): stats for batch_size, stats in latency.items()}
+    for batch_size, stats in latency.items():
+        logger.info(f"Batch {batch_size}: p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms "
+                    f"({stats['us_per_row']:.2f} us/row)")
+
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    joblib.dump(chosen, model_path)
+    save_metrics(metrics, metrics_path)
+    logger.info(f"Saved model to {model_path} and metrics to {metrics_path}")
+    if track:
+        metrics['run_id'] = log_training_run(metrics, model_path, metrics_path, latency, tracking_uri, experiment)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the dog compatibility model.')
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help='Model config YAML')
+    parser.add_argument('--data-dir', default=None,
+                        help='Sharded dataset directory with profiles/ and pairs/ (from --shards generation)')
+    parser.add_argument('--profiles', default=None, help='Profiles CSV (when not using --data-dir)')
+    parser.add_argument('--pairs', default=None, help='Compatibility pairs CSV (when not using --data-dir)')
+    parser.add_argument('--model-output', default=DEFAULT_MODEL_PATH, help='Path for the trained model')
+    parser.add_argument('--metrics-output', default=DEFAULT_METRICS_PATH, help='Path for the metrics artifact')
+    parser.add_argument('--workers', type=int, default=None, help='Search worker processes (default: all cores)')
+    parser.add_argument('--max-rows', type=int, default=None,
+                        help='Training rows sampled for the search (default: search.max_rows in the config)')
+    parser.add_argument('--tracking-uri', default=None,
+                        help='MLflow tracking URI (default: $MLFLOW_TRACKING_URI or sqlite:///mlflow.db)')
+    parser.add_argument('--experiment', default=DEFAULT_EXPERIMENT, help='MLflow experiment name')
+    parser.add_argument('--no-tracking', action='store_true', help='Do not log the run to MLflow')
+    args = parser.parse_args()
+
+    train(args.config, args.data_dir, args.profiles, args.pairs,
+          args.model_output, args.metrics_output, args.workers, args.max_rows,
+          not args.no_tracking, args.tracking_uri, args.experiment)
+
+
+if __name__ == "__main__":
+    main()
@@ -78,12 +78,37 @@ footer {visibility: hidden;}
 
 # ---------------- Backend config ----------------
 API_URL = os.getenv("API_URL", "http://localhost:8081")
-
+# Seconds a search response is reused for an identical payload
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """One pooled HTTP session per server process, so connections to the API are reused across reruns."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=SEARCH_CACHE_TTL, max_entries=256, show_spinner=False)
 def _api_search(payload: Dict[str, Any]) -> Dict[str, Any]:
-    r = requests.post(f"{API_URL}/search", json=payload, timeout=25)
+    """Search results, memoized per payload for SEARCH_CACHE_TTL seconds (errors are not cached)."""
+    r = _http_session().post(f"{API_URL}/search", json=payload, timeout=25)
     r.raise_for_status()
     return r.json()
 
+def _api_search_stream(payload: Dict[str, Any]):
+    """Events of /search/stream (one dict per NDJSON line) as the API sends them."""
+    with _http_session().post(f"{API_URL}/search/stream", json=payload, timeout=25, stream=True) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if line:
+                yield json.loads(line)
+
+# Map points are fetched in one projected request; full cards one page at a time
+MAP_FIELDS = ["destination", "score", "confidence", "lat", "lon"]
+MAP_LIMIT = 500
+
 # ---------------- Sidebar ----------------
 st.sidebar.header("Query & Filters")
 q = st.sidebar.text_area(
@@ -92,13 +117,14 @@ q = st.sidebar.text_area(
     height=80,
 )
 c1, c2 = st.sidebar.columns(2)
-with c1: k = st.number_input("Results", 3, 50, 12, 1)
+with c1: k = st.number_input("Results per page", 3, 50, 12, 1)
 with c2: min_conf = st.slider("Min confidence", 0.0, 1.0, 0.0, 0.05)
 
 st.sidebar.subheader("Attributes")
 geo = st.sidebar.multiselect("Geographic type", ["coastal","mountain","island","urban","desert","forest","river","lake"])
 cult = st.sidebar.multiselect("Cultural focus", ["food","art","history","music","markets","festivals","crafts"])
 exp  = st.sidebar.multiselect("Experience tags", ["quiet","nightlife","adventure","local","hiking","kayak","wildlife","scenic","photography"])
+strict = st.sidebar.checkbox("Only destinations matching a selected attribute", False)
 
 st.sidebar.subheader("Model & Bias Controls")
 model = st.sidebar.selectbox("Retrieval model", ["attribute+context (recommended)","BM25","TF-IDF"], index=0)
@@ -123,10 +149,12 @@ st.markdown(
 
 # ---------------- Helpers ----------------
 def payload() -> Dict[str, Any]:
+    """First-page search request from the sidebar widgets (k is the page size)."""
     m = "attribute+context" if model.startswith("attribute") else ("bm25" if model.lower().startswith("bm25") else "tfidf")
     return {
         "query": q.strip(),
-        "filters": {"geotype": geo, "culture": cult, "experience": exp, "min_confidence": float(min_conf)},
+        "filters": {"geotype": geo, "culture": cult, "experience": exp, "min_confidence": float(min_conf),
+                    "strict": bool(strict)},
         "retrieval": {
             "model": m, "use_bloom": bool(use_bloom), "zipf_penalty": float(zipf),
             "tier_bucketing": bool(tier), "use_trends": bool(use_trends),
@@ -176,37 +204,84 @@ def render_result_card(r: Dict[str, Any], i: int):
         st.json(r.get("why", {}))
         st.markdown("</div>", unsafe_allow_html=True)
 
-# ---------------- Run search ----------------
-if "results" not in st.session_state: st.session_state["results"] = None
+def map_payload(search: Dict[str, Any]) -> Dict[str, Any]:
+    """Same search, projected to the fields the map needs, in one large page."""
+    return {**search, "fields": MAP_FIELDS, "retrieval": {**search["retrieval"], "k": MAP_LIMIT}}
+
+def load_next_page():
+    """Append the next page of full cards (button callback, runs before the rerun)."""
+    results = st.session_state["results"]
+    try:
+        page = _api_search({**st.session_state["search"], "cursor": results["next_cursor"]})
+    except Exception as e:
+        st.session_state["page_error"] = f"API call failed: {e}"
+        return
+    results["results"] = results["results"] + page["results"]
+    results["next_cursor"] = page.get("next_cursor")
+
+def stream_first_page(search: Dict[str, Any]):
+    """Render cards as /search/stream settles them; returns the page in /search response form."""
+    page = {"query": search["query"], "results": []}
+    try:
+        with st.spinner("Searching blogs and ranking destinations…"):
+            for event in _api_search_stream(search):
+                if event["type"] == "result":
+                    page["results"].append(event["result"])
+                    render_result_card(event["result"], event["rank"])
+                else:
+                    page.update(params=event["params"], total=event["total"], next_cursor=event["next_cursor"])
+    except Exception as e:
+        st.error(f"API call failed: {e}")
+        return None
+    return page
 
-if run and q.strip():
-    with st.spinner("Searching blogs and ranking destinations…"):
-        try:
-            st.session_state["results"] = _api_search(payload())
-        except Exception as e:
-            st.error(f"API call failed: {e}")
-            st.session_state["results"] = None
+# ---------------- Run search ----------------
+for key in ("results", "map", "search", "page_error"):
+    if key not in st.session_state: st.session_state[key] = None
 
-results = st.session_state["results"]
+new_search = bool(run and q.strip())
+if new_search:
+    # Later pages must continue this search, whatever the widgets say by then
+    st.session_state["search"] = payload()
+    st.session_state["results"] = st.session_state["map"] = None
 
 tabs = st.tabs(["Results", "Map", "Diagnostics", "About"])
 
 with tabs[0]:
+    caption = st.empty()
+    if new_search:
+        # First page arrives card by card; later pages come from the cached /search
+        st.session_state["results"] = stream_first_page(st.session_state["search"])
+    results = st.session_state["results"]
     if not results:
         st.info("Run a search from the sidebar to see recommendations.")
     else:
-        st.caption(f"Showing top {len(results.get('results', []))} for: “{results.get('query','')}”")
-        for i, r in enumerate(results.get("results", []), start=1):
-            render_result_card(r, i)
+        total = results.get("total") or len(results.get("results", []))
+        caption.caption(f"Showing top {len(results.get('results', []))} of {total} for: “{results.get('query','')}”")
+        if not new_search:
+            for i, r in enumerate(results.get("results", []), start=1):
+                render_result_card(r, i)
+        if st.session_state["page_error"]:
+            st.error(st.session_state["page_error"])
+            st.session_state["page_error"] = None
+        if results.get("next_cursor"):
+            st.button("Load more", on_click=load_next_page, use_container_width=True)
+
+if st.session_state["search"] and results and st.session_state["map"] is None:
+    try:
+        st.session_state["map"] = _api_search(map_payload(st.session_state["search"]))
+    except Exception as e:
+        st.error(f"API call failed: {e}")
+map_results = st.session_state["map"]
 
 with tabs[1]:
-    if not results:
+    if not map_results:
         st.info("Run a search first to populate the map.")
     else:
         df = pd.DataFrame([
-            {"destination": r["destination"], "country": r.get("country",""), "lat": r.get("lat"), "lon": r.get("lon"),
+            {"destination": r["destination"], "lat": r.get("lat"), "lon": r.get("lon"),
              "score": r.get("score"), "confidence": r.get("confidence")}
-            for r in results.get("results", [])
+            for r in map_results.get("results", [])
             if r.get("lat") is not None and r.get("lon") is not None
         ])
         if df.empty:
@@ -224,7 +299,7 @@ with tabs[1]:
             )
             vs = pdk.ViewState(latitude=float(df.lat.mean()), longitude=float(df.lon.mean()), zoom=2.5)
             st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=vs,
-                                     tooltip={"text": "{destination}\n{country}\nscore: {score}\nconf: {confidence}"}))
+                                     tooltip={"text": "{destination}\nscore: {score}\nconf: {confidence}"}))
 
 with tabs[2]:
     if not results:
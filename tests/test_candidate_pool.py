@@ -0,0 +1,87 @@
+import pytest
+
+from api import inference
+from api.inference import DogDatabase, find_matches
+from api.schemas import DogMatchRequest
+from api.score_cache import ScoreCache
+
+PROFILE = {
+    "name": "Rex", "breed": "Beagle", "age": 3, "size": "medium", "gender": "male", "weight": 30.0,
+    "energy_level": 5, "friendliness": 5, "playfulness": 4, "training_level": 3,
+    "good_with_dogs": True, "good_with_kids": True, "good_with_cats": False, "location": "Austin, TX",
+}
+REQUEST = DogMatchRequest(dog_profile=PROFILE, min_compatibility_score=0.0)
+
+
+def _dog(i, **traits):
+    dog = {"id": f"dog-{i}", "name": f"Dog {i}", "breed": "Poodle", "age": 2 + i, "size": "medium",
+           "weight": 40.0, "energy_level": 1 + i % 5, "friendliness": 4, "playfulness": 3, "training_level": 4,
+           "good_with_dogs": True, "location": "Austin, TX"}
+    dog.update(traits)
+    return dog
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = DogDatabase()
+    for i in range(5):
+        database.add(_dog(i))
+    monkeypatch.setattr(inference, "MOCK_DOG_DATABASE", database)
+    monkeypatch.setattr(inference, "_DATABASE_POOL", None)
+    monkeypatch.setattr(inference, "SCORE_CACHE", ScoreCache())
+    return database
+
+
+def _scores():
+    return {match.dog_id: match.compatibility_score for match in find_matches(REQUEST)}
+
+
+def _cold_scores(monkeypatch):
+    """Scores from a freshly built pool and an empty score cache."""
+    monkeypatch.setattr(inference, "_DATABASE_POOL", None)
+    monkeypatch.setattr(inference, "SCORE_CACHE", ScoreCache())
+    return _scores()
+
+
+def test_pool_is_reused_until_the_database_changes(database):
+    pool = inference._load_candidate_pool()
+    assert inference._load_candidate_pool() is pool
+
+    database.update("dog-0", age=9)
+    rebuilt = inference._load_candidate_pool()
+    assert rebuilt is not pool
+    assert rebuilt.version == database.version
+
+
+def test_update_rescores_deterministically(database, monkeypatch):
+    before = _scores()
+    database.update("dog-2", energy_level=5, playfulness=4, training_level=3)
+    after = _scores()
+
+    assert after["dog-2"] != before["dog-2"]
+    assert {k: v for k, v in after.items() if k != "dog-2"} == {k: v for k, v in before.items() if k != "dog-2"}
+    assert _cold_scores(monkeypatch) == after
+
+
+def test_add_and_remove_change_the_candidates(database, monkeypatch):
+    _scores()
+    database.remove("dog-1")
+    database.add(_dog(7))
+
+    scores = _scores()
+    assert set(scores) == {"dog-0", "dog-2", "dog-3", "dog-4", "dog-7"}
+    assert _cold_scores(monkeypatch) == scores
+
+
+def test_profiles_are_copied_in_and_out(database):
+    version = database.version
+    dog = _dog(8)
+    database.add(dog)
+    dog["energy_level"] = 1
+    database.get("dog-8")["energy_level"] = 1
+    database.profiles()[-1]["energy_level"] = 1
+
+    assert database.get("dog-8")["energy_level"] == _dog(8)["energy_level"]
+    assert database.version == version + 1
+    with pytest.raises(KeyError):
+        database.update("missing", age=1)
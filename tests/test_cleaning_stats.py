@@ -0,0 +1,105 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.cleaning_stats import FORMAT_VERSION, CleaningStats
+from data.run_processing import clean_data, compute_column_stats
+
+
+@pytest.fixture
+def raw():
+    rng = np.random.default_rng(0)
+    n = 200
+    frame = pd.DataFrame({
+        "price": rng.lognormal(12, 0.6, n).round(),
+        "sqft": rng.integers(500, 4000, n).astype(float),
+        "bedrooms": rng.integers(1, 6, n).astype(float),
+        "condition": rng.choice(["good", "fair", "poor"], n),
+    })
+    frame.loc[[3, 50, 120], "price"] = [1e9, 10.0, np.nan]
+    frame.loc[rng.choice(n, 15, replace=False), "sqft"] = np.nan
+    frame.loc[rng.choice(n, 10, replace=False), "bedrooms"] = np.nan
+    frame.loc[rng.choice(n, 8, replace=False), "condition"] = None
+    return frame
+
+
+def _same(a, b):
+    return a == b or (isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b))
+
+
+def test_artifact_round_trip(raw, tmp_path):
+    stats = compute_column_stats(raw)
+    path = tmp_path / "nested" / "stats.json"
+    stats.save(str(path))
+
+    loaded = CleaningStats.load(str(path))
+
+    assert loaded.to_dict() == stats.to_dict()
+    assert loaded.version == stats.version
+    assert json.loads(path.read_text())["format_version"] == FORMAT_VERSION
+
+
+def test_unknown_format_version_is_rejected(raw):
+    data = compute_column_stats(raw).to_dict()
+    for version in (FORMAT_VERSION + 1, None):
+        with pytest.raises(ValueError, match="Unsupported cleaning stats format"):
+            CleaningStats.from_dict({**data, "format_version": version})
+
+
+def test_version_tracks_fitted_values_only(raw):
+    stats = compute_column_stats(raw)
+    refit = CleaningStats(stats.rows + 1, stats.null_counts, stats.fill_values,
+                          stats.lower_bound, stats.upper_bound, fitted_at="2000-01-01T00:00:00")
+    changed = CleaningStats(stats.rows, stats.null_counts, {**stats.fill_values, "sqft": -1},
+                            stats.lower_bound, stats.upper_bound)
+
+    assert refit.version == stats.version
+    assert changed.version != stats.version
+
+
+def test_apply_matches_clean_data_row_by_row(raw):
+    stats = compute_column_stats(raw)
+    records = raw.to_dict("records")
+    cleaned = clean_data(raw.copy(), stats)
+
+    for index, expected in cleaned.to_dict("index").items():
+        actual = stats.apply(records[index])
+        assert actual.keys() == expected.keys()
+        assert all(_same(actual[column], expected[column]) for column in expected), index
+
+
+def test_apply_leaves_the_record_untouched(raw):
+    stats = compute_column_stats(raw)
+    record = {"price": 300000.0, "sqft": None, "bedrooms": float("nan"), "condition": None}
+
+    cleaned = stats.apply(record)
+
+    assert record["sqft"] is None and record["condition"] is None
+    assert cleaned["sqft"] == stats.fill_values["sqft"]
+    assert cleaned["bedrooms"] == stats.fill_values["bedrooms"]
+    assert cleaned["condition"] == stats.fill_values["condition"]
+
+
+def test_is_outlier_and_apply_batch_follow_the_bounds(raw):
+    stats = compute_column_stats(raw)
+    inside = {"price": (stats.lower_bound + stats.upper_bound) / 2}
+    records = [inside, {"price": stats.upper_bound + 1}, {"price": stats.lower_bound - 1}, {"price": None}, {}]
+
+    assert [stats.is_outlier(r) for r in records] == [False, True, True, False, False]
+    assert len(stats.apply_batch(records)) == 5
+    kept = stats.apply_batch(records, drop_outliers=True)
+    assert [record["price"] for record in kept] == [inside["price"], stats.fill_values["price"],
+                                                     stats.fill_values["price"]]
+
+
+def test_apply_batch_matches_clean_data(raw):
+    stats = compute_column_stats(raw)
+    expected = clean_data(raw.copy(), stats).to_dict("records")
+
+    actual = stats.apply_batch(raw.to_dict("records"), drop_outliers=True)
+
+    assert len(actual) == len(expected)
+    assert all(_same(a[c], e[c]) for a, e in zip(actual, expected) for c in e)
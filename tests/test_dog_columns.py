@@ -0,0 +1,64 @@
+import numpy as np
+
+from api.inference import CandidatePool, candidate_pair_features
+from data.dog_generation import (BASE_CATALOG, dog_feature_columns, dog_feature_store, generate_profile_columns,
+                                 profiles_frame)
+from features.bitops import popcount
+from features.dog_columns import TRAIT_FIELDS, profile_feature_columns
+
+
+def _api_profile(**traits):
+    profile = {"breed": "Beagle", "age": 3, "weight": 30.0, "size": "medium", "location": "Austin, TX",
+               "good_with_dogs": True, "favorite_activities": ["Fetch", "Hiking"]}
+    profile.update(traits)
+    return profile
+
+
+def test_profile_dicts_match_generated_columns():
+    rng = np.random.default_rng(0)
+    columns = generate_profile_columns(300, rng, catalog=BASE_CATALOG)
+    profiles = profiles_frame(columns, BASE_CATALOG).to_dict("records")
+
+    expected = dog_feature_columns(columns, BASE_CATALOG)
+    actual = profile_feature_columns(profiles)
+
+    assert expected.keys() == actual.keys()
+    for name in expected:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
+
+
+def test_api_traits_are_rescaled_to_training_scale():
+    profiles = [_api_profile(energy_level=level, friendliness=level, playfulness=level, training_level=level)
+                for level in (1, 3, 5)]
+
+    columns = profile_feature_columns(profiles, trait_scale=5)
+
+    for name in ("energy_level", "friendliness", "playfulness", "training_level"):
+        np.testing.assert_allclose(columns[name], [1.0, 5.5, 10.0])
+
+
+def test_serving_pair_features_match_generated_pairs():
+    # Traits at the ends of the scales (1 and 10 in training, 1 and 5 in the API) map exactly
+    rng = np.random.default_rng(2)
+    columns = generate_profile_columns(60, rng, catalog=BASE_CATALOG)
+    for field in TRAIT_FIELDS:
+        columns[field] = np.where(rng.random(60) < 0.5, 1, 10)
+    api_dogs = [dict(profile, id=str(profile["dog_id"]),
+                     **{field: 1 if profile[field] == 1 else 5 for field in TRAIT_FIELDS})
+                for profile in profiles_frame(columns, BASE_CATALOG).to_dict("records")]
+
+    serving = candidate_pair_features(api_dogs[0], CandidatePool(api_dogs[1:]))
+    generated = dog_feature_store(columns, BASE_CATALOG).pair_features(np.zeros(59, dtype=np.int64),
+                                                                       np.arange(1, 60))
+
+    assert serving.keys() == generated.keys()
+    for name in generated:
+        np.testing.assert_allclose(serving[name], generated[name], err_msg=name)
+
+
+def test_popcount_counts_every_width():
+    rng = np.random.default_rng(1)
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        values = rng.integers(0, np.iinfo(dtype).max, size=(7, 5), dtype=dtype, endpoint=True)
+        expected = np.array([bin(int(v)).count("1") for v in values.ravel()]).reshape(values.shape)
+        np.testing.assert_array_equal(popcount(values), expected)
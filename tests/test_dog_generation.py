@@ -0,0 +1,45 @@
+import numpy as np
+
+from data.dog_generation import (
+    BASE_CATALOG,
+    calculate_compatibility_score,
+    compatibility_scores,
+    generate_compatibility_pair_frame,
+    generate_profile_columns,
+    profiles_frame,
+    sample_pair_indices,
+)
+
+
+def _profiles(num_profiles, seed):
+    rng = np.random.default_rng(seed)
+    columns = generate_profile_columns(num_profiles, rng, catalog=BASE_CATALOG)
+    return rng, columns, profiles_frame(columns, BASE_CATALOG).to_dict("records")
+
+
+def test_vectorized_scores_match_scalar_reference_without_noise():
+    rng, columns, profiles = _profiles(500, seed=0)
+    first, second = sample_pair_indices(rng, len(profiles), 5000)
+
+    vectorized = compatibility_scores(columns, first, second)
+    reference = np.array([calculate_compatibility_score(profiles[a], profiles[b], noise=False)
+                          for a, b in zip(first, second)])
+
+    np.testing.assert_allclose(vectorized, reference, rtol=0, atol=1e-9)
+
+
+def test_pair_frame_scores_match_scalar_reference_without_noise():
+    rng, columns, profiles = _profiles(200, seed=1)
+    pairs = generate_compatibility_pair_frame(columns, 1000, rng, noise=False)
+    by_id = {profile["dog_id"]: profile for profile in profiles}
+
+    reference = [calculate_compatibility_score(by_id[a], by_id[b], noise=False)
+                 for a, b in zip(pairs["dog1_id"], pairs["dog2_id"])]
+
+    np.testing.assert_allclose(pairs["compatibility_score"].to_numpy(), reference, rtol=0, atol=1e-9)
+
+
+def test_pair_indices_are_distinct():
+    first, second = sample_pair_indices(np.random.default_rng(2), 10, 10_000)
+    assert (first != second).all()
+    assert ((second >= 0) & (second < 10)).all()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from features.engineer import (
+    NUMERICAL_FEATURES,
+    create_features,
+    create_preprocessor,
+    fit_preprocessor_from_stats,
+    run_feature_engineering_chunked,
+    scan_feature_stats,
+)
+from features.sparse_io import load_sparse_shards
+
+CHUNKSIZE = 50
+
+
+@pytest.fixture
+def cleaned_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 230
+    df = pd.DataFrame({
+        'price': rng.uniform(1e5, 1e6, n),
+        'sqft': rng.uniform(500, 4000, n),
+        'bedrooms': rng.integers(1, 6, n),
+        'bathrooms': rng.integers(0, 4, n),
+        'year_built': rng.integers(1900, 2020, n),
+        'location': rng.choice(['Urban', 'Suburb', 'Rural'], n),
+        'condition': rng.choice(['Good', 'Fair', 'Excellent'], n),
+    })
+    # sqft (and so price_per_sqft) is missing for the whole first chunk
+    df.loc[:CHUNKSIZE - 1, 'sqft'] = np.nan
+    df.loc[rng.random(n) < 0.05, 'condition'] = np.nan
+    df.loc[CHUNKSIZE * 3:, 'location'] = 'Waterfront'  # only seen in later chunks
+    path = tmp_path / 'cleaned.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+def _one_shot(path):
+    X = create_features(pd.read_csv(path)).drop(columns=['price'])
+    return X, create_preprocessor().fit(X)
+
+
+# SimpleImputer warns when it skips a column with no observed values
+@pytest.mark.filterwarnings('error::UserWarning')
+def test_chunked_fit_matches_one_shot_fit(cleaned_csv):
+    X, expected = _one_shot(cleaned_csv)
+    _, means, categories = scan_feature_stats(cleaned_csv, CHUNKSIZE)
+    chunked = fit_preprocessor_from_stats(X.iloc[:CHUNKSIZE], means, categories)
+
+    imputer = chunked.named_transformers_['num'].named_steps['imputer']
+    np.testing.assert_allclose(imputer.statistics_, means[NUMERICAL_FEATURES].to_numpy(), rtol=1e-12)
+
+    assert list(chunked.get_feature_names_out()) == list(expected.get_feature_names_out())
+    diff = abs(sparse.csr_matrix(chunked.transform(X)) - sparse.csr_matrix(expected.transform(X)))
+    assert diff.nnz == 0 or diff.max() <= 1e-9
+
+
+def test_chunked_shards_match_one_shot_transform(cleaned_csv, tmp_path):
+    X, expected = _one_shot(cleaned_csv)
+    output_dir = tmp_path / 'features'
+    run_feature_engineering_chunked(cleaned_csv, output_dir, tmp_path / 'preprocessor.pkl', CHUNKSIZE)
+
+    X_chunked, feature_names, target = load_sparse_shards(output_dir, mmap=False)
+    assert list(feature_names) == list(expected.get_feature_names_out())
+    np.testing.assert_allclose(X_chunked.toarray(), sparse.csr_matrix(expected.transform(X)).toarray(),
+                               rtol=0, atol=1e-9)
+    assert len(target) == len(X)
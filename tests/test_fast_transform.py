@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from features.engineer import create_features, create_preprocessor
+from features.fast_transform import CompiledPreprocessor
+
+
+def _houses(n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'price': rng.uniform(1e5, 1e6, n),
+        'sqft': rng.uniform(500, 4000, n),
+        'bedrooms': rng.integers(1, 6, n).astype(float),
+        'bathrooms': rng.integers(0, 4, n).astype(float),
+        'year_built': rng.integers(1900, 2020, n),
+        'location': rng.choice(['Urban', 'Suburb', 'Rural', 'Waterfront'], n).astype(object),
+        'condition': rng.choice(['Good', 'Fair', 'Excellent'], n).astype(object),
+    })
+    df.loc[rng.random(n) < 0.1, 'sqft'] = np.nan
+    df.loc[rng.random(n) < 0.1, 'condition'] = np.nan
+    return create_features(df).drop(columns=['price'])
+
+
+def _sklearn(preprocessor, X):
+    expected = preprocessor.transform(X)
+    return expected.toarray() if hasattr(expected, 'toarray') else np.asarray(expected)
+
+
+def test_compiled_transform_matches_preprocessor():
+    X = _houses(300, seed=0)
+    preprocessor = create_preprocessor().fit(X)
+    compiled = CompiledPreprocessor(preprocessor)
+
+    # Unseen category and missing values on rows the preprocessor was not fitted on
+    new = _houses(100, seed=1)
+    new.loc[:9, 'location'] = 'Mountain'
+    new.loc[10:19, 'bathrooms'] = np.nan
+    expected = _sklearn(preprocessor, new)
+
+    np.testing.assert_allclose(compiled.transform_records(new.to_dict('records')), expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(compiled.transform_array(new), expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(compiled.transform_record(new.iloc[0].to_dict()), expected[0], rtol=0, atol=1e-9)
+
+
+def test_compiled_transform_matches_preprocessor_with_fixed_categories():
+    X = _houses(200, seed=2)
+    preprocessor = create_preprocessor([['Urban', 'Suburb', 'Rural'], ['Good', 'Fair', 'Excellent']]).fit(X)
+    compiled = CompiledPreprocessor(preprocessor)
+
+    assert compiled.n_features == len(preprocessor.get_feature_names_out())
+    np.testing.assert_allclose(compiled.transform_array(X), _sklearn(preprocessor, X), rtol=0, atol=1e-9)
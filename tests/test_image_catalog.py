@@ -0,0 +1,63 @@
+import numpy as np
+from PIL import Image
+
+from data.image_catalog import DEFAULT_MAX_DISTANCE, build_catalog, find_near_duplicates, perceptual_hash
+
+
+def _photo(seed, size=(640, 480)):
+    """A smooth synthetic 'photo': random low-frequency blobs, so pHash has structure to lock on to."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size[1], 0:size[0]] / max(size)
+    pixels = np.zeros((size[1], size[0], 3))
+    for _ in range(6):
+        cx, cy, radius = rng.random(3) * [1, 0.75, 0.3] + [0, 0, 0.05]
+        pixels += np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / radius ** 2)[..., np.newaxis] * rng.random(3)
+    pixels = 255 * pixels / pixels.max()
+    return Image.fromarray(pixels.astype(np.uint8))
+
+
+def _distance(a, b):
+    return bin(perceptual_hash(a) ^ perceptual_hash(b)).count("1")
+
+
+def test_phash_is_stable_under_resizing_and_reencoding(tmp_path):
+    photo = _photo(0)
+    photo.resize((320, 240), Image.LANCZOS).save(tmp_path / "small.jpg", quality=60)
+
+    assert _distance(photo, photo.resize((1280, 960), Image.BICUBIC)) <= DEFAULT_MAX_DISTANCE
+    assert _distance(photo, photo.resize((200, 150), Image.BILINEAR)) <= DEFAULT_MAX_DISTANCE
+    with Image.open(tmp_path / "small.jpg") as reencoded:
+        assert _distance(photo, reencoded) <= DEFAULT_MAX_DISTANCE
+
+
+def test_phash_separates_different_photos():
+    photos = [_photo(seed) for seed in range(6)]
+    distances = [_distance(a, b) for i, a in enumerate(photos) for b in photos[i + 1:]]
+    assert min(distances) > DEFAULT_MAX_DISTANCE
+
+
+def test_find_near_duplicates_matches_brute_force():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 1 << 62, 300, dtype=np.uint64)
+    flips = [sum(1 << int(bit) for bit in rng.choice(64, rng.integers(0, 10), replace=False)) for _ in range(100)]
+    values = [int(h) for h in hashes] + [int(hashes[i]) ^ flip for i, flip in enumerate(flips)]
+    phashes = [f"{value:016x}" for value in values]
+
+    for max_distance in (0, 4, DEFAULT_MAX_DISTANCE, 12):
+        expected = [(i, j, bin(a ^ b).count("1")) for i, a in enumerate(values) for j, b in enumerate(values)
+                    if i < j and bin(a ^ b).count("1") <= max_distance]
+        assert find_near_duplicates(phashes, max_distance) == expected
+
+
+def test_build_catalog_flags_resized_copies(tmp_path):
+    images_dir, catalog_dir = tmp_path / "images", tmp_path / "catalog"
+    images_dir.mkdir()
+    _photo(1).save(images_dir / "beagle_1.jpg")
+    _photo(1).resize((300, 225), Image.LANCZOS).save(images_dir / "beagle_2.jpg", quality=70)
+    _photo(2).save(images_dir / "poodle_1.jpg")
+
+    manifest = build_catalog(str(images_dir), str(catalog_dir), size=64, workers=1)
+
+    flagged = {entry["filename"]: entry["duplicate_of"] for entry in manifest["images"]}
+    assert flagged == {"beagle_1.jpg": None, "beagle_2.jpg": "beagle_1.jpg", "poodle_1.jpg": None}
+    assert {entry["breed_key"] for entry in manifest["images"]} == {"beagle", "poodle"}
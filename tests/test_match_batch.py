@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api import inference
+from api.main import app
+from api.swipe_store import SQLiteSwipeStore
+
+PROFILE = {
+    "name": "Rex", "breed": "Beagle", "age": 3, "size": "medium", "gender": "male", "weight": 30.0,
+    "energy_level": 4, "friendliness": 5, "playfulness": 4, "training_level": 3,
+    "good_with_dogs": True, "good_with_kids": True, "good_with_cats": False, "location": "Austin, TX",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(inference, "_SWIPE_STORE", SQLiteSwipeStore())
+    return TestClient(app)
+
+
+def _request(num_profiles, dog_ids=None):
+    body = {"profiles": [PROFILE] * num_profiles,
+            "criteria": {"dog_profile": PROFILE, "min_compatibility_score": 0.0}}
+    if dog_ids is not None:
+        body["dog_ids"] = dog_ids
+    return body
+
+
+def test_batch_ranks_every_profile(client):
+    response = client.post("/match/batch", json=_request(2, dog_ids=["a", None]))
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["dog_name"] for r in results] == ["Rex", "Rex"]
+    ranked = [[(m["dog_id"], m["compatibility_score"]) for m in r["matches"]] for r in results]
+    assert ranked[0] and ranked[0] == ranked[1]
+
+
+@pytest.mark.parametrize("dog_ids", [["a", "b"], []])
+def test_dog_ids_must_match_profiles(client, dog_ids):
+    response = client.post("/match/batch", json=_request(1, dog_ids=dog_ids))
+
+    assert response.status_code == 422
+    assert "dog_ids" in response.text
+
+
+@pytest.mark.parametrize("num_profiles", [0, 11])
+def test_profile_count_is_bounded(client, num_profiles):
+    assert client.post("/match/batch", json=_request(num_profiles)).status_code == 422
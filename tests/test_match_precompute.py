@@ -0,0 +1,99 @@
+import os
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import inference
+from api.main import app
+from api.match_precompute import _block_file, precompute_matches
+from api.match_store import PrecomputedMatches
+from api.schemas import SwipeAction
+from api.seen_set import SeenSetRegistry
+from api.swipe_store import SQLiteSwipeStore
+
+REGIONS = ["Austin, TX", "Denver, CO", "Boston, MA"]
+
+
+def _dogs(per_region=12, seed=0):
+    rng = random.Random(seed)
+    return [
+        {"id": f"{region[:3]}-{i}", "name": f"Dog {i}", "location": region,
+         "energy_level": rng.randint(1, 5), "playfulness": rng.randint(1, 5), "training_level": rng.randint(1, 5),
+         "friendliness": rng.randint(1, 5), "size": rng.choice(["small", "medium", "large"]),
+         "age": rng.randint(1, 12), "good_with_dogs": rng.random() < 0.8}
+        for region in REGIONS for i in range(per_region)
+    ]
+
+
+def _block_states(store_dir):
+    return {region: (os.stat(path).st_mtime_ns, open(path, "rb").read())
+            for region in REGIONS for path in [os.path.join(store_dir, _block_file(region))]}
+
+
+def test_changing_one_dog_rewrites_only_its_region(tmp_path):
+    dogs = _dogs()
+    assert precompute_matches(dogs, str(tmp_path), top_n=5) == {"recomputed": 3, "unchanged": 0, "removed": 0}
+    before = _block_states(tmp_path)
+
+    edited = [dict(dog, energy_level=6 - dog["energy_level"]) if dog["id"] == "Den-3" else dog for dog in dogs]
+    assert precompute_matches(edited, str(tmp_path), top_n=5) == {"recomputed": 1, "unchanged": 2, "removed": 0}
+    after = _block_states(tmp_path)
+
+    assert after["Austin, TX"] == before["Austin, TX"]
+    assert after["Boston, MA"] == before["Boston, MA"]
+    assert after["Denver, CO"] != before["Denver, CO"]
+
+
+def test_renamed_dog_is_not_rescored(tmp_path):
+    dogs = _dogs()
+    precompute_matches(dogs, str(tmp_path), top_n=5)
+    renamed = [dict(dog, name="Renamed") for dog in dogs]
+
+    assert precompute_matches(renamed, str(tmp_path), top_n=5)["recomputed"] == 0
+
+
+def test_blocks_are_loaded_on_first_lookup(tmp_path):
+    precompute_matches(_dogs(), str(tmp_path), top_n=5)
+    store = PrecomputedMatches(str(tmp_path))
+
+    candidate_ids, scores = store.top_matches("Aus-0")
+
+    loaded = {region for region, block in store._blocks.items() if block["top_idx"] is not None}
+    assert loaded == {"Austin, TX"}
+    assert len(candidate_ids) == 5 and "Aus-0" not in candidate_ids
+    assert all(candidate_id.startswith("Aus-") for candidate_id in candidate_ids)
+    assert (np.diff(scores) <= 0).all()
+    assert store.top_matches("unknown") is None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    precompute_matches(_dogs(), str(tmp_path), top_n=5)
+    monkeypatch.setattr(inference, "PRECOMPUTED_MATCHES", PrecomputedMatches(str(tmp_path)))
+    store = SQLiteSwipeStore()
+    monkeypatch.setattr(inference, "_SWIPE_STORE", store)
+    monkeypatch.setattr(inference, "SEEN_SETS", SeenSetRegistry(inference.DOG_IDS, store.swiped_targets))
+    return TestClient(app)
+
+
+def test_top_matches_endpoint_serves_precomputed_lists(client):
+    response = client.get("/match/Bos-1/top", params={"limit": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dog_id"] == "Bos-1"
+    assert len(body["matches"]) == 3
+
+
+def test_top_matches_endpoint_skips_swiped_dogs(client):
+    first = client.get("/match/Bos-1/top").json()["matches"][0]["dog_id"]
+    inference.process_swipe(SwipeAction(user_dog_id="Bos-1", target_dog_id=first, action="pass"))
+
+    ids = [match["dog_id"] for match in client.get("/match/Bos-1/top").json()["matches"]]
+    assert first not in ids and len(ids) == 4
+
+
+def test_top_matches_endpoint_404s_for_unknown_dogs(client):
+    assert client.get("/match/nobody/top").status_code == 404
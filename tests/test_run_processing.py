@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.run_processing import _mode_of_counts, compute_column_stats, load_data, scan_data
+
+CHUNKSIZE = 50
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 230
+    frame = pd.DataFrame({
+        "price": rng.lognormal(12, 0.5, n).round(),
+        "sqft": rng.integers(500, 4000, n).astype(float),
+        # Numeric in the first chunk, text later: the whole-file read sees strings
+        "zone": [1] * 50 + ["X"] * 5 + [None] * 5 + ["Y"] * 40 + [2] * 130,
+        # Text first, numeric in later chunks
+        "grade": ["A"] * 60 + [None] * 10 + [3] * 160,
+        # Tied mode between two categories
+        "condition": (["good", "fair"] * 115),
+    })
+    frame.loc[rng.choice(n, 20, replace=False), "sqft"] = np.nan
+    frame.loc[rng.choice(n, 7, replace=False), "price"] = np.nan
+    frame.loc[rng.choice(n, 9, replace=False), "condition"] = None
+    path = tmp_path / "raw.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_chunked_scan_matches_in_memory_stats(raw_csv):
+    chunked = scan_data(raw_csv, CHUNKSIZE)
+    in_memory = compute_column_stats(load_data(raw_csv))
+
+    assert chunked.rows == in_memory.rows
+    assert chunked.null_counts == in_memory.null_counts
+    assert chunked.fill_values == in_memory.fill_values
+    assert chunked.fill_values["zone"] == "2"
+    assert chunked.fill_values["grade"] == "3"
+    # Price bounds come from a t-digest in the chunked scan
+    iqr = (in_memory.upper_bound - in_memory.lower_bound) / 4
+    assert chunked.lower_bound == pytest.approx(in_memory.lower_bound, abs=0.05 * iqr)
+    assert chunked.upper_bound == pytest.approx(in_memory.upper_bound, abs=0.05 * iqr)
+
+
+def test_flipped_column_keeps_its_early_numeric_rows(tmp_path):
+    path = tmp_path / "zones.csv"
+    pd.DataFrame({"price": np.arange(100.0), "zone": [1] * 50 + ["X"] * 5 + [None] * 5 + ["Y"] * 40}).to_csv(
+        path, index=False)
+
+    assert scan_data(str(path), CHUNKSIZE).fill_values == compute_column_stats(load_data(str(path))).fill_values
+    assert scan_data(str(path), CHUNKSIZE).fill_values["zone"] == "1"
+
+
+def test_mode_ties_are_deterministic_across_types():
+    assert _mode_of_counts({"b": 3, "a": 3, "c": 1}) == "a"
+    assert _mode_of_counts({"a": 3, 2: 3, 1.5: 3}) == 1.5
+    assert _mode_of_counts({"a": 3, 2: 3}) == _mode_of_counts({2: 3, "a": 3}) == 2
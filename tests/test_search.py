@@ -0,0 +1,123 @@
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.destination_store import synthetic_records
+
+
+@pytest.fixture(scope="module")
+def client():
+    main.load_corpus(synthetic_records(300, seed=0))
+    yield TestClient(main.app)
+    main.load_corpus(main.CORPUS)
+
+
+def _request(k, cursor=None, fields=None, strict=False, model="attribute+context", experience=("hiking", "kayak")):
+    body = {
+        "query": "quiet valley tea houses",
+        "filters": {"geotype": ["mountain"], "culture": [], "experience": list(experience), "strict": strict},
+        "retrieval": {"model": model, "k": k, "zipf_penalty": 0.35},
+    }
+    if cursor is not None:
+        body["cursor"] = cursor
+    if fields is not None:
+        body["fields"] = fields
+    return body
+
+
+def _search(client, **kwargs):
+    response = client.post("/search", json=_request(**kwargs))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _stream(client, **kwargs):
+    response = client.post("/search/stream", json=_request(**kwargs))
+    assert response.status_code == 200, response.text
+    lines = [orjson.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def _pages(client, k, **kwargs):
+    results, cursor, pages = [], None, 0
+    while True:
+        page = _search(client, k=k, cursor=cursor, **kwargs)
+        results += page["results"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return results, pages
+
+
+def test_paging_with_next_cursor_matches_one_large_page(client):
+    everything = _search(client, k=1000)
+    assert everything["next_cursor"] is None
+    assert everything["total"] == len(everything["results"]) > 100
+
+    paged, pages = _pages(client, k=7)
+
+    assert pages == -(-everything["total"] // 7)
+    assert paged == everything["results"]
+
+
+def test_cursor_from_another_search_is_rejected(client):
+    cursor = _search(client, k=5)["next_cursor"]
+
+    other = client.post("/search", json=_request(k=5, cursor=cursor, model="bm25"))
+    malformed = client.post("/search", json=_request(k=5, cursor="not-a-cursor"))
+
+    assert other.status_code == 400 and "does not belong" in other.text
+    assert malformed.status_code == 400
+    # The page size is not part of the search, so the cursor stays valid for other k
+    assert client.post("/search", json=_request(k=9, cursor=cursor)).status_code == 200
+
+
+def test_fields_projection(client):
+    full = _search(client, k=20)["results"]
+    projected = _search(client, k=20, fields=main.MAP_FIELDS)["results"]
+
+    assert [set(result) for result in projected] == [set(main.MAP_FIELDS)] * 20
+    assert projected == [{name: result[name] for name in main.MAP_FIELDS} for result in full]
+    tags_only = _search(client, k=3, fields=["tags"])["results"]
+    assert [set(result) for result in tags_only] == [{"destination", "tags"}] * 3
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.post("/search", json=_request(k=5, fields=["destination", "bogus"]))
+    stream = client.post("/search/stream", json=_request(k=5, fields=["bogus"]))
+
+    assert response.status_code == 422 and "bogus" in response.text
+    assert stream.status_code == 422
+
+
+def test_stream_matches_search_order_and_paging(client):
+    everything = _search(client, k=1000)
+    results, summary = _stream(client, k=1000)
+
+    assert [line["type"] for line in results] == ["result"] * len(results)
+    assert [line["rank"] for line in results] == list(range(1, len(results) + 1))
+    assert [line["result"] for line in results] == everything["results"]
+    assert summary["type"] == "summary" and summary["total"] == everything["total"]
+    assert summary["next_cursor"] is None
+
+    page = _search(client, k=10)
+    streamed, streamed_summary = _stream(client, k=10)
+    assert [line["result"] for line in streamed] == page["results"]
+    assert streamed_summary["next_cursor"] == page["next_cursor"]
+    second, _ = _stream(client, k=10, cursor=page["next_cursor"])
+    assert [line["rank"] for line in second] == list(range(11, 21))
+    assert [line["result"] for line in second] == everything["results"][10:20]
+
+
+def test_strict_filters_preselect_matching_destinations(client):
+    loose = _search(client, k=1000)["results"]
+    strict = _search(client, k=1000, strict=True)["results"]
+    wanted = {"mountain", "hiking", "kayak"}
+
+    expected = [result for result in loose if wanted & {tag.lower() for tag in result["tags"]}]
+    assert 0 < len(strict) < len(loose)
+    assert strict == expected
+    streamed, summary = _stream(client, k=1000, strict=True)
+    assert [line["result"] for line in streamed] == strict
+    assert summary["total"] == len(strict)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from api import seen_set
+from api.seen_set import ARRAY_CONTAINER_MAX, DogIdIndex, RoaringSet, SeenSetRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(seen_set.time, "monotonic", clock)
+    return clock
+
+
+def _values(rng):
+    # A dense bucket (converted to a bitmap), a sparse one and a few far-away values
+    dense = rng.choice(1 << 16, ARRAY_CONTAINER_MAX + 500, replace=False)
+    sparse = (3 << 16) + rng.choice(1 << 16, 100, replace=False)
+    far = rng.integers(0, np.iinfo(np.uint32).max, 50, dtype=np.uint32)
+    return np.concatenate([dense, sparse, far]).astype(np.uint32)
+
+
+def test_roaring_set_matches_python_set():
+    rng = np.random.default_rng(0)
+    values = _values(rng)
+    roaring, expected = RoaringSet(), set()
+    for chunk in np.array_split(values, 7):
+        roaring.update(chunk)
+        expected.update(chunk.tolist())
+    roaring.add(int(values[0]))
+
+    assert len(roaring) == len(expected)
+    probes = np.concatenate([values, rng.integers(0, 1 << 20, 5000, dtype=np.uint32)])
+    np.testing.assert_array_equal(roaring.contains_many(probes), [int(v) in expected for v in probes])
+    assert all((int(v) in roaring) == (int(v) in expected) for v in probes[::50])
+
+
+def test_unseen_mask_matches_python_set(clock):
+    swipes = {"rex": [f"dog-{i}" for i in range(0, 300, 3)]}
+    index = DogIdIndex()
+    registry = SeenSetRegistry(index, lambda dog_id: swipes.get(dog_id, []))
+    candidates = [f"dog-{i}" for i in range(300)]
+
+    mask = registry.unseen_mask("rex", index.intern_many(candidates))
+
+    assert mask.tolist() == [c not in set(swipes["rex"]) for c in candidates]
+    assert registry.unseen_mask("fido", index.intern_many(candidates)).all()
+
+
+def test_record_updates_loaded_sets_only(clock):
+    index = DogIdIndex()
+    registry = SeenSetRegistry(index, lambda dog_id: [])
+    registry.get("rex")
+
+    registry.record("rex", "a")
+    registry.record("fido", "b")
+
+    assert index.intern("a") in registry.get("rex")
+    assert len(registry) == 1
+
+
+def test_entries_reload_after_ttl(clock):
+    loads = []
+    registry = SeenSetRegistry(DogIdIndex(), lambda dog_id: loads.append(dog_id) or [], ttl_seconds=10)
+
+    registry.get("rex")
+    clock.now += 10
+    registry.get("rex")
+    assert loads == ["rex"]
+
+    clock.now += 1
+    registry.get("rex")
+    assert loads == ["rex", "rex"]
+
+
+def test_expired_entries_are_swept(clock):
+    registry = SeenSetRegistry(DogIdIndex(), lambda dog_id: [], ttl_seconds=10)
+    registry.get("rex")
+    registry.get("fido")
+    clock.now += 5
+    registry.get("spot")
+
+    clock.now += 6
+    registry.record("spot", "a")
+
+    assert len(registry) == 1
+
+
+def test_registry_evicts_oldest_load_beyond_max_entries(clock):
+    loads = []
+    registry = SeenSetRegistry(DogIdIndex(), lambda dog_id: loads.append(dog_id) or [], max_entries=2)
+    for dog_id in ("a", "b", "c"):
+        registry.get(dog_id)
+        clock.now += 1
+
+    assert len(registry) == 2
+    registry.get("b")
+    registry.get("c")
+    assert loads == ["a", "b", "c"]
+    registry.get("a")
+    assert loads == ["a", "b", "c", "a"]
+    assert len(registry) == 2
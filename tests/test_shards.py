@@ -0,0 +1,22 @@
+import argparse
+
+from data.dog_generation import add_generation_arguments, run_generation
+from data.shards import read_shards
+
+
+def _generate(output_dir, num_profiles, num_pairs, shards, fmt):
+    parser = argparse.ArgumentParser()
+    add_generation_arguments(parser, num_profiles, num_pairs, str(output_dir))
+    run_generation(parser.parse_args(["--shards", str(shards), "--workers", "1", "--seed", "0",
+                                      "--format", fmt]))
+
+
+def test_rerun_with_fewer_shards_reads_only_new_shards(tmp_path):
+    _generate(tmp_path, 400, 800, shards=4, fmt="arrow")
+    _generate(tmp_path, 100, 200, shards=2, fmt="parquet")
+
+    profiles = read_shards(str(tmp_path / "profiles"))
+    pairs = read_shards(str(tmp_path / "pairs"))
+    assert profiles.num_rows == 100
+    assert pairs.num_rows == 200
+    assert sorted(profiles.column("dog_id").to_pylist()) == list(range(100))
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from api.swipe_store import SQLiteSwipeStore, SwipeStore, create_swipe_store
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = create_swipe_store(f"sqlite:///{tmp_path / 'swipes.db'}")
+    yield store
+    store.close()
+
+
+def _match_count(store):
+    return store._conn().execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SwipeStore()
+
+
+def test_mutual_like_creates_exactly_one_match(store):
+    assert isinstance(store, SQLiteSwipeStore)
+    assert store.record_swipe("a", "b", "like", NOW) is None
+    match_id = store.record_swipe("b", "a", "like", NOW)
+
+    assert match_id is not None
+    assert _match_count(store) == 1
+
+
+def test_pass_does_not_match(store):
+    assert store.record_swipe("a", "b", "like", NOW) is None
+    assert store.record_swipe("b", "a", "pass", NOW) is None
+    assert _match_count(store) == 0
+
+
+def test_repeated_like_reports_the_match_once(store):
+    store.record_swipe("a", "b", "like", NOW)
+    assert store.record_swipe("b", "a", "like", NOW) is not None
+
+    assert store.record_swipe("b", "a", "like", NOW) is None
+    assert store.record_swipe("a", "b", "like", NOW) is None
+    assert _match_count(store) == 1
+
+
+def test_swiped_targets_lists_likes_and_passes():
+    store = SQLiteSwipeStore()
+    store.record_swipe("a", "b", "like", NOW)
+    store.record_swipe("a", "c", "pass", NOW)
+    store.record_swipe("a", "b", "like", NOW)
+
+    assert sorted(store.swiped_targets("a")) == ["b", "c"]
+    assert store.swiped_targets("b") == []
+    store.close()